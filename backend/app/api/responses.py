@@ -0,0 +1,20 @@
+"""Custom response classes for FastAPI endpoints"""
+
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response rendered by pydantic-core's Rust serializer
+
+    Intended for hot read endpoints whose service layer already builds
+    JSON-native payloads (plain dicts of scalars). Returning this response
+    directly from an endpoint bypasses FastAPI's response-model validation,
+    and the content is encoded to UTF-8 bytes in a single pass.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
@@ -1,12 +1,19 @@
 """Market overview endpoints for indices, breadth, sectors, and movers"""
 
-from typing import Any, Dict
-
 from fastapi import APIRouter, Depends, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.responses import FastJSONResponse
 from app.core.cache import CacheManager, get_cache
 from app.db.session import get_db
+from app.schemas.market import (
+    MarketBreadthResponse,
+    MarketIndicesResponse,
+    MarketMoversResponse,
+    MarketTrendResponse,
+    MostActiveResponse,
+    SectorPerformanceResponse,
+)
 from app.services.market_service import MarketService
 
 router = APIRouter(prefix="/market", tags=["market"])
@@ -27,7 +34,9 @@ def get_market_service(
 
 @router.get(
     "/indices",
-    response_model=Dict[str, Any],
+    response_model=None,
+    response_class=FastJSONResponse,
+    responses={200: {"model": MarketIndicesResponse}},
     status_code=status.HTTP_200_OK,
     summary="Get current market indices",
     description="""
@@ -47,19 +56,23 @@ def get_market_service(
 )
 async def get_market_indices(
     market_service: MarketService = Depends(get_market_service),
-):
+) -> FastJSONResponse:
     """
     Get current market indices with sparklines
 
     Returns KOSPI, KOSDAQ, and KRX100 with real-time values,
     change metrics, and sparkline data for visualization.
     """
-    return await market_service.get_market_indices()
+    # Service payloads are already JSON-native, so skip response-model
+    # validation and encode them directly
+    return FastJSONResponse(await market_service.get_market_indices())
 
 
 @router.get(
     "/trend",
-    response_model=Dict[str, Any],
+    response_model=None,
+    response_class=FastJSONResponse,
+    responses={200: {"model": MarketTrendResponse}},
     status_code=status.HTTP_200_OK,
     summary="Get historical market trend",
     description="""
@@ -95,17 +108,18 @@ async def get_market_trend(
         pattern="^(1D|5D|1M|3M|6M|1Y)$",
     ),
     market_service: MarketService = Depends(get_market_service),
-):
+) -> FastJSONResponse:
     """
     Get historical market trend data
 
     Returns OHLCV data for the specified index and timeframe,
     suitable for rendering trend charts.
     """
-    return await market_service.get_market_trend(
+    trend = await market_service.get_market_trend(
         index=index,
         timeframe=timeframe,
     )
+    return FastJSONResponse(trend)
 
 
 # ============================================================================
@@ -115,7 +129,9 @@ async def get_market_trend(
 
 @router.get(
     "/breadth",
-    response_model=Dict[str, Any],
+    response_model=None,
+    response_class=FastJSONResponse,
+    responses={200: {"model": MarketBreadthResponse}},
     status_code=status.HTTP_200_OK,
     summary="Get market breadth indicators",
     description="""
@@ -143,14 +159,14 @@ async def get_market_breadth(
         pattern="^(KOSPI|KOSDAQ|ALL)$",
     ),
     market_service: MarketService = Depends(get_market_service),
-):
+) -> FastJSONResponse:
     """
     Get market breadth indicators with sentiment analysis
 
     Returns advancing/declining/unchanged stock counts with
     A/D ratio and calculated sentiment for the market.
     """
-    return await market_service.get_market_breadth(market=market)
+    return FastJSONResponse(await market_service.get_market_breadth(market=market))
 
 
 # ============================================================================
@@ -160,7 +176,9 @@ async def get_market_breadth(
 
 @router.get(
     "/sectors",
-    response_model=Dict[str, Any],
+    response_model=None,
+    response_class=FastJSONResponse,
+    responses={200: {"model": SectorPerformanceResponse}},
     status_code=status.HTTP_200_OK,
     summary="Get sector performance",
     description="""
@@ -208,17 +226,18 @@ async def get_sector_performance(
         pattern="^(KOSPI|KOSDAQ|ALL)$",
     ),
     market_service: MarketService = Depends(get_market_service),
-):
+) -> FastJSONResponse:
     """
     Get sector performance aggregation
 
     Returns sector-level performance metrics including average
     change percentage, market cap, volume, and top stock.
     """
-    return await market_service.get_sector_performance(
+    sectors = await market_service.get_sector_performance(
         timeframe=timeframe,
         market=market,
     )
+    return FastJSONResponse(sectors)
 
 
 # ============================================================================
@@ -228,7 +247,9 @@ async def get_sector_performance(
 
 @router.get(
     "/movers",
-    response_model=Dict[str, Any],
+    response_model=None,
+    response_class=FastJSONResponse,
+    responses={200: {"model": MarketMoversResponse}},
     status_code=status.HTTP_200_OK,
     summary="Get top market movers",
     description="""
@@ -275,18 +296,19 @@ async def get_market_movers(
         description="Maximum number of results",
     ),
     market_service: MarketService = Depends(get_market_service),
-):
+) -> FastJSONResponse:
     """
     Get top gaining or losing stocks
 
     Returns a ranked list of stocks with the highest price gains
     or losses for the day, with detailed price and volume info.
     """
-    return await market_service.get_market_movers(
+    movers = await market_service.get_market_movers(
         move_type=move_type,
         market=market,
         limit=limit,
     )
+    return FastJSONResponse(movers)
 
 
 # ============================================================================
@@ -296,7 +318,9 @@ async def get_market_movers(
 
 @router.get(
     "/active",
-    response_model=Dict[str, Any],
+    response_model=None,
+    response_class=FastJSONResponse,
+    responses={200: {"model": MostActiveResponse}},
     status_code=status.HTTP_200_OK,
     summary="Get most active stocks",
     description="""
@@ -346,15 +370,16 @@ async def get_most_active(
         description="Maximum number of results",
     ),
     market_service: MarketService = Depends(get_market_service),
-):
+) -> FastJSONResponse:
     """
     Get stocks with highest trading volume or value
 
     Returns a ranked list of most actively traded stocks
     based on volume or trading value.
     """
-    return await market_service.get_most_active(
+    active = await market_service.get_most_active(
         metric=metric,
         market=market,
         limit=limit,
     )
+    return FastJSONResponse(active)
@@ -1,13 +1,13 @@
 """WebSocket endpoints for real-time updates"""
 
-import json
 from datetime import datetime
-from typing import Optional
+from typing import Awaitable, Callable, Dict, Optional
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
 # from fastapi import Depends, status  # Unused
 from jose import JWTError, jwt
+from pydantic_core import from_json
 
 from app.core.config import settings
 from app.core.logging import logger
@@ -157,10 +157,10 @@ async def websocket_endpoint(
                     )
                     continue
 
-                # Parse JSON
+                # Parse JSON with pydantic-core's Rust parser
                 try:
-                    message = json.loads(data)
-                except json.JSONDecodeError as e:
+                    message = from_json(data)
+                except ValueError as e:
                     logger.warning(f"Invalid JSON from {connection_id}: {e}")
                     await connection_manager.send_error(
                         connection_id,
@@ -170,8 +170,8 @@ async def websocket_endpoint(
                     )
                     continue
 
-                # Get message type
-                msg_type = message.get("type")
+                # Get message type; only JSON objects can carry one
+                msg_type = message.get("type") if isinstance(message, dict) else None
 
                 if not msg_type:
                     await connection_manager.send_error(
@@ -181,30 +181,14 @@ async def websocket_endpoint(
                     )
                     continue
 
-                # Handle different message types
-                if msg_type == MessageType.SUBSCRIBE:
-                    await handle_subscribe(connection_id, message)
-
-                elif msg_type == MessageType.UNSUBSCRIBE:
-                    await handle_unsubscribe(connection_id, message)
-
-                elif msg_type == MessageType.PING:
-                    # Respond with pong
-                    pong = PongMessage()
-                    await connection_manager.send_message(connection_id, pong)
-
-                elif msg_type == MessageType.REFRESH_TOKEN:
-                    # Phase 3: Token refresh
-                    await handle_refresh_token(connection_id, message)
-
-                elif msg_type == MessageType.RECONNECT:
-                    # Phase 3: Reconnection - handled at connection time
-                    await connection_manager.send_error(
-                        connection_id,
-                        code="RECONNECT_NOT_SUPPORTED_HERE",
-                        message="Reconnection must be done at initial connection",
-                    )
-
+                # Dispatch on message type with a single table lookup
+                handler = (
+                    MESSAGE_HANDLERS.get(msg_type)
+                    if isinstance(msg_type, str)
+                    else None
+                )
+                if handler is not None:
+                    await handler(connection_id, message)
                 else:
                     await connection_manager.send_error(
                         connection_id,
@@ -236,6 +220,34 @@ async def websocket_endpoint(
         await connection_manager.disconnect(connection_id)
 
 
+async def handle_ping(connection_id: str, message: dict):
+    """
+    Handle ping request by responding with pong.
+
+    Args:
+        connection_id: Connection ID
+        message: Ping message
+    """
+    await connection_manager.send_message(connection_id, PongMessage())
+
+
+async def handle_reconnect(connection_id: str, message: dict):
+    """
+    Reject in-session reconnect requests (Phase 3).
+
+    Reconnection is handled at connection time via the session_id parameter.
+
+    Args:
+        connection_id: Connection ID
+        message: Reconnect message
+    """
+    await connection_manager.send_error(
+        connection_id,
+        code="RECONNECT_NOT_SUPPORTED_HERE",
+        message="Reconnection must be done at initial connection",
+    )
+
+
 async def handle_subscribe(connection_id: str, message: dict):
     """
     Handle subscription request.
@@ -246,7 +258,7 @@ async def handle_subscribe(connection_id: str, message: dict):
     """
     try:
         # Validate and parse request
-        request = SubscribeRequest(**message)
+        request = SubscribeRequest.model_validate(message)
 
         # Check targets per request limit (DoS protection)
         if len(request.targets) > settings.WEBSOCKET_MAX_TARGETS_PER_SUBSCRIPTION:
@@ -280,11 +292,10 @@ async def handle_subscribe(connection_id: str, message: dict):
                 )
                 return
 
-        # Subscribe to each target
-        for target in request.targets:
-            await connection_manager.subscribe(
-                connection_id, request.subscription_type, target
-            )
+        # Subscribe to all targets in one call
+        await connection_manager.subscribe_many(
+            connection_id, request.subscription_type, request.targets
+        )
 
         # Send confirmation
         response = SubscriptionResponse(
@@ -319,7 +330,7 @@ async def handle_unsubscribe(connection_id: str, message: dict):
     """
     try:
         # Validate and parse request
-        request = UnsubscribeRequest(**message)
+        request = UnsubscribeRequest.model_validate(message)
 
         # Unsubscribe from each target
         for target in request.targets:
@@ -362,7 +373,7 @@ async def handle_refresh_token(connection_id: str, message: dict):
         from app.schemas.websocket import RefreshTokenRequest, TokenRefreshedMessage
 
         # Validate request
-        request = RefreshTokenRequest(**message)
+        request = RefreshTokenRequest.model_validate(message)
 
         # Verify refresh token and generate new access token
         try:
@@ -437,6 +448,17 @@ async def handle_refresh_token(connection_id: str, message: dict):
         )
 
 
+# Client message handlers. MessageType is a str enum, so the raw ``type``
+# string from the client looks its handler up directly.
+MESSAGE_HANDLERS: Dict[str, Callable[[str, dict], Awaitable[None]]] = {
+    MessageType.SUBSCRIBE: handle_subscribe,
+    MessageType.UNSUBSCRIBE: handle_unsubscribe,
+    MessageType.PING: handle_ping,
+    MessageType.REFRESH_TOKEN: handle_refresh_token,
+    MessageType.RECONNECT: handle_reconnect,
+}
+
+
 @router.get("/ws/stats")
 async def get_websocket_stats():
     """
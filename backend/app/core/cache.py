@@ -7,6 +7,15 @@ from redis import asyncio as aioredis
 
 from app.core.config import settings
 
+# Characters a json.dumps() document can start with
+_JSON_START_CHARS = frozenset('{["-0123456789tfnNI')
+
+# Types json.dumps() can serialize without a custom encoder
+_JSON_TYPES = (dict, list, tuple, str, int, float, bool, type(None))
+
+# Keys requested per SCAN step and removed per UNLINK call in clear()
+_CLEAR_BATCH_SIZE = 1000
+
 
 class CacheManager:
     """Async Redis cache manager"""
@@ -24,8 +33,12 @@ class CacheManager:
 
     async def disconnect(self):
         """Disconnect from Redis"""
-        if self.redis:
-            await self.redis.close()
+        redis = self.redis
+        if redis is None:
+            return
+        # Drop the reference first so repeated calls return immediately
+        self.redis = None
+        await redis.aclose()
 
     async def get(self, key: str) -> Optional[Any]:
         """
@@ -42,6 +55,11 @@ class CacheManager:
 
         value = await self.redis.get(key)
         if value:
+            # Plain strings (the str() fallback in set()) can never be JSON
+            # when their first character cannot start a JSON document, so
+            # return them without going through a failing json.loads()
+            if value[0] not in _JSON_START_CHARS:
+                return value
             try:
                 return json.loads(value)
             except json.JSONDecodeError:
@@ -68,9 +86,14 @@ class CacheManager:
         if not self.redis:
             return False
 
-        try:
-            serialized = json.dumps(value)
-        except (TypeError, ValueError):
+        if isinstance(value, _JSON_TYPES):
+            try:
+                serialized = json.dumps(value)
+            except (TypeError, ValueError):
+                # Containers holding non-serializable items
+                serialized = str(value)
+        else:
+            # json.dumps() would raise for anything else; skip the exception
             serialized = str(value)
 
         if ttl:
@@ -121,10 +144,18 @@ class CacheManager:
         if not self.redis:
             return 0
 
-        keys = await self.redis.keys(pattern)
-        if keys:
-            return await self.redis.delete(*keys)
-        return 0
+        # SCAN walks the keyspace incrementally instead of blocking Redis
+        # like KEYS, and UNLINK reclaims memory in a background thread
+        deleted = 0
+        batch = []
+        async for key in self.redis.scan_iter(match=pattern, count=_CLEAR_BATCH_SIZE):
+            batch.append(key)
+            if len(batch) >= _CLEAR_BATCH_SIZE:
+                deleted += await self.redis.unlink(*batch)
+                batch = []
+        if batch:
+            deleted += await self.redis.unlink(*batch)
+        return deleted
 
 
 # Global cache manager instance
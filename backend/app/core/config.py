@@ -45,6 +45,7 @@ class Settings(BaseSettings):
     # ========================================================================
 
     REDIS_URL: str
+    REDIS_PUBSUB_MAX_CONNECTIONS: int = 32  # Shared by publishes and PubSub
     CACHE_TTL_HOT_STOCKS: int = 300
     CACHE_TTL_STOCK_DETAIL: int = 3600
     CACHE_TTL_SCREENING: int = 600
@@ -1,15 +1,62 @@
 """Redis Pub/Sub client for multi-instance WebSocket support"""
 
 import asyncio
-import json
-from typing import Any, Callable, Dict, Optional, Set
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
 
 import redis.asyncio as redis
+from pydantic_core import from_json, to_json
 from redis.asyncio.client import PubSub
+from redis.commands.core import AsyncScript
 
 from app.core.config import settings
 from app.core.logging import logger
 
+# A handler and whether it is a coroutine function, classified once at subscribe
+Subscriber = Tuple[Callable[[str, Any], Any], bool]
+
+# A (channel, message) pair to publish
+Publish = Tuple[str, Union[Dict[str, Any], str]]
+
+# Pending fire-and-forget publishes held before new ones are dropped
+PUBLISH_QUEUE_SIZE = 10_000
+
+# Most queued publishes sent in one publish_many() call
+PUBLISH_BATCH_SIZE = 64
+
+# Publishes each (channel, payload) pair in ARGV and returns the receiver
+# counts. Channels are not keys, so they are passed as ARGV, not KEYS.
+PUBLISH_MANY_LUA = """
+local receivers = {}
+for i = 1, #ARGV, 2 do
+    receivers[#receivers + 1] = redis.call('PUBLISH', ARGV[i], ARGV[i + 1])
+end
+return receivers
+"""
+
+
+def _encode(message: Union[Dict[str, Any], str]) -> Union[bytes, str]:
+    """Encode a message with pydantic-core, passing pre-encoded JSON through"""
+    return message if isinstance(message, str) else to_json(message)
+
+
+@dataclass(slots=True)
+class ChannelState:
+    """
+    Subscription state for one channel or pattern.
+
+    Looked up for every message the listener receives, so it is a slotted
+    dataclass holding everything _listen needs in a single dict lookup.
+    """
+
+    # Replaced with a new tuple on every change, so _listen iterates a
+    # snapshot that subscribe/unsubscribe never mutate
+    subscribers: Tuple[Subscriber, ...]
+    is_pattern: bool
+    # Optional payload decoder, replacing the generic JSON parse
+    decoder: Optional[Callable[[str, str], Any]] = None
+    message_count: int = 0
+
 
 class RedisPubSubClient:
     """
@@ -31,25 +78,55 @@ class RedisPubSubClient:
         """Initialize Redis Pub/Sub client"""
         self._redis: Optional[redis.Redis] = None
         self._pubsub: Optional[PubSub] = None
-        self._subscribers: Dict[str, Set[Callable]] = {}
+        self._subscribers: Dict[str, ChannelState] = {}
         self._listener_task: Optional[asyncio.Task] = None
         self._running = False
+        # Fire-and-forget publishes, sent in batches by the drain task; None
+        # asks the drain task to stop once it has sent what came before it
+        self._publish_queue: asyncio.Queue[Optional[Publish]] = asyncio.Queue(
+            maxsize=PUBLISH_QUEUE_SIZE
+        )
+        self._drain_task: Optional[asyncio.Task] = None
+        self._publish_many_script: Optional[AsyncScript] = None
 
     async def connect(self):
-        """Connect to Redis server"""
+        """
+        Connect to Redis server.
+
+        All publishes, batch scripts and the PubSub connection share one client
+        and its bounded connection pool, so calling this again while
+        connected reuses them instead of opening new sockets.
+        """
+        if self._redis is not None:
+            return
+
         try:
-            # Parse Redis URL
-            self._redis = redis.from_url(
+            # Parse Redis URL into a pool that makes callers wait for a free
+            # connection once the limit is reached
+            pool = redis.BlockingConnectionPool.from_url(
                 settings.REDIS_URL,
+                max_connections=settings.REDIS_PUBSUB_MAX_CONNECTIONS,
                 encoding="utf-8",
                 decode_responses=True,
             )
+            client = redis.Redis.from_pool(pool)
 
-            # Test connection
-            await self._redis.ping()
+            # Test connection and load the batch script up front; it then
+            # runs by SHA and is loaded again only if the server loses it
+            try:
+                await client.ping()
+                script = await self._load_publish_many_script(client)
+            except Exception:
+                await client.aclose()
+                raise
 
             # Create PubSub instance
+            self._redis = client
             self._pubsub = self._redis.pubsub()
+            self._publish_many_script = script
+
+            # Start sending queued publishes
+            self._drain_task = asyncio.create_task(self._drain_publishes())
 
             logger.info(f"Connected to Redis Pub/Sub: {settings.REDIS_URL}")
 
@@ -57,6 +134,24 @@ class RedisPubSubClient:
             logger.error(f"Failed to connect to Redis: {e}")
             raise
 
+    async def _load_publish_many_script(
+        self, client: redis.Redis
+    ) -> Optional[AsyncScript]:
+        """
+        Load PUBLISH_MANY_LUA for publish_many().
+
+        Returns None when the server rejects scripting, as managed Redis or
+        ACLs may, so publish_many() falls back to a pipeline instead of
+        failing the whole connection.
+        """
+        try:
+            await client.script_load(PUBLISH_MANY_LUA)
+        except redis.ResponseError as e:
+            logger.warning(f"Batch publish script unavailable, pipelining: {e}")
+            return None
+
+        return client.register_script(PUBLISH_MANY_LUA)
+
     async def disconnect(self):
         """Disconnect from Redis server"""
         self._running = False
@@ -69,28 +164,45 @@ class RedisPubSubClient:
             except asyncio.CancelledError:
                 pass
 
-        # Unsubscribe all channels
+        # Stop the drain task once its in-flight batch and everything queued
+        # before the stop marker are sent, then send anything queued since
+        if self._drain_task and not self._drain_task.done():
+            await self._publish_queue.put(None)
+            await self._drain_task
+
+        if self._redis and not self._publish_queue.empty():
+            await self._publish_queued(self._take_queued(self._publish_queue.qsize()))
+
+        # Unsubscribe all channels and patterns
         if self._pubsub:
             await self._pubsub.unsubscribe()
-            await self._pubsub.close()
+            await self._pubsub.punsubscribe()
+            await self._pubsub.aclose()
 
-        # Close Redis connection
+        # Close Redis connection and its pool
         if self._redis:
-            await self._redis.close()
+            await self._redis.aclose()
+
+        self._listener_task = None
+        self._drain_task = None
+        self._publish_many_script = None
+        self._pubsub = None
+        self._redis = None
 
         logger.info("Disconnected from Redis Pub/Sub")
 
     async def publish(
         self,
         channel: str,
-        message: Dict[str, Any],
+        message: Union[Dict[str, Any], str],
     ) -> int:
         """
         Publish a message to a Redis channel.
 
         Args:
             channel: Channel name
-            message: Message data (will be JSON-serialized)
+            message: Message data (will be JSON-serialized), or an already
+                encoded JSON string such as a model's model_dump_json()
 
         Returns:
             Number of subscribers that received the message
@@ -99,8 +211,8 @@ class RedisPubSubClient:
             raise RuntimeError("Redis client not connected")
 
         try:
-            # Serialize message to JSON
-            message_str = json.dumps(message)
+            # Serialize message to JSON unless the caller already did
+            message_str = _encode(message)
 
             # Publish to channel
             receivers = await self._redis.publish(channel, message_str)
@@ -116,10 +228,107 @@ class RedisPubSubClient:
             logger.error(f"Error publishing to {channel}: {e}")
             raise
 
+    def publish_nowait(
+        self,
+        channel: str,
+        message: Union[Dict[str, Any], str],
+    ) -> bool:
+        """
+        Queue a message for publishing without waiting for Redis.
+
+        A background task sends queued messages in batches. Errors
+        are logged there rather than reported to the caller.
+
+        Args:
+            channel: Channel name
+            message: Message data, handled as in publish()
+
+        Returns:
+            False if the queue is full and the message was dropped
+
+        Raises:
+            RuntimeError: If the client is not connected
+        """
+        if not self._redis:
+            raise RuntimeError("Redis client not connected")
+
+        try:
+            self._publish_queue.put_nowait((channel, message))
+        except asyncio.QueueFull:
+            logger.warning(f"Publish queue full, dropping message for {channel}")
+            return False
+
+        return True
+
+    async def publish_many(
+        self,
+        items: Sequence[Publish],
+    ) -> List[int]:
+        """
+        Publish several messages in one round-trip.
+
+        All messages go to Redis as one EVALSHA of PUBLISH_MANY_LUA, which
+        issues the PUBLISH commands server-side and returns one reply for the
+        whole batch. Where the server does not allow scripts, the PUBLISH
+        commands are sent through a non-transactional pipeline instead.
+
+        Args:
+            items: (channel, message) pairs; messages are handled as in
+                publish()
+
+        Returns:
+            Number of subscribers that received each message, in order
+        """
+        if not self._redis:
+            raise RuntimeError("Redis client not connected")
+
+        if not items:
+            return []
+
+        script = self._publish_many_script
+        if script is None:
+            return await self._publish_pipelined(items)
+
+        args: List[Union[bytes, str]] = []
+        for channel, message in items:
+            args.append(channel)
+            args.append(_encode(message))
+
+        try:
+            receivers = await script(args=args)
+
+        except Exception as e:
+            logger.error(f"Error publishing {len(items)} messages: {e}")
+            raise
+
+        logger.debug(f"Published {len(items)} messages in one script call")
+
+        return receivers
+
+    async def _publish_pipelined(self, items: Sequence[Publish]) -> List[int]:
+        """Publish several messages through one non-transactional pipeline"""
+        if not self._redis:
+            raise RuntimeError("Redis client not connected")
+
+        try:
+            async with self._redis.pipeline(transaction=False) as pipe:
+                for channel, message in items:
+                    pipe.publish(channel, _encode(message))
+                receivers = await pipe.execute()
+
+        except Exception as e:
+            logger.error(f"Error publishing {len(items)} messages: {e}")
+            raise
+
+        logger.debug(f"Published {len(items)} messages in one pipeline")
+
+        return receivers
+
     async def subscribe(
         self,
         channel: str,
-        handler: Callable[[str, Dict[str, Any]], Any],
+        handler: Callable[[str, Any], Any],
+        decoder: Optional[Callable[[str, str], Any]] = None,
     ):
         """
         Subscribe to a Redis channel.
@@ -127,17 +336,27 @@ class RedisPubSubClient:
         Args:
             channel: Channel name (supports wildcards: stock:*:price)
             handler: Async callback function(channel, message)
+            decoder: Optional function(channel, raw_payload) that decodes
+                messages for this channel, e.g. straight into a schema model.
+                Handlers then receive its result instead of a parsed dict.
+                It should raise ValueError for payloads it cannot decode.
         """
         if not self._pubsub:
             raise RuntimeError("PubSub not initialized")
 
-        # Add handler to subscribers
-        if channel not in self._subscribers:
-            self._subscribers[channel] = set()
-        self._subscribers[channel].add(handler)
+        # Add handler to subscribers, noting once whether it must be awaited
+        subscriber = (handler, asyncio.iscoroutinefunction(handler))
+        state = self._subscribers.get(channel)
+        if state is None:
+            is_pattern = "*" in channel or "?" in channel
+            state = self._subscribers[channel] = ChannelState((), is_pattern)
+        if subscriber not in state.subscribers:
+            state.subscribers = state.subscribers + (subscriber,)
+        if decoder is not None:
+            state.decoder = decoder
 
         # Subscribe to channel
-        if "*" in channel or "?" in channel:
+        if state.is_pattern:
             # Pattern subscription (wildcard)
             await self._pubsub.psubscribe(channel)
             logger.info(f"Subscribed to pattern: {channel}")
@@ -177,6 +396,9 @@ class RedisPubSubClient:
         Listen for messages from subscribed channels.
 
         This runs in a background task and dispatches messages to handlers.
+        It awaits once or more per message, so its throughput depends on the
+        event loop: run the server on uvloop, which uvicorn selects by default
+        (loop="auto") when uvloop is installed via uvicorn[standard].
         """
         if not self._pubsub:
             return
@@ -205,34 +427,46 @@ class RedisPubSubClient:
 
                     data_str = message["data"]
 
-                    # Parse JSON
-                    try:
-                        data = json.loads(data_str)
-                    except json.JSONDecodeError as e:
-                        logger.warning(f"Invalid JSON from {channel}: {e}")
-                        continue
-
-                    # Find matching handlers
-                    handlers = set()
-
-                    # Add exact match handlers
-                    if channel in self._subscribers:
-                        handlers.update(self._subscribers[channel])
-
-                    # Add pattern match handlers
-                    if pattern:
-                        if pattern in self._subscribers:
-                            handlers.update(self._subscribers[pattern])
-
-                    # Call all handlers
-                    for handler in handlers:
+                    # Decode once per matching subscription (exact match,
+                    # then pattern match) for that subscription's handlers
+                    calls = []
+                    called: Tuple[Subscriber, ...] = ()
+                    for key in (channel, pattern) if pattern else (channel,):
+                        state = self._subscribers.get(key)
+                        if state is None or not state.subscribers:
+                            continue
+                        state.message_count += 1
+                        subscribers = state.subscribers
+                        if called:
+                            # Call a handler registered for both only once
+                            subscribers = tuple(
+                                s for s in subscribers if s not in called
+                            )
+
+                        # Parse JSON with pydantic-core's Rust parser unless
+                        # the subscription registered its own decoder
+                        decoder = state.decoder
                         try:
-                            if asyncio.iscoroutinefunction(handler):
-                                await handler(channel, data)
+                            if decoder is None:
+                                data = from_json(data_str)
                             else:
-                                handler(channel, data)
-                        except Exception as e:
-                            logger.error(f"Error in handler for {channel}: {e}")
+                                data = decoder(channel, data_str)
+                        except ValueError as e:
+                            logger.warning(f"Invalid payload from {channel}: {e}")
+                            continue
+
+                        calls.extend(
+                            self._dispatch(handler, is_async, channel, data)
+                            for handler, is_async in subscribers
+                        )
+                        called = subscribers
+
+                    # Call all handlers concurrently so one slow handler
+                    # does not delay the others
+                    if len(calls) == 1:
+                        await calls[0]
+                    elif calls:
+                        await asyncio.gather(*calls)
 
                 except Exception as e:
                     logger.error(f"Error processing message: {e}")
@@ -247,6 +481,62 @@ class RedisPubSubClient:
         finally:
             logger.info("Redis Pub/Sub listener stopped")
 
+    def _take_queued(self, limit: int) -> List[Optional[Publish]]:
+        """Remove up to ``limit`` queued publishes without waiting"""
+        items: List[Optional[Publish]] = []
+        while len(items) < limit and not self._publish_queue.empty():
+            items.append(self._publish_queue.get_nowait())
+        return items
+
+    async def _publish_queued(self, items: List[Optional[Publish]]):
+        """Publish a batch taken from the queue, skipping the stop marker"""
+        batch = [item for item in items if item is not None]
+        try:
+            await self.publish_many(batch)
+        except Exception as e:
+            logger.error(f"Error publishing {len(batch)} queued messages: {e}")
+
+    async def _drain_publishes(self):
+        """
+        Send queued publishes in batches.
+
+        Each batch is whatever has queued up, up to PUBLISH_BATCH_SIZE, so
+        batches grow while a previous batch is in flight and a lone
+        message is sent without waiting for others. Returns after sending
+        the batch that holds the None stop marker put by disconnect().
+        """
+        while True:
+            items = [await self._publish_queue.get()]
+            items.extend(self._take_queued(PUBLISH_BATCH_SIZE - 1))
+
+            await self._publish_queued(items)
+            if None in items:
+                return
+
+    async def _dispatch(
+        self,
+        handler: Callable[[str, Any], Any],
+        is_async: bool,
+        channel: str,
+        data: Any,
+    ):
+        """
+        Call one handler, logging rather than raising its errors.
+
+        Args:
+            handler: Async or sync callback function(channel, message)
+            is_async: Whether the handler is a coroutine function
+            channel: Channel the message arrived on
+            data: Parsed message data
+        """
+        try:
+            if is_async:
+                await handler(channel, data)
+            else:
+                handler(channel, data)
+        except Exception as e:
+            logger.error(f"Error in handler for {channel}: {e}")
+
     def is_connected(self) -> bool:
         """Check if connected to Redis"""
         return self._redis is not None
@@ -255,6 +545,11 @@ class RedisPubSubClient:
         """Get total number of subscribed channels"""
         return len(self._subscribers)
 
+    def get_message_count(self, channel: str) -> int:
+        """Get number of messages received for a subscribed channel or pattern"""
+        state = self._subscribers.get(channel)
+        return state.message_count if state else 0
+
 
 # Global Redis Pub/Sub instance
 redis_pubsub = RedisPubSubClient()
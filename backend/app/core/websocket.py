@@ -1,23 +1,155 @@
 """WebSocket connection manager with Redis Pub/Sub support"""
 
 import asyncio
+import sys
 import uuid
-from collections import defaultdict
+from collections import OrderedDict, defaultdict, deque
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Set, Union
+from typing import (
+    Any,
+    Deque,
+    Dict,
+    Iterable,
+    KeysView,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
 
 from fastapi import WebSocket, WebSocketDisconnect
+from fastapi.websockets import WebSocketState
+from pydantic_core import from_json
 
 from app.core.logging import logger
 from app.schemas.websocket import (
+    Alert,
     BatchMessage,
     ConnectionInfo,
     ErrorMessage,
+    MarketStatus,
+    MessageType,
+    NotificationMessage,
+    OrderBookUpdate,
     PongMessage,
+    PriceUpdate,
     SubscriptionType,
     WebSocketMessage,
 )
 
+# Concrete schema for each message type published through Redis, so
+# forwarded messages keep their type-specific fields
+_REDIS_MESSAGE_MODELS: Dict[str, Type[WebSocketMessage]] = {
+    MessageType.PRICE_UPDATE: PriceUpdate,
+    MessageType.ORDERBOOK_UPDATE: OrderBookUpdate,
+    MessageType.MARKET_STATUS: MarketStatus,
+    MessageType.ALERT: Alert,
+    MessageType.NOTIFICATION: NotificationMessage,
+}
+
+# Schema published on each channel subtype ({type}:{target}:{subtype}), so
+# those payloads can be validated straight from JSON
+_REDIS_CHANNEL_MODELS: Dict[str, Type[WebSocketMessage]] = {
+    "price": PriceUpdate,
+    "orderbook": OrderBookUpdate,
+    "status": MarketStatus,
+}
+
+# Shared empty bucket returned for targets without subscribers
+_NO_SUBSCRIBERS: Dict[str, None] = {}
+
+# Per-flush-tick cache of encoded frames: id(message) -> (message, frame).
+# Holding the message keeps its id from being reused within the tick.
+FrameCache = Dict[int, Tuple[WebSocketMessage, str]]
+
+
+def _decode_redis_message(channel: str, raw: str) -> WebSocketMessage:
+    """
+    Decode a Redis payload into its schema model.
+
+    Payloads on known channel subtypes are validated from JSON in one
+    pydantic-core pass, without building an intermediate dict.
+
+    Raises:
+        ValueError: If the payload is not valid JSON for its schema
+    """
+    model = _REDIS_CHANNEL_MODELS.get(channel.rpartition(":")[2])
+    if model is not None:
+        return model.model_validate_json(raw)
+
+    return _validate_redis_data(from_json(raw))
+
+
+def _validate_redis_data(data: Any) -> WebSocketMessage:
+    """
+    Validate parsed Redis data against the schema for its message type.
+
+    Raises:
+        ValueError: If the data is not a JSON object valid for its schema
+    """
+    if not isinstance(data, dict):
+        raise ValueError(f"Expected a JSON object, got {type(data).__name__}")
+
+    model = _REDIS_MESSAGE_MODELS.get(data.get("type", ""), WebSocketMessage)
+    return model.model_validate(data)
+
+
+def _encode(message: WebSocketMessage) -> str:
+    """Serialize a message to a JSON text frame in a single pydantic-core pass"""
+    return message.model_dump_json()
+
+
+def _encode_shared(message: WebSocketMessage, frames: Optional[FrameCache]) -> str:
+    """Encode a message, reusing a frame another connection already built"""
+    if frames is None:
+        return _encode(message)
+    cached = frames.get(id(message))
+    if cached is None:
+        cached = frames[id(message)] = (message, _encode(message))
+    return cached[1]
+
+
+def _encode_batch(
+    messages: List[WebSocketMessage], sequence: int, frames: Optional[FrameCache]
+) -> str:
+    """
+    Encode a BatchMessage frame around the messages' own frames.
+
+    Serializing BatchMessage directly would re-encode every message for each
+    connection, and only with the base WebSocketMessage fields. Splicing the
+    per-message frames keeps each subclass payload and lets connections of
+    one flush tick share the encoding of common messages.
+    """
+    envelope = BatchMessage.model_construct(
+        messages=[], batch_size=len(messages), sequence=sequence
+    ).model_dump_json(exclude={"messages", "batch_size"})
+    body = ",".join(_encode_shared(message, frames) for message in messages)
+    return f'{envelope[:-1]},"messages":[{body}],"batch_size":{len(messages)}}}'
+
+
+def _is_closed(websocket: WebSocket) -> bool:
+    """Whether either side of the socket has already been closed"""
+    return (
+        websocket.client_state is WebSocketState.DISCONNECTED
+        or websocket.application_state is WebSocketState.DISCONNECTED
+    )
+
+
+# Subscription types with few targets and many subscribers (market-wide
+# pushes). Their messages are encoded once and fanned out as one shared frame.
+FANOUT_TYPES = frozenset({SubscriptionType.MARKET})
+
+# Default cap on messages queued for one connection between batch flushes.
+# A client that cannot keep up loses its oldest updates instead of growing
+# the queue without bound.
+MAX_PENDING_MESSAGES = 256
+
+# Default cap on sessions kept for reconnection. Under connection churn the
+# oldest saved sessions are evicted first, before their TTL runs out.
+MAX_SAVED_SESSIONS = 10_000
+
 
 class ConnectionManager:
     """
@@ -38,6 +170,9 @@ class ConnectionManager:
         enable_rate_limiting: bool = True,
         rate_limit: int = 100,  # messages per second per connection
         max_connections_per_ip: int = 5,  # max concurrent connections per IP
+        enable_heartbeat: bool = True,
+        max_pending_messages: int = MAX_PENDING_MESSAGES,
+        max_saved_sessions: int = MAX_SAVED_SESSIONS,
     ):
         """
         Initialize connection manager.
@@ -49,6 +184,12 @@ class ConnectionManager:
             enable_rate_limiting: Enable per-connection rate limiting (Phase 4)
             rate_limit: Max messages per second per connection (Phase 4)
             max_connections_per_ip: Max concurrent WebSocket connections per IP
+            enable_heartbeat: Send periodic heartbeat frames to detect dead
+                connections (disable for deterministic message streams in tests)
+            max_pending_messages: Max messages queued per connection between
+                batch flushes; the oldest are dropped on overflow (Phase 4)
+            max_saved_sessions: Max disconnected sessions kept for
+                reconnection; the oldest are evicted on overflow (Phase 3)
         """
         # Active connections: connection_id -> WebSocket
         self.active_connections: Dict[str, WebSocket] = {}
@@ -60,12 +201,18 @@ class ConnectionManager:
         self._connections_by_ip: Dict[str, Set[str]] = defaultdict(set)
         self._max_connections_per_ip = max_connections_per_ip
 
-        # Subscriptions: subscription_type -> target -> Set[connection_id]
-        # Example: {"stock": {"005930": {"conn1", "conn2"}}}
-        self.subscriptions: Dict[SubscriptionType, Dict[str, Set[str]]] = defaultdict(
-            lambda: defaultdict(set)
+        # Subscriptions: subscription_type -> target -> {connection_id: None}
+        # Example: {"stock": {"005930": {"conn1": None, "conn2": None}}}
+        # Dict buckets keep fan-out in subscription order and let
+        # get_subscribers() hand out a key view instead of copying a set.
+        self.subscriptions: Dict[SubscriptionType, Dict[str, Dict[str, None]]] = (
+            defaultdict(lambda: defaultdict(dict))
         )
 
+        # Subscriber counts per type, kept in step with the map above so
+        # get_stats() does not walk every bucket
+        self._subscription_counts: Dict[SubscriptionType, int] = defaultdict(int)
+
         # Reverse index: connection_id -> Dict[subscription_type, Set[targets]]
         # For fast unsubscribe on disconnect
         self.connection_subscriptions: Dict[str, Dict[SubscriptionType, Set[str]]] = (
@@ -74,9 +221,9 @@ class ConnectionManager:
 
         # Message sequence counter for ordering
         self._sequence_counter = 0
-        self._sequence_lock = asyncio.Lock()
 
         # Heartbeat task
+        self._enable_heartbeat = enable_heartbeat
         self._heartbeat_task: Optional[asyncio.Task] = None
         self._heartbeat_interval = 30  # seconds
 
@@ -86,17 +233,25 @@ class ConnectionManager:
         self._redis_channels: Set[str] = set()  # Track subscribed Redis channels
 
         # Phase 3: Session restoration support
-        # Store disconnected session info for 5 minutes to allow reconnection
-        self._disconnected_sessions: Dict[str, Dict[str, Any]] = {}
+        # Store disconnected session info for 5 minutes to allow reconnection.
+        # Kept in save order, oldest first, so eviction and expiry scans
+        # only touch the front of the map.
+        self._disconnected_sessions: OrderedDict[str, Dict[str, Any]] = OrderedDict()
         self._session_ttl = 300  # seconds (5 minutes)
+        self._max_saved_sessions = max_saved_sessions
         self._session_cleanup_task: Optional[asyncio.Task] = None
 
         # Phase 4: Message batching
         self._enable_batching = enable_batching
         self._batch_interval = batch_interval
-        self._message_queues: Dict[str, List[WebSocketMessage]] = defaultdict(list)
+        self._max_pending_messages = max_pending_messages
+        self._message_queues: Dict[str, Deque[WebSocketMessage]] = defaultdict(
+            lambda: deque(maxlen=self._max_pending_messages)
+        )
         self._batch_task: Optional[asyncio.Task] = None
         self._batch_lock = asyncio.Lock()
+        # In-flight flush per connection: connection_id -> Task
+        self._flush_tasks: Dict[str, asyncio.Task] = {}
 
         # Phase 4: Rate limiting
         self._enable_rate_limiting = enable_rate_limiting
@@ -124,10 +279,13 @@ class ConnectionManager:
             self._enable_redis = False
 
     async def _next_sequence(self) -> int:
-        """Get next message sequence number (thread-safe)"""
-        async with self._sequence_lock:
-            self._sequence_counter += 1
-            return self._sequence_counter
+        """Get next message sequence number.
+
+        The increment has no await point, so it cannot interleave with other
+        coroutines on the event loop and needs no lock.
+        """
+        self._sequence_counter += 1
+        return self._sequence_counter
 
     async def _check_rate_limit(self, connection_id: str) -> bool:
         """
@@ -171,39 +329,46 @@ class ConnectionManager:
             if message.sequence is None:
                 message.sequence = await self._next_sequence()
 
-            self._message_queues[connection_id].append(message)
+            queue = self._message_queues[connection_id]
+            if len(queue) == queue.maxlen:
+                # Slow consumer: the bounded deque drops the oldest message
+                logger.debug(
+                    f"Send queue full for {connection_id}, dropping oldest message"
+                )
+            queue.append(message)
 
-    async def _flush_batch(self, connection_id: str):
+    async def _flush_batch(
+        self, connection_id: str, frames: Optional[FrameCache] = None
+    ):
         """
         Flush batched messages for a connection (Phase 4).
 
         Args:
             connection_id: Connection to flush
+            frames: Frame cache shared by all flushes of one tick, so a
+                message queued for many connections is encoded only once
         """
         websocket = self.active_connections.get(connection_id)
         if not websocket:
             return
 
         async with self._batch_lock:
-            messages = self._message_queues.get(connection_id, [])
-            if not messages:
+            queue = self._message_queues.get(connection_id)
+            if not queue:
                 return
 
-            # Clear queue
-            self._message_queues[connection_id] = []
+            # Take the queued messages and clear the queue
+            messages = list(queue)
+            queue.clear()
 
         try:
             if len(messages) == 1:
                 # Single message: send directly
-                await websocket.send_json(messages[0].model_dump(mode="json"))
+                await websocket.send_text(_encode_shared(messages[0], frames))
             else:
                 # Multiple messages: send as batch
-                batch = BatchMessage(
-                    messages=messages,
-                    batch_size=len(messages),
-                )
-                batch.sequence = await self._next_sequence()
-                await websocket.send_json(batch.model_dump(mode="json"))
+                sequence = await self._next_sequence()
+                await websocket.send_text(_encode_batch(messages, sequence, frames))
 
             # Update activity timestamp
             if connection_id in self.connection_info:
@@ -224,6 +389,11 @@ class ConnectionManager:
     async def _batch_flush_loop(self):
         """
         Periodic batch flushing loop (Phase 4).
+
+        Each connection is flushed in its own task and the loop does not wait
+        for the writes. A client whose previous flush is still blocked on
+        transport back-pressure is skipped, so it cannot stall delivery to
+        the others; its messages stay queued and go out in a later batch.
         """
         logger.info(
             f"Starting batch flush loop (interval: {self._batch_interval * 1000:.0f}ms)"
@@ -233,14 +403,19 @@ class ConnectionManager:
             while self.active_connections:
                 await asyncio.sleep(self._batch_interval)
 
-                # Flush all connections with queued messages
-                flush_tasks = []
-                for conn_id in list(self.active_connections.keys()):
-                    if self._message_queues.get(conn_id):
-                        flush_tasks.append(self._flush_batch(conn_id))
-
-                if flush_tasks:
-                    await asyncio.gather(*flush_tasks, return_exceptions=True)
+                # Flush all connections with queued messages, sharing frames
+                # of broadcast messages across connections. Nothing below
+                # awaits, so the queue map can be walked without a copy.
+                frames: FrameCache = {}
+                for conn_id, queue in self._message_queues.items():
+                    if not queue:
+                        continue
+                    in_flight = self._flush_tasks.get(conn_id)
+                    if in_flight is not None and not in_flight.done():
+                        continue
+                    self._flush_tasks[conn_id] = asyncio.create_task(
+                        self._flush_batch(conn_id, frames)
+                    )
 
         except asyncio.CancelledError:
             logger.info("Batch flush loop cancelled")
@@ -248,7 +423,9 @@ class ConnectionManager:
         except Exception as e:
             logger.error(f"Error in batch flush loop: {e}")
 
-    async def _handle_redis_message(self, channel: str, data: Dict[str, Any]):
+    async def _handle_redis_message(
+        self, channel: str, data: Union[WebSocketMessage, Dict[str, Any]]
+    ):
         """
         Handle incoming message from Redis Pub/Sub.
 
@@ -256,7 +433,7 @@ class ConnectionManager:
 
         Args:
             channel: Redis channel name (e.g., "stock:005930:price")
-            data: Message data
+            data: Message decoded by _decode_redis_message, or raw message data
         """
         try:
             # Parse channel to determine subscription type and target
@@ -288,7 +465,10 @@ class ConnectionManager:
 
             # Create WebSocket message from Redis data
             # Data should already have correct schema from publisher
-            message = WebSocketMessage(**data)
+            if isinstance(data, WebSocketMessage):
+                message = data
+            else:
+                message = _validate_redis_data(data)
 
             # Send to all subscribers
             await self.send_to_subscribers(
@@ -371,8 +551,10 @@ class ConnectionManager:
             f"total: {len(self.active_connections)})"
         )
 
-        # Start heartbeat if not running
-        if self._heartbeat_task is None or self._heartbeat_task.done():
+        # Start heartbeat if enabled and not running
+        if self._enable_heartbeat and (
+            self._heartbeat_task is None or self._heartbeat_task.done()
+        ):
             self._heartbeat_task = asyncio.create_task(self._heartbeat_loop())
 
         # Phase 4: Start batch flush loop if enabled and not running
@@ -390,25 +572,60 @@ class ConnectionManager:
         Args:
             connection_id: Connection to disconnect
         """
-        # Phase 3: Save session before disconnecting (for reconnection)
-        await self._save_session(connection_id)
+        await self.disconnect_many((connection_id,))
+
+    async def disconnect_many(self, connection_ids: Iterable[str]):
+        """
+        Disconnect and clean up several WebSocket connections in one pass.
+
+        Background tasks are checked once after all connections are removed,
+        rather than after each one.
+
+        Args:
+            connection_ids: Connections to disconnect
+        """
+        for connection_id in connection_ids:
+            # Phase 3: Save session before disconnecting (for reconnection)
+            await self._save_session(connection_id)
+            self._remove_connection(connection_id)
+
+        # Stop tasks if no connections
+        if not self.active_connections:
+            if self._heartbeat_task:
+                self._heartbeat_task.cancel()
+                self._heartbeat_task = None
+            if self._batch_task:
+                self._batch_task.cancel()
+                self._batch_task = None
+            for task in self._flush_tasks.values():
+                task.cancel()
+            self._flush_tasks.clear()
+
+    def _remove_connection(self, connection_id: str):
+        """
+        Drop all state held for a connection.
 
+        Args:
+            connection_id: Connection to remove
+        """
         # Remove from active connections
         if connection_id in self.active_connections:
             del self.active_connections[connection_id]
 
-        # Clean up subscriptions
-        if connection_id in self.connection_subscriptions:
-            for sub_type, targets in self.connection_subscriptions[
-                connection_id
-            ].items():
+        # Clean up subscriptions, walking only this connection's targets
+        connection_subs = self.connection_subscriptions.pop(connection_id, None)
+        if connection_subs:
+            for sub_type, targets in connection_subs.items():
+                buckets = self.subscriptions[sub_type]
                 for target in targets:
-                    self.subscriptions[sub_type][target].discard(connection_id)
-                    # Clean up empty subscription sets to prevent memory leak
-                    if not self.subscriptions[sub_type][target]:
-                        del self.subscriptions[sub_type][target]
-
-            del self.connection_subscriptions[connection_id]
+                    bucket = buckets.get(target)
+                    if bucket is None or connection_id not in bucket:
+                        continue
+                    del bucket[connection_id]
+                    self._subscription_counts[sub_type] -= 1
+                    # Clean up empty subscription buckets to prevent memory leak
+                    if not bucket:
+                        del buckets[target]
 
         # Remove connection info and clean up IP tracking
         info = self.connection_info.pop(connection_id, None)
@@ -429,20 +646,20 @@ class ConnectionManager:
         # Phase 4: Clean up batching and rate limiting data
         if connection_id in self._message_queues:
             del self._message_queues[connection_id]
+        # Cancel a flush still blocked on this client, unless it is the
+        # flush that is disconnecting it
+        flush_task = self._flush_tasks.pop(connection_id, None)
+        if flush_task is not None and flush_task is not asyncio.current_task():
+            flush_task.cancel()
         if connection_id in self._message_timestamps:
             del self._message_timestamps[connection_id]
 
-        # Stop tasks if no connections
-        if not self.active_connections:
-            if self._heartbeat_task:
-                self._heartbeat_task.cancel()
-                self._heartbeat_task = None
-            if self._batch_task:
-                self._batch_task.cancel()
-                self._batch_task = None
-
     async def send_message(
-        self, connection_id: str, message: WebSocketMessage, immediate: bool = False
+        self,
+        connection_id: str,
+        message: WebSocketMessage,
+        immediate: bool = False,
+        frames: Optional[FrameCache] = None,
     ) -> bool:
         """
         Send a message to a specific connection.
@@ -454,6 +671,8 @@ class ConnectionManager:
             connection_id: Target connection
             message: Message to send
             immediate: Send immediately without batching (for critical messages)
+            frames: Frame cache shared by the sends of one broadcast, so the
+                message is encoded once when it is sent without batching
 
         Returns:
             True if sent successfully, False otherwise
@@ -462,6 +681,12 @@ class ConnectionManager:
         if not websocket:
             return False
 
+        # Drop sockets Starlette already knows are closed without raising
+        # and unwinding a WebSocketDisconnect from the send
+        if _is_closed(websocket):
+            await self.disconnect(connection_id)
+            return False
+
         # Phase 4: Check rate limit (skip for error messages to avoid recursion)
         if self._enable_rate_limiting and not isinstance(message, ErrorMessage):
             if not await self._check_rate_limit(connection_id):
@@ -489,21 +714,13 @@ class ConnectionManager:
             if message.sequence is None:
                 message.sequence = await self._next_sequence()
 
-            # Assuming message has a 'type' attribute for ping/pong handling
-            # If message.type is not available, this will raise an AttributeError
-            # and the original send_json will be executed in the `else` block.
-            if hasattr(message, "type"):
-                message_type = message.type
-                if message_type == "ping":
-                    await websocket.send_json(
-                        {"type": "pong", "timestamp": datetime.utcnow().isoformat()}
-                    )
-                else:
-                    # Send as JSON
-                    await websocket.send_json(message.model_dump(mode="json"))
+            if message.type == "ping":
+                await websocket.send_json(
+                    {"type": "pong", "timestamp": datetime.utcnow().isoformat()}
+                )
             else:
-                # Send as JSON if no 'type' attribute
-                await websocket.send_json(message.model_dump(mode="json"))
+                # Serialize straight to a JSON text frame in one pass
+                await websocket.send_text(_encode_shared(message, frames))
 
             # Update activity timestamp
             if connection_id in self.connection_info:
@@ -517,8 +734,6 @@ class ConnectionManager:
             await self.disconnect(connection_id)
             return False
 
-            return False
-
         except Exception as e:
             logger.error(f"Error sending message to {connection_id}: {e}")
             return False
@@ -568,8 +783,13 @@ class ConnectionManager:
                     type=msg_type, payload=message.get("payload")
                 )
 
-        for conn_id in target_connections:
-            await self.send_message(conn_id, ws_message, immediate=True)
+        await asyncio.gather(
+            *(
+                self.send_message(conn_id, ws_message, immediate=True)
+                for conn_id in target_connections
+            ),
+            return_exceptions=True,
+        )
 
     async def send_error(
         self,
@@ -626,9 +846,10 @@ class ConnectionManager:
         """
         exclude = exclude or set()
 
-        # Send to all connections
+        # Send to all connections, encoding the shared message once
+        frames: FrameCache = {}
         send_tasks = [
-            self.send_message(conn_id, message)
+            self.send_message(conn_id, message, frames=frames)
             for conn_id in self.active_connections.keys()
             if conn_id not in exclude
         ]
@@ -650,16 +871,86 @@ class ConnectionManager:
             target: Subscription target (stock code, market, etc.)
             message: Message to send
         """
-        subscribers = self.subscriptions[subscription_type].get(target, set())
+        if subscription_type in FANOUT_TYPES:
+            await self.broadcast_fanout(subscription_type, target, message)
+            return
+
+        subscribers = self.subscriptions[subscription_type].get(target)
 
         if not subscribers:
             return
 
-        # Send to all subscribers
-        send_tasks = [self.send_message(conn_id, message) for conn_id in subscribers]
+        # Send to all subscribers, encoding the shared message once
+        frames: FrameCache = {}
+        send_tasks = [
+            self.send_message(conn_id, message, frames=frames)
+            for conn_id in subscribers
+        ]
 
         await asyncio.gather(*send_tasks, return_exceptions=True)
 
+    async def broadcast_fanout(
+        self,
+        subscription_type: SubscriptionType,
+        target: str,
+        message: WebSocketMessage,
+    ) -> int:
+        """
+        Send one shared frame to every subscriber of a fan-out target.
+
+        The message is sequenced and serialized once, and the same text frame
+        is written to each subscriber immediately, bypassing the per-connection
+        batching and rate limiting of send_message().
+
+        Args:
+            subscription_type: Type of subscription
+            target: Subscription target (e.g., market name)
+            message: Message to send
+
+        Returns:
+            Number of connections the frame was delivered to
+        """
+        subscribers = self.subscriptions[subscription_type].get(target)
+        if not subscribers:
+            return 0
+
+        if message.sequence is None:
+            message.sequence = await self._next_sequence()
+        frame = message.model_dump_json()
+
+        # One dict probe per subscriber; this loop runs for every tick
+        lookup = self.active_connections.get
+        recipients = [
+            (conn_id, websocket)
+            for conn_id in subscribers
+            if (websocket := lookup(conn_id)) is not None
+        ]
+        results = await asyncio.gather(
+            *(websocket.send_text(frame) for _, websocket in recipients),
+            return_exceptions=True,
+        )
+
+        delivered = 0
+        now = datetime.utcnow()
+        dead_connections = []
+        for (conn_id, _), result in zip(recipients, results):
+            if isinstance(result, WebSocketDisconnect):
+                logger.warning(f"Connection {conn_id} disconnected during fan-out")
+                dead_connections.append(conn_id)
+            elif isinstance(result, Exception):
+                logger.error(f"Error sending fan-out frame to {conn_id}: {result}")
+            else:
+                delivered += 1
+                info = self.connection_info.get(conn_id)
+                if info:
+                    info.last_activity = now
+                    info.message_count += 1
+
+        if dead_connections:
+            await self.disconnect_many(dead_connections)
+
+        return delivered
+
     async def subscribe(
         self, connection_id: str, subscription_type: SubscriptionType, target: str
     ):
@@ -673,26 +964,58 @@ class ConnectionManager:
             subscription_type: Type of subscription
             target: Subscription target
         """
-        # Add to subscriptions
-        self.subscriptions[subscription_type][target].add(connection_id)
+        await self.subscribe_many(connection_id, subscription_type, (target,))
 
-        # Add to reverse index
-        self.connection_subscriptions[connection_id][subscription_type].add(target)
+    async def subscribe_many(
+        self,
+        connection_id: str,
+        subscription_type: SubscriptionType,
+        targets: Iterable[str],
+    ):
+        """
+        Subscribe a connection to several targets of one type.
 
-        # Update connection info
-        if connection_id in self.connection_info:
-            info = self.connection_info[connection_id]
-            if subscription_type not in info.subscriptions:
-                info.subscriptions[subscription_type] = []
-            if target not in info.subscriptions[subscription_type]:
-                info.subscriptions[subscription_type].append(target)
+        subscribe() delegates here, so both share one code path. The
+        subscription maps and connection info are looked up once for the
+        whole request.
 
-        # Subscribe to Redis channel if this is the first subscriber
-        if self._enable_redis and self._redis_initialized:
-            await self._subscribe_redis_channel(subscription_type, target)
+        Args:
+            connection_id: Connection to subscribe
+            subscription_type: Type of subscription
+            targets: Subscription targets
+        """
+        buckets = self.subscriptions[subscription_type]
+        subscribed = self.connection_subscriptions[connection_id][subscription_type]
+        info = self.connection_info.get(connection_id)
+        info_targets = (
+            info.subscriptions.setdefault(subscription_type, []) if info else None
+        )
+        redis_enabled = self._enable_redis and self._redis_initialized
+
+        count = 0
+        for target in targets:
+            # Intern the target so every index shares one string per code
+            target = sys.intern(target)
+
+            # Add to subscriptions
+            bucket = buckets[target]
+            if connection_id not in bucket:
+                bucket[connection_id] = None
+                self._subscription_counts[subscription_type] += 1
+
+            # Add to reverse index and connection info
+            subscribed.add(target)
+            if info_targets is not None and target not in info_targets:
+                info_targets.append(target)
+
+            # Subscribe to Redis channel if this is the first subscriber
+            if redis_enabled:
+                await self._subscribe_redis_channel(subscription_type, target)
+            count += 1
 
         logger.debug(
-            f"Subscribed {connection_id} to {subscription_type.value}:{target}"
+            f"Subscribed {connection_id} to {count} "
+            f"{subscription_type.value} target(s)"
         )
 
     async def _subscribe_redis_channel(
@@ -730,6 +1053,7 @@ class ConnectionManager:
             await redis_pubsub.subscribe(
                 channel_pattern,
                 self._handle_redis_message,
+                decoder=_decode_redis_message,
             )
 
             self._redis_channels.add(channel_pattern)
@@ -750,14 +1074,23 @@ class ConnectionManager:
             subscription_type: Type of subscription
             target: Subscription target
         """
-        # Remove from subscriptions
-        self.subscriptions[subscription_type][target].discard(connection_id)
-        # Clean up empty subscription sets to prevent memory leak
-        if not self.subscriptions[subscription_type][target]:
-            del self.subscriptions[subscription_type][target]
+        # Remove from subscriptions. Plain lookups keep the defaultdicts from
+        # creating entries for unknown targets or connections.
+        buckets = self.subscriptions[subscription_type]
+        bucket = buckets.get(target)
+        if bucket is not None and connection_id in bucket:
+            del bucket[connection_id]
+            self._subscription_counts[subscription_type] -= 1
+            # Clean up empty subscription buckets to prevent memory leak
+            if not bucket:
+                del buckets[target]
 
         # Remove from reverse index
-        self.connection_subscriptions[connection_id][subscription_type].discard(target)
+        connection_subs = self.connection_subscriptions.get(connection_id)
+        if connection_subs is not None:
+            targets = connection_subs.get(subscription_type)
+            if targets is not None:
+                targets.discard(target)
 
         # Update connection info
         if connection_id in self.connection_info:
@@ -774,7 +1107,7 @@ class ConnectionManager:
 
     def get_subscribers(
         self, subscription_type: SubscriptionType, target: str
-    ) -> Set[str]:
+    ) -> KeysView[str]:
         """
         Get all subscribers for a specific target.
 
@@ -783,9 +1116,10 @@ class ConnectionManager:
             target: Subscription target
 
         Returns:
-            Set of connection IDs
+            Live, set-like view of connection IDs (copy it before subscribing
+            or unsubscribing while iterating)
         """
-        return self.subscriptions[subscription_type].get(target, set()).copy()
+        return self.subscriptions[subscription_type].get(target, _NO_SUBSCRIBERS).keys()
 
     def get_connection_info(self, connection_id: str) -> Optional[ConnectionInfo]:
         """
@@ -811,20 +1145,24 @@ class ConnectionManager:
             while self.active_connections:
                 await asyncio.sleep(self._heartbeat_interval)
 
-                # Send ping to all connections
-                dead_connections = []
-
-                for conn_id, websocket in self.active_connections.items():
-                    try:
-                        ping_msg = PongMessage()
-                        await websocket.send_json(ping_msg.model_dump(mode="json"))
-                    except Exception as e:
-                        logger.warning(f"Heartbeat failed for {conn_id}: {e}")
-                        dead_connections.append(conn_id)
+                # Ping all connections concurrently, so one slow socket does
+                # not hold back the rest of the tick. The frame is encoded
+                # once per tick; send_json() would re-encode it per socket.
+                ping = _encode(PongMessage())
+                targets = list(self.active_connections.items())
+                results = await asyncio.gather(
+                    *(websocket.send_text(ping) for _, websocket in targets),
+                    return_exceptions=True,
+                )
 
                 # Clean up dead connections
-                for conn_id in dead_connections:
-                    await self.disconnect(conn_id)
+                dead_connections = []
+                for (conn_id, _), result in zip(targets, results):
+                    if isinstance(result, Exception):
+                        logger.warning(f"Heartbeat failed for {conn_id}: {result}")
+                        dead_connections.append(conn_id)
+                if dead_connections:
+                    await self.disconnect_many(dead_connections)
 
         except asyncio.CancelledError:
             logger.info("WebSocket heartbeat loop cancelled")
@@ -859,6 +1197,12 @@ class ConnectionManager:
         }
 
         self._disconnected_sessions[connection_id] = session_data
+        self._disconnected_sessions.move_to_end(connection_id)
+
+        # Evict the oldest sessions once the cap is exceeded
+        while len(self._disconnected_sessions) > self._max_saved_sessions:
+            evicted_id, _ = self._disconnected_sessions.popitem(last=False)
+            logger.debug(f"Evicted saved session {evicted_id} (limit reached)")
 
         logger.info(
             f"Saved session {connection_id} for reconnection "
@@ -909,11 +1253,8 @@ class ConnectionManager:
 
         for sub_type_str, targets in subscriptions.items():
             sub_type = SubscriptionType(sub_type_str)
-            restored_subscriptions[sub_type] = []
-
-            for target in targets:
-                await self.subscribe(new_connection_id, sub_type, target)
-                restored_subscriptions[sub_type].append(target)
+            await self.subscribe_many(new_connection_id, sub_type, targets)
+            restored_subscriptions[sub_type] = list(targets)
 
         # Calculate missed messages
         last_sequence = session_data.get("last_sequence", 0)
@@ -943,12 +1284,14 @@ class ConnectionManager:
                 now = datetime.utcnow()
                 expired = []
 
+                # Sessions are stored oldest first; stop at the first live one
                 for session_id, session_data in self._disconnected_sessions.items():
                     saved_at = session_data["saved_at"]
                     age = (now - saved_at).total_seconds()
 
-                    if age > self._session_ttl:
-                        expired.append(session_id)
+                    if age <= self._session_ttl:
+                        break
+                    expired.append(session_id)
 
                 # Remove expired sessions
                 for session_id in expired:
@@ -971,11 +1314,7 @@ class ConnectionManager:
         Returns:
             Dictionary with statistics
         """
-        total_subscriptions = sum(
-            len(targets)
-            for sub_type in self.subscriptions.values()
-            for targets in sub_type.values()
-        )
+        total_subscriptions = sum(self._subscription_counts.values())
 
         # Phase 4: Batching stats
         total_queued = sum(len(q) for q in self._message_queues.values())
@@ -987,8 +1326,8 @@ class ConnectionManager:
             "active_connections": len(self.active_connections),
             "total_subscriptions": total_subscriptions,
             "subscriptions_by_type": {
-                sub_type.value: sum(len(subs) for subs in targets.values())
-                for sub_type, targets in self.subscriptions.items()
+                sub_type.value: count
+                for sub_type, count in self._subscription_counts.items()
             },
             "messages_sent": self._sequence_counter,
             "saved_sessions": len(self._disconnected_sessions),  # Phase 3
@@ -63,6 +63,7 @@ from app.core.exceptions import AppException
 from app.core.logging import logger
 from app.middleware.logging import LoggingMiddleware
 from app.middleware.metrics import PrometheusMetricsMiddleware
+from app.middleware.query_validation import QueryValidationMiddleware
 from app.middleware.rate_limit import RateLimitMiddleware
 
 
@@ -184,6 +185,9 @@ app = FastAPI(
 # MIDDLEWARE
 # ============================================================================
 
+# Early enum query validation (innermost, so 422s still get CORS/logging)
+app.add_middleware(QueryValidationMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -0,0 +1,110 @@
+"""Early query parameter validation for enum-style parameters.
+
+Requests with an out-of-range enum value (e.g. ``/v1/market/movers?type=bad``)
+would otherwise pass through the full dependency graph (database session,
+cache, service construction) before FastAPI's own Query validation rejects
+them. This middleware checks those parameters straight from the raw query
+string and short-circuits with the same 422 body as the global
+``validation_exception_handler``.
+
+FastAPI's ``Query(pattern=...)`` declarations remain the source of truth for
+OpenAPI and act as a second line of defence; keep ``ENDPOINT_QUERY_CHOICES``
+in sync with them.
+"""
+
+import json
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qsl
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+_MARKETS = ("KOSPI", "KOSDAQ", "ALL")
+
+# Allowed values per endpoint path and query parameter name
+ENDPOINT_QUERY_CHOICES: Dict[str, Dict[str, Tuple[str, ...]]] = {
+    "/v1/market/trend": {
+        "index": ("KOSPI", "KOSDAQ", "KRX100"),
+        "timeframe": ("1D", "5D", "1M", "3M", "6M", "1Y"),
+    },
+    "/v1/market/breadth": {"market": _MARKETS},
+    "/v1/market/sectors": {
+        "timeframe": ("1D", "1W", "1M", "3M"),
+        "market": _MARKETS,
+    },
+    "/v1/market/movers": {"type": ("gainers", "losers"), "market": _MARKETS},
+    "/v1/market/active": {"metric": ("volume", "value"), "market": _MARKETS},
+}
+
+
+class QueryValidationMiddleware:
+    """ASGI middleware rejecting invalid enum query parameters early.
+
+    Implemented as a plain ASGI callable rather than ``BaseHTTPMiddleware``
+    so that requests for other paths pass through with a single dict lookup.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and scope["query_string"]:
+            choices = ENDPOINT_QUERY_CHOICES.get(scope["path"])
+            if choices is not None:
+                body = self._validate(scope["query_string"], choices)
+                if body is not None:
+                    await self._send_error(send, body)
+                    return
+
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    def _validate(
+        query_string: bytes, choices: Dict[str, Tuple[str, ...]]
+    ) -> Optional[bytes]:
+        """Return a serialized 422 body if any parameter is invalid.
+
+        Args:
+            query_string: Raw query string from the ASGI scope
+            choices: Allowed values per parameter name
+
+        Returns:
+            JSON error body, or None when all parameters are valid
+        """
+        # Later values win, matching FastAPI's handling of repeated scalars
+        params = dict(parse_qsl(query_string.decode("latin-1"), True))
+
+        errors = []
+        for name, allowed in choices.items():
+            value = params.get(name)
+            if value is not None and value not in allowed:
+                errors.append(
+                    {
+                        "field": f"query.{name}",
+                        "message": (
+                            f"String should match pattern '^({'|'.join(allowed)})$'"
+                        ),
+                        "type": "string_pattern_mismatch",
+                    }
+                )
+
+        if not errors:
+            return None
+
+        return json.dumps(
+            {"success": False, "message": "Validation error", "detail": errors},
+            separators=(",", ":"),
+        ).encode("utf-8")
+
+    @staticmethod
+    async def _send_error(send: Send, body: bytes) -> None:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 422,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode("latin-1")),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
@@ -294,8 +294,8 @@ class MarketRepository:
             {
                 "code": row.sector,
                 "stock_count": row.stock_count,
-                "market_cap": row.market_cap or 0,
-                "volume": row.total_volume or 0,
+                "market_cap": int(row.market_cap or 0),
+                "volume": int(row.total_volume or 0),
                 "change_percent": round(float(row.avg_change_percent or 0), 2),
             }
             for row in sectors
@@ -1,5 +1,6 @@
 """WebSocket message schemas"""
 
+from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 from typing import Any, Dict, List, Optional
@@ -347,16 +348,21 @@ class FallbackToRestMessage(WebSocketMessage):
 # ============================================================================
 
 
-class ConnectionInfo(BaseModel):
-    """WebSocket connection information"""
+@dataclass(slots=True)
+class ConnectionInfo:
+    """WebSocket connection information
+
+    Internal bookkeeping kept per connection and updated on every send, so
+    it is a slotted dataclass rather than a validated Pydantic model.
+    """
 
     connection_id: str
+    connected_at: datetime
+    last_activity: datetime
     user_id: Optional[str] = None
     client_ip: Optional[str] = None
-    connected_at: datetime
-    subscriptions: Dict[SubscriptionType, List[str]] = Field(default_factory=dict)
+    subscriptions: Dict[SubscriptionType, List[str]] = field(default_factory=dict)
     message_count: int = 0
-    last_activity: datetime
 
 
 # ============================================================================
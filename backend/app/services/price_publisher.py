@@ -4,6 +4,7 @@ import asyncio
 from datetime import datetime
 from typing import Dict, List, Optional
 
+from pydantic import ValidationError
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -29,10 +30,17 @@ class PricePublisher:
     - Supports multiple data sources (KIS API, mock data, etc.)
     """
 
-    def __init__(self):
-        """Initialize price publisher"""
+    def __init__(self, wait_for_publish: bool = False):
+        """
+        Initialize price publisher
+
+        Args:
+            wait_for_publish: Await each price update's Redis publish instead
+                of queueing it for the client's background batches
+        """
         self._running = False
         self._publish_task: Optional[asyncio.Task] = None
+        self._wait_for_publish = wait_for_publish
 
     async def publish_price_update(
         self,
@@ -45,6 +53,9 @@ class PricePublisher:
         """
         Publish a price update to Redis.
 
+        By default the update is queued and this returns without waiting for
+        Redis; see RedisPubSubClient.publish_nowait().
+
         Args:
             stock_code: Stock code (e.g., "005930")
             price: Current price
@@ -66,10 +77,10 @@ class PricePublisher:
 
             # Publish to Redis channel
             channel = f"stock:{stock_code}:price"
-            await redis_pubsub.publish(
-                channel,
-                update.model_dump(mode="json"),
-            )
+            if self._wait_for_publish:
+                await redis_pubsub.publish(channel, update.model_dump_json())
+            elif not redis_pubsub.publish_nowait(channel, update.model_dump_json()):
+                return
 
             logger.debug(
                 f"Published price update for {stock_code}: "
@@ -111,10 +122,7 @@ class PricePublisher:
 
             # Publish to Redis channel
             channel = f"stock:{stock_code}:orderbook"
-            await redis_pubsub.publish(
-                channel,
-                update.model_dump(mode="json"),
-            )
+            await redis_pubsub.publish(channel, update.model_dump_json())
 
             logger.debug(f"Published order book update for {stock_code}")
 
@@ -144,10 +152,7 @@ class PricePublisher:
 
             # Publish to Redis channel
             channel = f"market:{market}:status"
-            await redis_pubsub.publish(
-                channel,
-                update.model_dump(mode="json"),
-            )
+            await redis_pubsub.publish(channel, update.model_dump_json())
 
             logger.info(f"Published market status for {market}: {status}")
 
@@ -161,26 +166,39 @@ class PricePublisher:
         """
         Publish multiple price updates in bulk.
 
+        All updates are sent to Redis in one round-trip.
+
         Args:
             updates: List of price update dicts with keys:
                      stock_code, price, change, change_percent, volume
         """
-        tasks = []
+        now = datetime.utcnow()
+        items = []
 
         for update in updates:
-            task = self.publish_price_update(
-                stock_code=update["stock_code"],
-                price=update["price"],
-                change=update["change"],
-                change_percent=update["change_percent"],
-                volume=update["volume"],
-            )
-            tasks.append(task)
+            stock_code = update["stock_code"]
+            try:
+                message = PriceUpdate(
+                    type=MessageType.PRICE_UPDATE,
+                    stock_code=stock_code,
+                    price=update["price"],
+                    change=update["change"],
+                    change_percent=update["change_percent"],
+                    volume=update["volume"],
+                    timestamp=now,
+                )
+            except ValidationError as e:
+                logger.error(f"Invalid price update for {stock_code}: {e}")
+                continue
+            items.append((f"stock:{stock_code}:price", message.model_dump_json()))
 
-        # Execute all publishes concurrently
-        await asyncio.gather(*tasks, return_exceptions=True)
+        try:
+            await redis_pubsub.publish_many(items)
+        except Exception as e:
+            logger.error(f"Error publishing {len(items)} price updates: {e}")
+            return
 
-        logger.info(f"Published {len(updates)} price updates")
+        logger.info(f"Published {len(items)} price updates")
 
     async def start_mock_publisher(
         self,
@@ -1,19 +1,157 @@
 """Integration tests for Market Overview API endpoints"""
 
-from datetime import datetime, timedelta
+import asyncio
+from datetime import date, datetime, timedelta
 from decimal import Decimal
-from typing import List
+from types import SimpleNamespace
+from typing import List, Type, TypeVar
 
 import pytest
-from httpx import AsyncClient
+from httpx import AsyncClient, Response
+from pydantic import BaseModel
 from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models import DailyPrice, MarketIndex, Stock
+from app.schemas.market import (
+    MarketBreadthResponse,
+    MarketIndicesResponse,
+    MarketMoversResponse,
+    MarketTrendResponse,
+    MostActiveResponse,
+    SectorPerformanceResponse,
+)
+
+SchemaT = TypeVar("SchemaT", bound=BaseModel)
+
+
+def decode_response(response: Response, schema: Type[SchemaT]) -> SchemaT:
+    """Validate a JSON response body against its schema in a single pass
+
+    Also asserts that every top-level schema field was present in the
+    payload, so optional fields are not silently filled from defaults.
+    """
+    parsed = schema.model_validate_json(response.content)
+    assert parsed.model_fields_set == set(schema.model_fields)
+    return parsed
+
 
 # =============================================================================
 # FIXTURES
 # =============================================================================
 
+# Stock specs with prices shared by the market fixtures. ORM instances are
+# built per test because they must be attached to that test's session.
+STOCKS_DATA = (
+    # Technology sector
+    {
+        "code": "005930",
+        "name": "Samsung Electronics",
+        "market": "KOSPI",
+        "sector": "technology",
+        "close_price": 75000,
+        "volume": 15000000,
+        "market_cap": 450000000000000,
+        "prev_close": 73895,  # +1.5%
+    },
+    {
+        "code": "000660",
+        "name": "SK Hynix",
+        "market": "KOSPI",
+        "sector": "technology",
+        "close_price": 125000,
+        "volume": 8000000,
+        "market_cap": 350000000000000,
+        "prev_close": 122187,  # +2.3%
+    },
+    # Finance sector
+    {
+        "code": "055550",
+        "name": "Shinhan Financial",
+        "market": "KOSPI",
+        "sector": "finance",
+        "close_price": 42000,
+        "volume": 5000000,
+        "market_cap": 280000000000000,
+        "prev_close": 42211,  # -0.5%
+    },
+    {
+        "code": "105560",
+        "name": "KB Financial",
+        "market": "KOSPI",
+        "sector": "finance",
+        "close_price": 58000,
+        "volume": 6000000,
+        "market_cap": 320000000000000,
+        "prev_close": 58467,  # -0.8%
+    },
+    # Healthcare sector
+    {
+        "code": "207940",
+        "name": "Samsung Biologics",
+        "market": "KOSPI",
+        "sector": "healthcare",
+        "close_price": 850000,
+        "volume": 200000,
+        "market_cap": 600000000000000,
+        "prev_close": 823643,  # +3.2%
+    },
+    # Consumer sector (gainers)
+    {
+        "code": "051900",
+        "name": "LG H&H",
+        "market": "KOSPI",
+        "sector": "consumer",
+        "close_price": 320000,
+        "volume": 1200000,
+        "market_cap": 220000000000000,
+        "prev_close": 294931,  # +8.5%
+    },
+    # Materials sector (losers)
+    {
+        "code": "051910",
+        "name": "LG Chem",
+        "market": "KOSPI",
+        "sector": "materials",
+        "close_price": 380000,
+        "volume": 2500000,
+        "market_cap": 270000000000000,
+        "prev_close": 405120,  # -6.2%
+    },
+    # KOSDAQ stocks
+    {
+        "code": "035420",
+        "name": "NAVER",
+        "market": "KOSDAQ",
+        "sector": "technology",
+        "close_price": 220000,
+        "volume": 3500000,
+        "market_cap": 360000000000000,
+        "prev_close": 211364,  # +4.1%
+    },
+    {
+        "code": "035720",
+        "name": "Kakao",
+        "market": "KOSDAQ",
+        "sector": "technology",
+        "close_price": 48000,
+        "volume": 7000000,
+        "market_cap": 210000000000000,
+        "prev_close": 49129,  # -2.3%
+    },
+    # Unchanged stock
+    {
+        "code": "012330",
+        "name": "Hyundai Mobis",
+        "market": "KOSPI",
+        "sector": "industrial",
+        "close_price": 250000,
+        "volume": 1500000,
+        "market_cap": 360000000000000,
+        "prev_close": 250000,  # 0.0%
+    },
+)
+
 
 @pytest.fixture
 async def test_market_indices(db, clean_market_data) -> List[MarketIndex]:
@@ -77,123 +215,10 @@ async def test_market_indices(db, clean_market_data) -> List[MarketIndex]:
 @pytest.fixture
 async def test_stocks_with_sectors(db, clean_market_data) -> List[Stock]:
     """Create test stocks with various sectors and daily prices"""
-    from datetime import date
-
-    # Define stock data with prices
-    stocks_data = [
-        # Technology sector
-        {
-            "code": "005930",
-            "name": "Samsung Electronics",
-            "market": "KOSPI",
-            "sector": "technology",
-            "close_price": 75000,
-            "volume": 15000000,
-            "market_cap": 450000000000000,
-            "prev_close": 73895,  # +1.5%
-        },
-        {
-            "code": "000660",
-            "name": "SK Hynix",
-            "market": "KOSPI",
-            "sector": "technology",
-            "close_price": 125000,
-            "volume": 8000000,
-            "market_cap": 350000000000000,
-            "prev_close": 122187,  # +2.3%
-        },
-        # Finance sector
-        {
-            "code": "055550",
-            "name": "Shinhan Financial",
-            "market": "KOSPI",
-            "sector": "finance",
-            "close_price": 42000,
-            "volume": 5000000,
-            "market_cap": 280000000000000,
-            "prev_close": 42211,  # -0.5%
-        },
-        {
-            "code": "105560",
-            "name": "KB Financial",
-            "market": "KOSPI",
-            "sector": "finance",
-            "close_price": 58000,
-            "volume": 6000000,
-            "market_cap": 320000000000000,
-            "prev_close": 58467,  # -0.8%
-        },
-        # Healthcare sector
-        {
-            "code": "207940",
-            "name": "Samsung Biologics",
-            "market": "KOSPI",
-            "sector": "healthcare",
-            "close_price": 850000,
-            "volume": 200000,
-            "market_cap": 600000000000000,
-            "prev_close": 823643,  # +3.2%
-        },
-        # Consumer sector (gainers)
-        {
-            "code": "051900",
-            "name": "LG H&H",
-            "market": "KOSPI",
-            "sector": "consumer",
-            "close_price": 320000,
-            "volume": 1200000,
-            "market_cap": 220000000000000,
-            "prev_close": 294931,  # +8.5%
-        },
-        # Materials sector (losers)
-        {
-            "code": "051910",
-            "name": "LG Chem",
-            "market": "KOSPI",
-            "sector": "materials",
-            "close_price": 380000,
-            "volume": 2500000,
-            "market_cap": 270000000000000,
-            "prev_close": 405120,  # -6.2%
-        },
-        # KOSDAQ stocks
-        {
-            "code": "035420",
-            "name": "NAVER",
-            "market": "KOSDAQ",
-            "sector": "technology",
-            "close_price": 220000,
-            "volume": 3500000,
-            "market_cap": 360000000000000,
-            "prev_close": 211364,  # +4.1%
-        },
-        {
-            "code": "035720",
-            "name": "Kakao",
-            "market": "KOSDAQ",
-            "sector": "technology",
-            "close_price": 48000,
-            "volume": 7000000,
-            "market_cap": 210000000000000,
-            "prev_close": 49129,  # -2.3%
-        },
-        # Unchanged stock
-        {
-            "code": "012330",
-            "name": "Hyundai Mobis",
-            "market": "KOSPI",
-            "sector": "industrial",
-            "close_price": 250000,
-            "volume": 1500000,
-            "market_cap": 360000000000000,
-            "prev_close": 250000,  # 0.0%
-        },
-    ]
-
     stocks = []
     today = date.today()
 
-    for stock_data in stocks_data:
+    for stock_data in STOCKS_DATA:
         # Create Stock record
         stock = Stock(
             code=stock_data["code"],
@@ -285,33 +310,16 @@ class TestMarketIndicesEndpoint:
         response = await client.get("/v1/market/indices")
 
         assert response.status_code == 200
-        data = response.json()
-
-        # Verify structure
-        assert "indices" in data
-        assert "updated_at" in data
+        data = decode_response(response, MarketIndicesResponse)
 
-        indices = data["indices"]
+        indices = data.indices
         assert len(indices) == 3  # KOSPI, KOSDAQ, KRX100
 
-        # Verify each index has required fields
+        # Verify each index carries every field, including a sparkline
         for index in indices:
-            assert "code" in index
-            assert "name" in index
-            assert "current" in index
-            assert "change" in index
-            assert "change_percent" in index
-            assert "high" in index
-            assert "low" in index
-            assert "volume" in index
-            assert "value" in index
-            assert "timestamp" in index
-            assert "sparkline" in index
-
-            # Verify sparkline has data
-            assert isinstance(index["sparkline"], list)
-            assert len(index["sparkline"]) > 0
-            assert len(index["sparkline"]) <= 30  # Max 30 data points
+            assert index.model_fields_set == set(type(index).model_fields)
+            assert len(index.sparkline) > 0
+            assert len(index.sparkline) <= 30  # Max 30 data points
 
     async def test_get_market_indices_empty_database(
         self, client: AsyncClient, clean_market_data
@@ -339,25 +347,14 @@ class TestMarketTrendEndpoint:
         response = await client.get("/v1/market/trend")
 
         assert response.status_code == 200
-        data = response.json()
+        data = decode_response(response, MarketTrendResponse)
 
-        assert "index" in data
-        assert data["index"] == "KOSPI"  # Default
-        assert "timeframe" in data
-        assert data["timeframe"] == "1M"  # Default
-        assert "interval" in data
-        assert "data" in data
-        assert "count" in data
-        assert "updated_at" in data
+        assert data.index == "KOSPI"  # Default
+        assert data.timeframe == "1M"  # Default
 
         # Verify data structure
-        for point in data["data"]:
-            assert "timestamp" in point
-            assert "open" in point
-            assert "high" in point
-            assert "low" in point
-            assert "close" in point
-            assert "volume" in point
+        for point in data.data:
+            assert point.model_fields_set == set(type(point).model_fields)
 
     async def test_get_market_trend_kosdaq(
         self, client: AsyncClient, test_market_indices, clean_market_data
@@ -369,17 +366,15 @@ class TestMarketTrendEndpoint:
         data = response.json()
         assert data["index"] == "KOSDAQ"
 
+    @pytest.mark.parametrize("timeframe", ["1D", "5D", "1M", "3M"])
     async def test_get_market_trend_different_timeframes(
-        self, client: AsyncClient, test_market_indices, clean_market_data
+        self, client: AsyncClient, test_market_indices, clean_market_data, timeframe
     ):
         """Test different timeframe parameters"""
-        timeframes = ["1D", "5D", "1M", "3M"]
-
-        for timeframe in timeframes:
-            response = await client.get(f"/v1/market/trend?timeframe={timeframe}")
-            assert response.status_code == 200
-            data = response.json()
-            assert data["timeframe"] == timeframe
+        response = await client.get(f"/v1/market/trend?timeframe={timeframe}")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["timeframe"] == timeframe
 
     async def test_get_market_trend_invalid_index(
         self, client: AsyncClient, test_market_indices, clean_market_data
@@ -413,28 +408,14 @@ class TestMarketBreadthEndpoint:
         response = await client.get("/v1/market/breadth")
 
         assert response.status_code == 200
-        data = response.json()
-
-        # Verify structure
-        assert "advancing" in data
-        assert "declining" in data
-        assert "unchanged" in data
-        assert "total" in data
-        assert "ad_ratio" in data
-        assert "sentiment" in data
-        assert "market" in data
-        assert data["market"] == "ALL"
-        assert "timestamp" in data
+        # Schema validation also checks sentiment is bullish/neutral/bearish
+        data = decode_response(response, MarketBreadthResponse)
+        assert data.market == "ALL"
 
         # Verify calculations
-        assert data["advancing"] > 0
-        assert data["declining"] > 0
-        assert (
-            data["total"] == data["advancing"] + data["declining"] + data["unchanged"]
-        )
-
-        # Verify sentiment is valid
-        assert data["sentiment"] in ["bullish", "neutral", "bearish"]
+        assert data.advancing > 0
+        assert data.declining > 0
+        assert data.total == data.advancing + data.declining + data.unchanged
 
     async def test_get_market_breadth_kospi_only(
         self, client: AsyncClient, test_stocks_with_sectors, clean_market_data
@@ -480,32 +461,19 @@ class TestSectorPerformanceEndpoint:
         response = await client.get("/v1/market/sectors")
 
         assert response.status_code == 200
-        data = response.json()
-
-        # Verify structure
-        assert "sectors" in data
-        assert "timeframe" in data
-        assert "market" in data
-        assert "updated_at" in data
+        data = decode_response(response, SectorPerformanceResponse)
 
         # Verify sector data
-        sectors = data["sectors"]
+        sectors = data.sectors
         assert len(sectors) > 0
 
         for sector in sectors:
-            assert "code" in sector
-            assert "name" in sector
-            assert "change_percent" in sector
-            assert "stock_count" in sector
-            assert "market_cap" in sector
-            assert "volume" in sector
-            assert "top_stock" in sector
+            assert sector.model_fields_set == set(type(sector).model_fields)
 
             # Verify top_stock structure
-            top_stock = sector["top_stock"]
-            assert "code" in top_stock
-            assert "name" in top_stock
-            assert "change_percent" in top_stock
+            top_stock = sector.top_stock
+            assert top_stock is not None
+            assert top_stock.model_fields_set == set(type(top_stock).model_fields)
 
     async def test_get_sector_performance_kospi_only(
         self, client: AsyncClient, test_stocks_with_sectors, clean_market_data
@@ -517,17 +485,60 @@ class TestSectorPerformanceEndpoint:
         data = response.json()
         assert data["market"] == "KOSPI"
 
+    @pytest.mark.parametrize("timeframe", ["1D", "1W", "1M", "3M"])
     async def test_get_sector_performance_different_timeframes(
-        self, client: AsyncClient, test_stocks_with_sectors, clean_market_data
+        self,
+        client: AsyncClient,
+        test_stocks_with_sectors,
+        clean_market_data,
+        timeframe,
     ):
         """Test different timeframe parameters"""
-        timeframes = ["1D", "1W", "1M", "3M"]
+        response = await client.get(f"/v1/market/sectors?timeframe={timeframe}")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["timeframe"] == timeframe
 
-        for timeframe in timeframes:
-            response = await client.get(f"/v1/market/sectors?timeframe={timeframe}")
-            assert response.status_code == 200
-            data = response.json()
-            assert data["timeframe"] == timeframe
+    async def test_get_sector_performance_numeric_sums_are_json_numbers(
+        self,
+        client: AsyncClient,
+        test_stocks_with_sectors,
+        clean_market_data,
+        monkeypatch,
+    ):
+        """Test numeric SUM() results are rendered as JSON numbers
+
+        PostgreSQL returns SUM(bigint) as numeric, which asyncpg decodes to
+        Decimal, while SQLite returns int. Simulate the PostgreSQL rows.
+        """
+        execute = AsyncSession.execute
+
+        async def execute_returning_decimals(self, statement, *args, **kwargs):
+            result = await execute(self, statement, *args, **kwargs)
+            if "total_volume" not in result.keys():
+                return result
+            rows = [
+                SimpleNamespace(
+                    **{
+                        **row._asdict(),
+                        "market_cap": Decimal(row.market_cap or 0),
+                        "total_volume": Decimal(row.total_volume or 0),
+                    }
+                )
+                for row in result.all()
+            ]
+            return SimpleNamespace(all=lambda: rows)
+
+        monkeypatch.setattr(AsyncSession, "execute", execute_returning_decimals)
+
+        response = await client.get("/v1/market/sectors")
+
+        assert response.status_code == 200
+        sectors = response.json()["sectors"]
+        assert sectors
+        for sector in sectors:
+            assert type(sector["market_cap"]) is int
+            assert type(sector["volume"]) is int
 
 
 # =============================================================================
@@ -545,33 +556,18 @@ class TestMarketMoversEndpoint:
         response = await client.get("/v1/market/movers?type=gainers")
 
         assert response.status_code == 200
-        data = response.json()
-
-        # Verify structure
-        assert "type" in data
-        assert data["type"] == "gainers"
-        assert "market" in data
-        assert "stocks" in data
-        assert "total" in data
-        assert "updated_at" in data
+        data = decode_response(response, MarketMoversResponse)
+        assert data.type == "gainers"
 
         # Verify stocks are sorted by change_percent descending
-        stocks = data["stocks"]
+        stocks = data.stocks
         if len(stocks) > 1:
             for i in range(len(stocks) - 1):
-                assert stocks[i]["change_percent"] >= stocks[i + 1]["change_percent"]
+                assert stocks[i].change_percent >= stocks[i + 1].change_percent
 
         # Verify stock structure
         for stock in stocks:
-            assert "code" in stock
-            assert "name" in stock
-            assert "market" in stock
-            assert "current_price" in stock
-            assert "change" in stock
-            assert "change_percent" in stock
-            assert "volume" in stock
-            assert "value" in stock
-            assert "sector" in stock
+            assert stock.model_fields_set == set(type(stock).model_fields)
 
     async def test_get_top_losers_default(
         self, client: AsyncClient, test_stocks_with_sectors, clean_market_data
@@ -648,21 +644,14 @@ class TestMostActiveEndpoint:
         response = await client.get("/v1/market/active?metric=volume")
 
         assert response.status_code == 200
-        data = response.json()
-
-        # Verify structure
-        assert "metric" in data
-        assert data["metric"] == "volume"
-        assert "market" in data
-        assert "stocks" in data
-        assert "total" in data
-        assert "updated_at" in data
+        data = decode_response(response, MostActiveResponse)
+        assert data.metric == "volume"
 
         # Verify stocks are sorted by volume descending
-        stocks = data["stocks"]
+        stocks = data.stocks
         if len(stocks) > 1:
             for i in range(len(stocks) - 1):
-                assert stocks[i]["volume"] >= stocks[i + 1]["volume"]
+                assert stocks[i].volume >= stocks[i + 1].volume
 
     async def test_get_most_active_by_value(
         self, client: AsyncClient, test_stocks_with_sectors, clean_market_data
@@ -721,23 +710,24 @@ class TestMostActiveEndpoint:
 class TestMarketAPIEdgeCases:
     """Test edge cases and error handling"""
 
-    async def test_all_endpoints_with_empty_database(
-        self, client: AsyncClient, clean_market_data
-    ):
-        """Test all endpoints handle empty database gracefully"""
-        endpoints = [
+    @pytest.mark.parametrize(
+        "endpoint",
+        [
             "/v1/market/indices",
             "/v1/market/trend",
             "/v1/market/breadth",
             "/v1/market/sectors",
             "/v1/market/movers?type=gainers",
             "/v1/market/active",
-        ]
-
-        for endpoint in endpoints:
-            response = await client.get(endpoint)
-            # Should return 200 with empty/default data, not error
-            assert response.status_code == 200
+        ],
+    )
+    async def test_all_endpoints_with_empty_database(
+        self, client: AsyncClient, clean_market_data, endpoint
+    ):
+        """Test all endpoints handle empty database gracefully"""
+        response = await client.get(endpoint)
+        # Should return 200 with empty/default data, not error
+        assert response.status_code == 200
 
     @pytest.mark.asyncio
     @pytest.mark.skip(reason="SQLite does not support concurrent writes well")
@@ -745,8 +735,6 @@ class TestMarketAPIEdgeCases:
         self, client: AsyncClient, test_market_indices, clean_market_data
     ):
         """Test multiple concurrent requests to same endpoint"""
-        import asyncio
-
         # Make 5 concurrent requests
         tasks = [client.get("/v1/market/indices") for _ in range(5)]
         responses = await asyncio.gather(*tasks)
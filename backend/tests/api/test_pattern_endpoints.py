@@ -1,5 +1,5 @@
 import pytest
-from httpx import ASGITransport, AsyncClient
+from httpx import AsyncClient
 
 from app.api.dependencies import get_current_user
 from app.main import app
@@ -19,11 +19,9 @@ def override_auth():
 
 
 @pytest.fixture
-async def client():
-    async with AsyncClient(
-        transport=ASGITransport(app=app), base_url="http://test"
-    ) as ac:
-        yield ac
+async def client(http_client):
+    yield http_client
+    http_client.cookies.clear()
 
 
 @pytest.mark.asyncio
@@ -0,0 +1,28 @@
+"""Tests for custom API response classes"""
+
+import json
+
+from app.api.responses import FastJSONResponse
+
+
+class TestFastJSONResponse:
+    """Test FastJSONResponse rendering"""
+
+    def test_renders_compact_utf8_json(self):
+        """Non-ASCII text is emitted as UTF-8 rather than escaped"""
+        response = FastJSONResponse({"name": "삼성전자", "change": 1.5})
+
+        assert response.body == '{"name":"삼성전자","change":1.5}'.encode("utf-8")
+        assert response.media_type == "application/json"
+
+    def test_round_trips_nested_payload(self):
+        """Nested lists and nulls survive rendering unchanged"""
+        payload = {
+            "stocks": [{"code": "005930", "volume": None, "sparkline": [1.0, 2.5]}],
+            "total": 1,
+        }
+
+        response = FastJSONResponse(payload, status_code=200)
+
+        assert json.loads(response.body) == payload
+        assert response.status_code == 200
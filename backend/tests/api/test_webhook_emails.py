@@ -2,305 +2,304 @@
 
 Verifies that webhook handlers call the correct EmailService methods
 with the expected arguments when processing Stripe events.
+
+All collaborators are mocked, so the tests share no external state and
+can run under pytest-xdist; module-scoped fixtures are built per worker.
 """
 
 from datetime import datetime, timezone
-from unittest.mock import AsyncMock, MagicMock, patch
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
-from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.v1.endpoints import webhooks
 from app.api.v1.endpoints.webhooks import (
     _handle_invoice_payment_failed,
     _handle_invoice_upcoming,
     _handle_trial_will_end,
 )
 
+# Stripe timestamps (seconds since epoch, UTC) used by the payloads below
+TS_2025_02_15 = int(datetime(2025, 2, 15, tzinfo=timezone.utc).timestamp())
+TS_2025_03_01 = int(datetime(2025, 3, 1, tzinfo=timezone.utc).timestamp())
+TS_2025_04_15 = int(datetime(2025, 4, 15, tzinfo=timezone.utc).timestamp())
+
+# Stripe event payloads. The handlers only read from them, so they are shared.
+INVOICE_PAYMENT_FAILED = {
+    "customer": "cus_test123",
+    "subscription": "sub_test456",
+    "id": "inv_001",
+    "amount_due": 2999,
+    "currency": "usd",
+    "last_finalization_error": {
+        "code": "card_declined",
+        "message": "Your card was declined",
+    },
+}
+INVOICE_UPCOMING = {
+    "customer": "cus_test123",
+    "amount_due": 4999,
+    "currency": "usd",
+    "next_payment_attempt": TS_2025_03_01,
+}
+INVOICE_UPCOMING_PERIOD_END = {
+    "customer": "cus_test123",
+    "amount_due": 1999,
+    "currency": "usd",
+    "period_end": TS_2025_04_15,
+}
+SUBSCRIPTION_TRIAL_ENDING = {"id": "sub_test456", "trial_end": TS_2025_02_15}
+
+# EmailService stand-in built once; mock_email_service resets its call history
+_EMAIL_MOCK = MagicMock()
+_EMAIL_MOCK.send_payment_failure_email = AsyncMock(return_value=True)
+_EMAIL_MOCK.send_upcoming_invoice_email = AsyncMock(return_value=True)
+_EMAIL_MOCK.send_trial_ending_email = AsyncMock(return_value=True)
+
+
+def resolving_to(value):
+    """Build a coroutine function that always returns ``value``.
+
+    Cheaper than ``AsyncMock(return_value=...)`` for ``db.execute``, whose
+    calls are never asserted on.
+    """
+
+    async def _resolve(*args, **kwargs):
+        return value
+
+    return _resolve
+
+
+@pytest.fixture(scope="module")
+def shared_result():
+    """Result object returned by every ``db.execute`` call in this module."""
+    return MagicMock()
+
 
 @pytest.fixture
-def mock_db():
-    """Create a mock async database session."""
-    db = AsyncMock(spec=AsyncSession)
-    return db
+def mock_result(shared_result):
+    """Yield the shared result, clearing per-test lookups afterwards."""
+    yield shared_result
+    shared_result.reset_mock(return_value=True, side_effect=True)
 
 
 @pytest.fixture
+def mock_db(mock_result):
+    """Create a mock async database session.
+
+    ``execute`` resolves to ``mock_result``; tests only program its
+    ``scalar_one_or_none`` lookups. The user/subscription/plan fixtures below
+    are read-only attribute bags built once per module.
+    """
+    # No spec: the handlers only await execute()/flush() and call add(), so
+    # introspecting the whole AsyncSession class buys nothing.
+    db = MagicMock()
+    db.execute = resolving_to(mock_result)
+    db.flush = AsyncMock()
+    return db
+
+
+@pytest.fixture(scope="module")
 def mock_user():
-    """Create a mock user object."""
-    user = MagicMock()
-    user.id = 1
-    user.email = "user@example.com"
-    user.stripe_customer_id = "cus_test123"
-    return user
+    """Create a stand-in user object."""
+    return SimpleNamespace(
+        id=1, email="user@example.com", stripe_customer_id="cus_test123"
+    )
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def mock_subscription():
-    """Create a mock user subscription."""
-    sub = MagicMock()
-    sub.user_id = 1
-    sub.plan_id = 10
-    sub.stripe_subscription_id = "sub_test456"
-    sub.status = "trial"
-    return sub
+    """Create a stand-in user subscription."""
+    return SimpleNamespace(
+        user_id=1, plan_id=10, stripe_subscription_id="sub_test456", status="trial"
+    )
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def mock_plan():
-    """Create a mock subscription plan."""
-    plan = MagicMock()
-    plan.id = 10
-    plan.name = "Pro"
-    return plan
-
-
-class TestWebhookPaymentFailedEmail:
-    """Test email sending in _handle_invoice_payment_failed."""
-
-    @pytest.mark.asyncio
-    async def test_sends_payment_failure_email(self, mock_db, mock_user):
-        """Payment failure sends notification email to user."""
-        invoice = {
-            "customer": "cus_test123",
-            "subscription": "sub_test456",
-            "id": "inv_001",
-            "amount_due": 2999,
-            "currency": "usd",
-            "last_finalization_error": {
-                "code": "card_declined",
-                "message": "Your card was declined",
+    """Create a stand-in subscription plan."""
+    return SimpleNamespace(id=10, name="Pro")
+
+
+@pytest.fixture(autouse=True)
+def mock_email_service(monkeypatch):
+    """Replace the webhooks module's EmailService with the shared mock."""
+    _EMAIL_MOCK.reset_mock()
+    monkeypatch.setattr(webhooks, "EmailService", lambda *a, **k: _EMAIL_MOCK)
+    return _EMAIL_MOCK
+
+
+# =============================================================================
+# _handle_invoice_payment_failed
+# =============================================================================
+
+
+@pytest.mark.asyncio
+async def test_payment_failed_sends_email(
+    mock_email_service, mock_db, mock_result, mock_user
+):
+    """Payment failure sends notification email to user."""
+    mock_result.scalar_one_or_none.side_effect = [mock_user, None]
+
+    await _handle_invoice_payment_failed(mock_db, INVOICE_PAYMENT_FAILED)
+
+    mock_email_service.send_payment_failure_email.assert_called_once_with(
+        to_email="user@example.com",
+        amount=29.99,
+        currency="USD",
+        failure_reason="Your card was declined",
+    )
+
+
+# =============================================================================
+# _handle_invoice_upcoming
+# =============================================================================
+
+
+@pytest.mark.asyncio
+async def test_upcoming_invoice_sends_email(
+    mock_email_service, mock_db, mock_result, mock_user
+):
+    """Upcoming invoice sends notification email to user."""
+    mock_result.scalar_one_or_none.side_effect = [mock_user]
+
+    await _handle_invoice_upcoming(mock_db, INVOICE_UPCOMING)
+
+    mock_email_service.send_upcoming_invoice_email.assert_called_once_with(
+        to_email="user@example.com",
+        amount=49.99,
+        currency="USD",
+        due_date="2025-03-01",
+    )
+
+
+@pytest.mark.asyncio
+async def test_upcoming_invoice_falls_back_to_period_end(
+    mock_email_service, mock_db, mock_result, mock_user
+):
+    """Uses period_end when next_payment_attempt is missing."""
+    mock_result.scalar_one_or_none.side_effect = [mock_user]
+
+    await _handle_invoice_upcoming(mock_db, INVOICE_UPCOMING_PERIOD_END)
+
+    call_kwargs = mock_email_service.send_upcoming_invoice_email.call_args[1]
+    assert call_kwargs["due_date"] == "2025-04-15"
+    assert call_kwargs["amount"] == 19.99
+
+
+# =============================================================================
+# _handle_trial_will_end
+# =============================================================================
+
+
+@pytest.mark.asyncio
+async def test_trial_ending_sends_email(
+    mock_email_service,
+    mock_db,
+    mock_result,
+    mock_user,
+    mock_subscription,
+    mock_plan,
+):
+    """Trial ending sends notification email with plan name."""
+    mock_result.scalar_one_or_none.side_effect = [
+        mock_subscription,
+        mock_user,
+        mock_plan,
+    ]
+
+    await _handle_trial_will_end(mock_db, SUBSCRIPTION_TRIAL_ENDING)
+
+    mock_email_service.send_trial_ending_email.assert_called_once_with(
+        to_email="user@example.com",
+        trial_end_date="2025-02-15",
+        plan_name="Pro",
+    )
+
+
+@pytest.mark.asyncio
+async def test_trial_ending_uses_default_plan_name(
+    mock_email_service, mock_db, mock_result, mock_user, mock_subscription
+):
+    """Uses 'Premium' as default plan name when plan is not found."""
+    mock_result.scalar_one_or_none.side_effect = [
+        mock_subscription,
+        mock_user,
+        None,  # Plan not found
+    ]
+
+    await _handle_trial_will_end(mock_db, SUBSCRIPTION_TRIAL_ENDING)
+
+    call_kwargs = mock_email_service.send_trial_ending_email.call_args[1]
+    assert call_kwargs["plan_name"] == "Premium"
+
+
+# =============================================================================
+# Lookup misses
+# =============================================================================
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "handler, payload, email_method, lookups",
+    [
+        pytest.param(
+            _handle_invoice_payment_failed,
+            {
+                "customer": "cus_unknown",
+                "subscription": None,
+                "id": "inv_002",
+                "amount_due": 999,
+                "currency": "usd",
+                "last_finalization_error": {},
             },
-        }
-
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.side_effect = [mock_user, None]
-        mock_db.execute = AsyncMock(return_value=mock_result)
-        mock_db.flush = AsyncMock()
-
-        with patch("app.api.v1.endpoints.webhooks.EmailService") as MockEmailService:
-            mock_email = MagicMock()
-            mock_email.send_payment_failure_email = AsyncMock(return_value=True)
-            MockEmailService.return_value = mock_email
-
-            await _handle_invoice_payment_failed(mock_db, invoice)
-
-            mock_email.send_payment_failure_email.assert_called_once_with(
-                to_email="user@example.com",
-                amount=29.99,
-                currency="USD",
-                failure_reason="Your card was declined",
-            )
-
-    @pytest.mark.asyncio
-    async def test_no_email_when_user_not_found(self, mock_db):
-        """No email sent when user is not found."""
-        invoice = {
-            "customer": "cus_unknown",
-            "subscription": None,
-            "id": "inv_002",
-            "amount_due": 999,
-            "currency": "usd",
-            "last_finalization_error": {},
-        }
-
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = None
-        mock_db.execute = AsyncMock(return_value=mock_result)
-
-        with patch("app.api.v1.endpoints.webhooks.EmailService") as MockEmailService:
-            mock_email = MagicMock()
-            mock_email.send_payment_failure_email = AsyncMock()
-            MockEmailService.return_value = mock_email
-
-            await _handle_invoice_payment_failed(mock_db, invoice)
-
-            mock_email.send_payment_failure_email.assert_not_called()
-
-
-class TestWebhookUpcomingInvoiceEmail:
-    """Test email sending in _handle_invoice_upcoming."""
-
-    @pytest.mark.asyncio
-    async def test_sends_upcoming_invoice_email(self, mock_db, mock_user):
-        """Upcoming invoice sends notification email to user."""
-        invoice = {
-            "customer": "cus_test123",
-            "amount_due": 4999,
-            "currency": "usd",
-            "next_payment_attempt": int(
-                datetime(2025, 3, 1, tzinfo=timezone.utc).timestamp()
-            ),
-        }
-
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = mock_user
-        mock_db.execute = AsyncMock(return_value=mock_result)
-
-        with patch("app.api.v1.endpoints.webhooks.EmailService") as MockEmailService:
-            mock_email = MagicMock()
-            mock_email.send_upcoming_invoice_email = AsyncMock(return_value=True)
-            MockEmailService.return_value = mock_email
-
-            await _handle_invoice_upcoming(mock_db, invoice)
-
-            mock_email.send_upcoming_invoice_email.assert_called_once_with(
-                to_email="user@example.com",
-                amount=49.99,
-                currency="USD",
-                due_date="2025-03-01",
-            )
-
-    @pytest.mark.asyncio
-    async def test_falls_back_to_period_end_for_due_date(self, mock_db, mock_user):
-        """Uses period_end when next_payment_attempt is missing."""
-        invoice = {
-            "customer": "cus_test123",
-            "amount_due": 1999,
-            "currency": "usd",
-            "period_end": int(datetime(2025, 4, 15, tzinfo=timezone.utc).timestamp()),
-        }
-
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = mock_user
-        mock_db.execute = AsyncMock(return_value=mock_result)
-
-        with patch("app.api.v1.endpoints.webhooks.EmailService") as MockEmailService:
-            mock_email = MagicMock()
-            mock_email.send_upcoming_invoice_email = AsyncMock(return_value=True)
-            MockEmailService.return_value = mock_email
-
-            await _handle_invoice_upcoming(mock_db, invoice)
-
-            call_kwargs = mock_email.send_upcoming_invoice_email.call_args[1]
-            assert call_kwargs["due_date"] == "2025-04-15"
-            assert call_kwargs["amount"] == 19.99
-
-    @pytest.mark.asyncio
-    async def test_no_email_when_user_not_found(self, mock_db):
-        """No email sent when user is not found."""
-        invoice = {
-            "customer": "cus_unknown",
-            "amount_due": 999,
-            "currency": "usd",
-        }
-
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = None
-        mock_db.execute = AsyncMock(return_value=mock_result)
-
-        with patch("app.api.v1.endpoints.webhooks.EmailService") as MockEmailService:
-            mock_email = MagicMock()
-            mock_email.send_upcoming_invoice_email = AsyncMock()
-            MockEmailService.return_value = mock_email
-
-            await _handle_invoice_upcoming(mock_db, invoice)
-
-            mock_email.send_upcoming_invoice_email.assert_not_called()
-
-
-class TestWebhookTrialEndingEmail:
-    """Test email sending in _handle_trial_will_end."""
-
-    @pytest.mark.asyncio
-    async def test_sends_trial_ending_email(
-        self, mock_db, mock_user, mock_subscription, mock_plan
-    ):
-        """Trial ending sends notification email with plan name."""
-        subscription_data = {
-            "id": "sub_test456",
-            "trial_end": int(datetime(2025, 2, 15, tzinfo=timezone.utc).timestamp()),
-        }
-
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.side_effect = [
-            mock_subscription,
-            mock_user,
-            mock_plan,
-        ]
-        mock_db.execute = AsyncMock(return_value=mock_result)
-
-        with patch("app.api.v1.endpoints.webhooks.EmailService") as MockEmailService:
-            mock_email = MagicMock()
-            mock_email.send_trial_ending_email = AsyncMock(return_value=True)
-            MockEmailService.return_value = mock_email
-
-            await _handle_trial_will_end(mock_db, subscription_data)
-
-            mock_email.send_trial_ending_email.assert_called_once_with(
-                to_email="user@example.com",
-                trial_end_date="2025-02-15",
-                plan_name="Pro",
-            )
-
-    @pytest.mark.asyncio
-    async def test_no_email_when_subscription_not_found(self, mock_db):
-        """No email sent when subscription is not found."""
-        subscription_data = {
-            "id": "sub_unknown",
-            "trial_end": 1739577600,
-        }
-
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = None
-        mock_db.execute = AsyncMock(return_value=mock_result)
-
-        with patch("app.api.v1.endpoints.webhooks.EmailService") as MockEmailService:
-            mock_email = MagicMock()
-            mock_email.send_trial_ending_email = AsyncMock()
-            MockEmailService.return_value = mock_email
-
-            await _handle_trial_will_end(mock_db, subscription_data)
-
-            mock_email.send_trial_ending_email.assert_not_called()
-
-    @pytest.mark.asyncio
-    async def test_no_email_when_user_not_found(self, mock_db, mock_subscription):
-        """No email sent when user is not found for subscription."""
-        subscription_data = {
-            "id": "sub_test456",
-            "trial_end": 1739577600,
-        }
-
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.side_effect = [
-            mock_subscription,
-            None,  # User not found
-        ]
-        mock_db.execute = AsyncMock(return_value=mock_result)
-
-        with patch("app.api.v1.endpoints.webhooks.EmailService") as MockEmailService:
-            mock_email = MagicMock()
-            mock_email.send_trial_ending_email = AsyncMock()
-            MockEmailService.return_value = mock_email
-
-            await _handle_trial_will_end(mock_db, subscription_data)
-
-            mock_email.send_trial_ending_email.assert_not_called()
-
-    @pytest.mark.asyncio
-    async def test_uses_default_plan_name_when_plan_not_found(
-        self, mock_db, mock_user, mock_subscription
-    ):
-        """Uses 'Premium' as default plan name when plan is not found."""
-        subscription_data = {
-            "id": "sub_test456",
-            "trial_end": int(datetime(2025, 2, 15, tzinfo=timezone.utc).timestamp()),
-        }
-
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.side_effect = [
-            mock_subscription,
-            mock_user,
-            None,  # Plan not found
-        ]
-        mock_db.execute = AsyncMock(return_value=mock_result)
-
-        with patch("app.api.v1.endpoints.webhooks.EmailService") as MockEmailService:
-            mock_email = MagicMock()
-            mock_email.send_trial_ending_email = AsyncMock(return_value=True)
-            MockEmailService.return_value = mock_email
-
-            await _handle_trial_will_end(mock_db, subscription_data)
-
-            call_kwargs = mock_email.send_trial_ending_email.call_args[1]
-            assert call_kwargs["plan_name"] == "Premium"
+            "send_payment_failure_email",
+            [None],
+            id="payment_failed-user",
+        ),
+        pytest.param(
+            _handle_invoice_upcoming,
+            {"customer": "cus_unknown", "amount_due": 999, "currency": "usd"},
+            "send_upcoming_invoice_email",
+            [None],
+            id="upcoming-user",
+        ),
+        pytest.param(
+            _handle_trial_will_end,
+            {"id": "sub_unknown", "trial_end": TS_2025_02_15},
+            "send_trial_ending_email",
+            [None],
+            id="trial_ending-subscription",
+        ),
+        pytest.param(
+            _handle_trial_will_end,
+            SUBSCRIPTION_TRIAL_ENDING,
+            "send_trial_ending_email",
+            ["mock_subscription", None],
+            id="trial_ending-user",
+        ),
+    ],
+)
+async def test_handler_skips_email_when_lookup_misses(
+    request,
+    mock_email_service,
+    mock_db,
+    mock_result,
+    handler,
+    payload,
+    email_method,
+    lookups,
+):
+    """No email sent when a user or subscription lookup returns nothing.
+
+    ``lookups`` lists the successive ``scalar_one_or_none`` results, given
+    as fixture names so module-scoped fixtures can be reused.
+    """
+    mock_result.scalar_one_or_none.side_effect = [
+        request.getfixturevalue(name) if name else None for name in lookups
+    ]
+
+    await handler(mock_db, payload)
+
+    getattr(mock_email_service, email_method).assert_not_called()
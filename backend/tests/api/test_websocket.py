@@ -1,48 +1,160 @@
 """Tests for WebSocket endpoints"""
 
-from datetime import datetime
+import asyncio
+import json
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Optional
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
 
 import pytest
 from fastapi.testclient import TestClient
 
-from app.core.websocket import connection_manager
+from app.api.v1.endpoints.websocket import (
+    handle_refresh_token,
+    handle_subscribe,
+    handle_unsubscribe,
+    verify_token,
+)
+from app.core.security import create_access_token
+from app.core.websocket import ConnectionManager, _encode
 from app.main import app
-from app.schemas.websocket import SubscriptionType
+from app.schemas.websocket import (
+    ErrorMessage,
+    PongMessage,
+    PriceUpdate,
+    SubscriptionType,
+)
+
+# Stock codes for the subscription-limit tests, built once at import
+_TOO_MANY = tuple(f"00{i:04d}" for i in range(100))
+_LIMIT_BATCHES = tuple(tuple(f"00{b}{i:03d}" for i in range(40)) for b in range(3))
+
+
+def _stock_frame(msg_type: str, targets) -> str:
+    """Serialize a stock (un)subscribe request to a WebSocket text frame"""
+    return json.dumps(
+        {"type": msg_type, "subscription_type": "stock", "targets": list(targets)}
+    )
+
+
+# Client frames encoded once and sent with send_text()
+_PING = json.dumps({"type": "ping"})
+_SUBSCRIBE_SAMSUNG = _stock_frame("subscribe", ["005930"])
+_UNSUBSCRIBE_SAMSUNG = _stock_frame("unsubscribe", ["005930"])
+_SUBSCRIBE_THREE = _stock_frame("subscribe", ["005930", "000660", "035720"])
+_SUBSCRIBE_TOO_MANY = _stock_frame("subscribe", _TOO_MANY)
+_SUBSCRIBE_LIMIT_BATCHES = tuple(
+    _stock_frame("subscribe", targets) for targets in _LIMIT_BATCHES
+)
+
+# Every module-level name through which the app reaches the connection manager
+_MANAGER_BINDINGS = (
+    "app.core.websocket.connection_manager",
+    "app.api.v1.endpoints.websocket.connection_manager",
+)
+
+
+@lru_cache(maxsize=32)
+def _cached_token(subject: str, expires_s: Optional[int] = None) -> str:
+    """Create an access token once per (subject, lifetime) and reuse it"""
+    expires_delta = timedelta(seconds=expires_s) if expires_s is not None else None
+    return create_access_token(subject=subject, expires_delta=expires_delta)
+
+
+def make_mock_ws() -> Mock:
+    """Create a stand-in WebSocket whose send/accept methods are awaitable"""
+    ws = Mock()
+    ws.accept = AsyncMock()
+    ws.send_json = AsyncMock()
+    ws.send_text = AsyncMock()
+    return ws
+
+
+@pytest.fixture(scope="module")
+def client():
+    """Test client, shared by every test in this module.
 
+    Entering the client runs the app lifespan once and keeps one portal
+    event loop for every request and WebSocket session, instead of starting
+    a fresh loop thread per call. Per-test isolation comes from ``manager``.
+    """
+    with TestClient(app) as test_client:
+        yield test_client
 
-@pytest.fixture
-def client():
-    """Test client"""
-    return TestClient(app)
+
+def _cancel_background_tasks(mgr: ConnectionManager) -> None:
+    """Cancel heartbeat and batch loops left running by a manager"""
+    for task in (mgr._heartbeat_task, mgr._batch_task):
+        if task is not None:
+            # TestClient tasks run on its portal thread; cancel them there
+            loop = task.get_loop()
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(task.cancel)
 
 
 @pytest.fixture(autouse=True)
-def reset_connection_manager():
-    """Reset connection manager before each test"""
-    connection_manager.active_connections.clear()
-    connection_manager.connection_info.clear()
-    connection_manager.subscriptions.clear()
-    connection_manager.connection_subscriptions.clear()
-    connection_manager._sequence_counter = 0
+def manager(monkeypatch):
+    """Give each test its own ConnectionManager.
+
+    The fresh manager replaces the global one at every binding site, so
+    tests never share connection state and the module can run under
+    pytest-xdist (``pytest -n auto``). Heartbeats are disabled, so sockets
+    only ever carry the replies a test asked for.
+    """
+    mgr = ConnectionManager(enable_redis=False, enable_heartbeat=False)
+    for target in _MANAGER_BINDINGS:
+        monkeypatch.setattr(target, mgr)
+    yield mgr
+    _cancel_background_tasks(mgr)
+
+
+@pytest.fixture
+def mock_cm(monkeypatch):
+    """Mocked connection manager for calling the endpoint handlers directly"""
+    mcm = MagicMock()
+    mcm.send_error = AsyncMock()
+    mcm.send_message = AsyncMock()
+    mcm.get_connection_info = MagicMock(return_value=None)
+    monkeypatch.setattr("app.api.v1.endpoints.websocket.connection_manager", mcm)
+    return mcm
+
+
+@pytest.fixture(scope="class")
+def class_manager():
+    """ConnectionManager shared by every test of a class using ``ws``"""
+    mgr = ConnectionManager(enable_redis=False, enable_heartbeat=False)
+    with pytest.MonkeyPatch.context() as mp:
+        for target in _MANAGER_BINDINGS:
+            mp.setattr(target, mgr)
+        yield mgr
+    _cancel_background_tasks(mgr)
+
+
+@pytest.fixture(scope="class")
+def ws(client, class_manager):
+    """Open a single WebSocket connection shared by a test class"""
+    with client.websocket_connect("/v1/ws") as websocket:
+        yield websocket
 
 
 class TestWebSocketConnection:
     """Test WebSocket connection lifecycle"""
 
-    def test_websocket_connect_and_disconnect(self, client):
+    def test_websocket_connect_and_disconnect(self, manager, client):
         """Test basic WebSocket connection"""
         with client.websocket_connect("/v1/ws") as websocket:
             # Connection should be established
             # Note: Connection count may be 0 or 1 depending on timing
             # Just verify the connection is usable
-            websocket.send_json({"type": "ping"})
+            websocket.send_text(_PING)
             response = websocket.receive_json()
             assert response["type"] == "pong"
 
         # After context exit, connection should be cleaned up
         # TestClient handles disconnect automatically
         # Verify connections are cleaned up (may already be 0 due to session save)
-        assert len(connection_manager.active_connections) >= 0
+        assert len(manager.active_connections) >= 0
 
     def test_websocket_with_invalid_token(self, client):
         """Test WebSocket with invalid JWT token"""
@@ -50,115 +162,100 @@ class TestWebSocketConnection:
         with client.websocket_connect("/v1/ws?token=invalid_token") as websocket:
             # Connection successful - invalid token treated as anonymous
             # Send ping to verify connection is working
-            websocket.send_json({"type": "ping"})
+            websocket.send_text(_PING)
             response = websocket.receive_json()
             assert response["type"] == "pong"
 
 
 class TestWebSocketMessages:
-    """Test WebSocket message handling"""
-
-    def test_ping_pong(self, client):
+    """Test WebSocket message handling over one shared connection"""
+
+    @pytest.fixture(autouse=True)
+    def manager(self, class_manager, ws):
+        """Reset subscriptions only, keeping the shared connection registered.
+
+        Each test reads every reply it triggers, so no stale frames are left
+        on ``ws`` for the next test.
+        """
+        class_manager.subscriptions.clear()
+        class_manager._subscription_counts.clear()
+        class_manager.connection_subscriptions.clear()
+        for info in class_manager.connection_info.values():
+            info.subscriptions.clear()
+        return class_manager
+
+    def test_ping_pong(self, ws):
         """Test ping-pong heartbeat"""
-        with client.websocket_connect("/v1/ws") as websocket:
-            # Send ping
-            websocket.send_json({"type": "ping"})
+        # Send ping
+        ws.send_text(_PING)
 
-            # Receive pong
-            response = websocket.receive_json()
-            assert response["type"] == "pong"
+        # Receive pong
+        response = ws.receive_json()
+        assert response["type"] == "pong"
 
-    def test_subscribe_to_stock(self, client):
+    def test_subscribe_to_stock(self, ws):
         """Test subscribing to stock updates"""
-        with client.websocket_connect("/v1/ws") as websocket:
-            # Subscribe to Samsung Electronics
-            subscribe_msg = {
-                "type": "subscribe",
-                "subscription_type": "stock",
-                "targets": ["005930"],
-            }
-            websocket.send_json(subscribe_msg)
-
-            # Receive subscription confirmation
-            response = websocket.receive_json()
-            assert response["type"] == "subscribed"
-            assert response["subscription_type"] == "stock"
-            assert "005930" in response["targets"]
-
-    def test_subscribe_multiple_stocks(self, client):
-        """Test subscribing to multiple stocks"""
-        with client.websocket_connect("/v1/ws") as websocket:
-            # Subscribe to multiple stocks
-            subscribe_msg = {
-                "type": "subscribe",
-                "subscription_type": "stock",
-                "targets": ["005930", "000660", "035720"],
-            }
-            websocket.send_json(subscribe_msg)
-
-            # Receive confirmation
-            response = websocket.receive_json()
-            assert response["type"] == "subscribed"
-            assert len(response["targets"]) == 3
-
-    def test_unsubscribe_from_stock(self, client):
-        """Test unsubscribing from stock updates"""
-        with client.websocket_connect("/v1/ws") as websocket:
-            # Subscribe first
-            websocket.send_json(
-                {
-                    "type": "subscribe",
-                    "subscription_type": "stock",
-                    "targets": ["005930"],
-                }
-            )
-            websocket.receive_json()  # Skip confirmation
-
-            # Unsubscribe
-            unsubscribe_msg = {
-                "type": "unsubscribe",
-                "subscription_type": "stock",
-                "targets": ["005930"],
-            }
-            websocket.send_json(unsubscribe_msg)
-
-            # Receive confirmation
-            response = websocket.receive_json()
-            assert response["type"] == "unsubscribed"
-            assert "005930" in response["targets"]
-
-    def test_invalid_json(self, client):
-        """Test sending invalid JSON"""
-        with client.websocket_connect("/v1/ws") as websocket:
-            # Send invalid JSON
-            websocket.send_text("not a json")
-
-            # Receive error
-            response = websocket.receive_json()
-            assert response["type"] == "error"
-            assert response["code"] == "INVALID_JSON"
+        # Subscribe to Samsung Electronics
+        ws.send_text(_SUBSCRIBE_SAMSUNG)
 
-    def test_missing_message_type(self, client):
-        """Test message without type field"""
-        with client.websocket_connect("/v1/ws") as websocket:
-            # Send message without type
-            websocket.send_json({"data": "test"})
+        # Receive subscription confirmation
+        response = ws.receive_json()
+        assert response["type"] == "subscribed"
+        assert response["subscription_type"] == "stock"
+        assert "005930" in response["targets"]
 
-            # Receive error
-            response = websocket.receive_json()
-            assert response["type"] == "error"
-            assert response["code"] == "MISSING_TYPE"
+    def test_subscribe_multiple_stocks(self, ws):
+        """Test subscribing to multiple stocks"""
+        # Subscribe to multiple stocks
+        ws.send_text(_SUBSCRIBE_THREE)
 
-    def test_unknown_message_type(self, client):
-        """Test unknown message type"""
-        with client.websocket_connect("/v1/ws") as websocket:
-            # Send unknown message type
-            websocket.send_json({"type": "unknown_type"})
+        # Receive confirmation
+        response = ws.receive_json()
+        assert response["type"] == "subscribed"
+        assert len(response["targets"]) == 3
 
-            # Receive error
-            response = websocket.receive_json()
-            assert response["type"] == "error"
-            assert response["code"] == "UNKNOWN_MESSAGE_TYPE"
+    def test_unsubscribe_from_stock(self, ws):
+        """Test unsubscribing from stock updates"""
+        # Subscribe first
+        ws.send_text(_SUBSCRIBE_SAMSUNG)
+        ws.receive_json()  # Skip confirmation
+
+        # Unsubscribe
+        ws.send_text(_UNSUBSCRIBE_SAMSUNG)
+
+        # Receive confirmation
+        response = ws.receive_json()
+        assert response["type"] == "unsubscribed"
+        assert "005930" in response["targets"]
+
+    @pytest.mark.parametrize(
+        "frame, code",
+        [
+            ("not a json", "INVALID_JSON"),
+            ('{"data": "test"}', "MISSING_TYPE"),
+            ('["ping"]', "MISSING_TYPE"),
+            ('{"type": "unknown_type"}', "UNKNOWN_MESSAGE_TYPE"),
+            ('{"type": ["ping"]}', "UNKNOWN_MESSAGE_TYPE"),
+            # 100KB, above WEBSOCKET_MAX_MESSAGE_SIZE
+            ("x" * 100000, "MESSAGE_TOO_LARGE"),
+        ],
+        ids=[
+            "invalid_json",
+            "missing_type",
+            "non_object",
+            "unknown_type",
+            "non_string_type",
+            "too_large",
+        ],
+    )
+    def test_malformed_message_returns_error(self, ws, frame, code):
+        """Test each malformed message is answered with its error code"""
+        ws.send_text(frame)
+
+        # Receive error
+        response = ws.receive_json()
+        assert response["type"] == "error"
+        assert response["code"] == code
 
 
 class TestWebSocketStats:
@@ -187,68 +284,54 @@ class TestWebSocketStats:
 class TestConnectionManager:
     """Test ConnectionManager functionality"""
 
-    @pytest.mark.asyncio
-    async def test_subscribe_and_get_subscribers(self):
+    async def test_subscribe_and_get_subscribers(self, manager):
         """Test subscription management"""
         # Create mock connection
         conn_id = "test-conn-1"
 
         # Subscribe to stock
-        await connection_manager.subscribe(conn_id, SubscriptionType.STOCK, "005930")
+        await manager.subscribe(conn_id, SubscriptionType.STOCK, "005930")
 
         # Get subscribers
-        subscribers = connection_manager.get_subscribers(
-            SubscriptionType.STOCK, "005930"
-        )
+        subscribers = manager.get_subscribers(SubscriptionType.STOCK, "005930")
         assert conn_id in subscribers
 
-    @pytest.mark.asyncio
-    async def test_unsubscribe(self):
+    async def test_unsubscribe(self, manager):
         """Test unsubscription"""
         conn_id = "test-conn-1"
 
         # Subscribe and unsubscribe
-        await connection_manager.subscribe(conn_id, SubscriptionType.STOCK, "005930")
-        connection_manager.unsubscribe(conn_id, SubscriptionType.STOCK, "005930")
+        await manager.subscribe(conn_id, SubscriptionType.STOCK, "005930")
+        manager.unsubscribe(conn_id, SubscriptionType.STOCK, "005930")
 
         # Verify unsubscribed
-        subscribers = connection_manager.get_subscribers(
-            SubscriptionType.STOCK, "005930"
-        )
+        subscribers = manager.get_subscribers(SubscriptionType.STOCK, "005930")
         assert conn_id not in subscribers
 
-    @pytest.mark.asyncio
-    async def test_multiple_subscriptions(self):
+    async def test_multiple_subscriptions(self, manager):
         """Test multiple subscriptions per connection"""
         conn_id = "test-conn-1"
 
         # Subscribe to multiple stocks
-        await connection_manager.subscribe(conn_id, SubscriptionType.STOCK, "005930")
-        await connection_manager.subscribe(conn_id, SubscriptionType.STOCK, "000660")
-        await connection_manager.subscribe(conn_id, SubscriptionType.MARKET, "KOSPI")
+        await manager.subscribe(conn_id, SubscriptionType.STOCK, "005930")
+        await manager.subscribe(conn_id, SubscriptionType.STOCK, "000660")
+        await manager.subscribe(conn_id, SubscriptionType.MARKET, "KOSPI")
 
         # Verify subscriptions
-        assert conn_id in connection_manager.get_subscribers(
-            SubscriptionType.STOCK, "005930"
-        )
-        assert conn_id in connection_manager.get_subscribers(
-            SubscriptionType.STOCK, "000660"
-        )
-        assert conn_id in connection_manager.get_subscribers(
-            SubscriptionType.MARKET, "KOSPI"
-        )
+        assert conn_id in manager.get_subscribers(SubscriptionType.STOCK, "005930")
+        assert conn_id in manager.get_subscribers(SubscriptionType.STOCK, "000660")
+        assert conn_id in manager.get_subscribers(SubscriptionType.MARKET, "KOSPI")
 
-    @pytest.mark.asyncio
-    async def test_get_stats(self):
+    async def test_get_stats(self, manager):
         """Test statistics"""
         conn_id = "test-conn-1"
 
         # Add subscriptions
-        await connection_manager.subscribe(conn_id, SubscriptionType.STOCK, "005930")
-        await connection_manager.subscribe(conn_id, SubscriptionType.STOCK, "000660")
+        await manager.subscribe(conn_id, SubscriptionType.STOCK, "005930")
+        await manager.subscribe(conn_id, SubscriptionType.STOCK, "000660")
 
         # Get stats
-        stats = connection_manager.get_stats()
+        stats = manager.get_stats()
         assert stats["active_connections"] == 0  # No actual WebSocket connections
         assert stats["total_subscriptions"] >= 2
 
@@ -256,64 +339,52 @@ class TestConnectionManager:
 class TestWebSocketPhase3:
     """Test Phase 3 features: Session restoration, token refresh"""
 
-    @pytest.mark.asyncio
-    async def test_session_save_on_disconnect(self):
+    async def test_session_save_on_disconnect(self, manager):
         """Test session is saved on disconnect"""
-        from unittest.mock import AsyncMock, Mock
-
         # Create mock WebSocket connection
-        mock_ws = Mock()
-        mock_ws.accept = AsyncMock()
-        mock_ws.send_json = AsyncMock()
+        mock_ws = make_mock_ws()
 
         # Connect
-        conn_id = await connection_manager.connect(mock_ws, user_id="test-user")
+        conn_id = await manager.connect(mock_ws, user_id="test-user")
 
         # Add some subscriptions
-        await connection_manager.subscribe(conn_id, SubscriptionType.STOCK, "005930")
-        await connection_manager.subscribe(conn_id, SubscriptionType.MARKET, "KOSPI")
+        await manager.subscribe(conn_id, SubscriptionType.STOCK, "005930")
+        await manager.subscribe(conn_id, SubscriptionType.MARKET, "KOSPI")
 
         # Disconnect
-        await connection_manager.disconnect(conn_id)
+        await manager.disconnect(conn_id)
 
         # Verify session was saved
-        assert conn_id in connection_manager._disconnected_sessions
-        session = connection_manager._disconnected_sessions[conn_id]
+        assert conn_id in manager._disconnected_sessions
+        session = manager._disconnected_sessions[conn_id]
         assert session["user_id"] == "test-user"
         assert "subscriptions" in session
         assert SubscriptionType.STOCK in session["subscriptions"]
 
-    @pytest.mark.asyncio
-    async def test_session_restoration_on_reconnect(self):
+    async def test_session_restoration_on_reconnect(self, manager):
         """Test session restoration on reconnection"""
-        from unittest.mock import AsyncMock, Mock
-
         # Create first connection
-        mock_ws1 = Mock()
-        mock_ws1.accept = AsyncMock()
-        mock_ws1.send_json = AsyncMock()
+        mock_ws1 = make_mock_ws()
 
-        conn_id1 = await connection_manager.connect(mock_ws1, user_id="test-user")
+        conn_id1 = await manager.connect(mock_ws1, user_id="test-user")
 
         # Add subscriptions
-        await connection_manager.subscribe(conn_id1, SubscriptionType.STOCK, "005930")
-        await connection_manager.subscribe(conn_id1, SubscriptionType.STOCK, "000660")
+        await manager.subscribe(conn_id1, SubscriptionType.STOCK, "005930")
+        await manager.subscribe(conn_id1, SubscriptionType.STOCK, "000660")
 
         # Disconnect (saves session)
-        await connection_manager.disconnect(conn_id1)
+        await manager.disconnect(conn_id1)
 
         # Reconnect with same session
-        mock_ws2 = Mock()
-        mock_ws2.accept = AsyncMock()
-        mock_ws2.send_json = AsyncMock()
+        mock_ws2 = make_mock_ws()
 
-        conn_id2, restored_subs, missed_msgs = await connection_manager.reconnect(
+        conn_id2, restored_subs, missed_msgs = await manager.reconnect(
             mock_ws2, conn_id1, user_id="test-user"
         )
 
         # Verify new connection ID
         assert conn_id2 != conn_id1
-        assert conn_id2 in connection_manager.active_connections
+        assert conn_id2 in manager.active_connections
 
         # Verify subscriptions restored
         assert SubscriptionType.STOCK in restored_subs
@@ -321,48 +392,55 @@ class TestWebSocketPhase3:
         assert "000660" in restored_subs[SubscriptionType.STOCK]
 
         # Verify old session removed
-        assert conn_id1 not in connection_manager._disconnected_sessions
+        assert conn_id1 not in manager._disconnected_sessions
 
-    @pytest.mark.asyncio
-    async def test_reconnect_with_expired_session(self):
-        """Test reconnection fails with expired session"""
-        from unittest.mock import AsyncMock, Mock
+    async def test_saved_sessions_evict_oldest_over_limit(self):
+        """Test the saved-session store is bounded, dropping the oldest"""
+        test_manager = ConnectionManager(
+            enable_redis=False, enable_heartbeat=False, max_saved_sessions=2
+        )
+        conn_ids = [
+            await test_manager.connect(make_mock_ws(), user_id="test-user")
+            for _ in range(3)
+        ]
+        for conn_id in conn_ids:
+            await test_manager.disconnect(conn_id)
+
+        assert list(test_manager._disconnected_sessions) == conn_ids[1:]
 
-        mock_ws = Mock()
-        mock_ws.accept = AsyncMock()
-        mock_ws.send_json = AsyncMock()
+    async def test_reconnect_with_expired_session(self, manager):
+        """Test reconnection fails with expired session"""
+        mock_ws = make_mock_ws()
 
         # Try to reconnect with non-existent session
         with pytest.raises(ValueError, match="Session .* not found"):
-            await connection_manager.reconnect(
+            await manager.reconnect(
                 mock_ws, "non-existent-session", user_id="test-user"
             )
 
-    @pytest.mark.asyncio
-    async def test_reconnect_with_user_mismatch(self):
-        """Test reconnection fails with user ID mismatch"""
-        from unittest.mock import AsyncMock, Mock
+    async def test_reconnect_anonymous_with_unknown_session(self, manager):
+        """Test anonymous reconnection with an unknown session_id is rejected"""
+        with pytest.raises(ValueError, match="Session .* not found"):
+            await manager.reconnect(make_mock_ws(), "fake-session", user_id=None)
 
+    async def test_reconnect_with_user_mismatch(self, manager):
+        """Test reconnection fails with user ID mismatch"""
         # Create and disconnect connection
-        mock_ws1 = Mock()
-        mock_ws1.accept = AsyncMock()
-        mock_ws1.send_json = AsyncMock()
+        mock_ws1 = make_mock_ws()
 
-        conn_id = await connection_manager.connect(mock_ws1, user_id="user1")
-        await connection_manager.disconnect(conn_id)
+        conn_id = await manager.connect(mock_ws1, user_id="user1")
+        await manager.disconnect(conn_id)
 
         # Try to reconnect with different user
-        mock_ws2 = Mock()
-        mock_ws2.accept = AsyncMock()
-        mock_ws2.send_json = AsyncMock()
+        mock_ws2 = make_mock_ws()
 
         with pytest.raises(ValueError, match="User ID mismatch"):
-            await connection_manager.reconnect(mock_ws2, conn_id, user_id="user2")
+            await manager.reconnect(mock_ws2, conn_id, user_id="user2")
 
-    def test_session_cleanup_stats(self):
+    def test_session_cleanup_stats(self, manager):
         """Test session cleanup in stats"""
         # Add a saved session manually
-        connection_manager._disconnected_sessions["test-session"] = {
+        manager._disconnected_sessions["test-session"] = {
             "connection_id": "test-session",
             "user_id": "test-user",
             "subscriptions": {},
@@ -371,7 +449,7 @@ class TestWebSocketPhase3:
         }
 
         # Get stats
-        stats = connection_manager.get_stats()
+        stats = manager.get_stats()
         assert "saved_sessions" in stats
         assert stats["saved_sessions"] >= 1
 
@@ -379,131 +457,157 @@ class TestWebSocketPhase3:
 class TestPhase4Features:
     """Test Phase 4 features: batching and rate limiting"""
 
-    @pytest.mark.asyncio
-    async def test_message_batching(self):
+    async def test_message_batching(self, manager):
         """Test message batching functionality"""
-        from unittest.mock import AsyncMock, Mock
-
-        from app.schemas.websocket import PriceUpdate
-
         # Create connection with batching enabled
-        mock_ws = Mock()
-        mock_ws.accept = AsyncMock()
-        mock_ws.send_json = AsyncMock()
+        mock_ws = make_mock_ws()
 
-        conn_id = await connection_manager.connect(mock_ws, user_id="test-user")
+        conn_id = await manager.connect(mock_ws, user_id="test-user")
 
         # Send multiple messages (should be batched)
-        for i in range(5):
-            msg = PriceUpdate(
+        msgs = [
+            PriceUpdate.model_construct(
                 stock_code=f"00593{i}",
-                price=70000 + i * 1000,
+                price=70000.0 + i * 1000,
                 change=1000.0,
                 change_percent=1.5 + i * 0.1,
                 volume=1000000,
             )
-            await connection_manager.send_message(conn_id, msg)
+            for i in range(5)
+        ]
+        for msg in msgs:
+            await manager.send_message(conn_id, msg)
 
         # Messages should be queued
-        assert len(connection_manager._message_queues[conn_id]) == 5
+        assert len(manager._message_queues[conn_id]) == 5
 
         # Flush batch manually
-        await connection_manager._flush_batch(conn_id)
+        await manager._flush_batch(conn_id)
 
         # Queue should be empty
-        assert len(connection_manager._message_queues[conn_id]) == 0
+        assert len(manager._message_queues[conn_id]) == 0
+
+        # The batch should have been sent as a single text frame, carrying
+        # each message's full payload
+        mock_ws.send_text.assert_called_once()
+        batch = json.loads(mock_ws.send_text.call_args.args[0])
+        assert batch["type"] == "batch"
+        assert batch["batch_size"] == 5
+        assert [m["stock_code"] for m in batch["messages"]] == [
+            msg.stock_code for msg in msgs
+        ]
+
+    async def test_slow_client_queue_drops_oldest(self):
+        """Test a full send queue drops the oldest message, not the connection"""
+        test_manager = ConnectionManager(
+            enable_redis=False,
+            enable_heartbeat=False,
+            enable_rate_limiting=False,
+            batch_interval=60,
+            max_pending_messages=3,
+        )
+        conn_id = await test_manager.connect(make_mock_ws())
 
-        # WebSocket send_json should have been called
-        assert mock_ws.send_json.called
+        msgs = [PongMessage() for _ in range(5)]
+        for msg in msgs:
+            await test_manager.send_message(conn_id, msg)
 
-    @pytest.mark.asyncio
-    async def test_immediate_message_bypass_batching(self):
-        """Test immediate messages bypass batching"""
-        from unittest.mock import AsyncMock, Mock
+        assert list(test_manager._message_queues[conn_id]) == msgs[2:]
+        assert conn_id in test_manager.active_connections
 
-        from app.schemas.websocket import ErrorMessage
+        await test_manager.disconnect(conn_id)
+
+    async def test_flush_tick_encodes_broadcast_once(self, manager):
+        """Test a broadcast queued for many connections is encoded once"""
+        for _ in range(3):
+            await manager.connect(make_mock_ws())
+        await manager.broadcast(PongMessage())
+
+        frames = {}
+        with patch("app.core.websocket._encode", wraps=_encode) as encode:
+            for conn_id in list(manager.active_connections):
+                await manager._flush_batch(conn_id, frames)
+
+        encode.assert_called_once()
+        sent = {
+            ws.send_text.call_args.args[0] for ws in manager.active_connections.values()
+        }
+        assert len(sent) == 1
 
-        mock_ws = Mock()
-        mock_ws.accept = AsyncMock()
-        mock_ws.send_json = AsyncMock()
+    async def test_immediate_message_bypass_batching(self, manager):
+        """Test immediate messages bypass batching"""
+        mock_ws = make_mock_ws()
 
-        conn_id = await connection_manager.connect(mock_ws, user_id="test-user")
+        conn_id = await manager.connect(mock_ws, user_id="test-user")
 
         # Send immediate message
         error_msg = ErrorMessage(code="TEST_ERROR", message="Test error")
-        await connection_manager.send_message(conn_id, error_msg, immediate=True)
+        await manager.send_message(conn_id, error_msg, immediate=True)
 
         # Message should not be queued
-        assert len(connection_manager._message_queues.get(conn_id, [])) == 0
+        assert len(manager._message_queues.get(conn_id, [])) == 0
 
         # Should be sent immediately
-        assert mock_ws.send_json.called
+        assert mock_ws.send_text.called
 
-    @pytest.mark.asyncio
     async def test_rate_limiting(self):
         """Test rate limiting functionality"""
-        from unittest.mock import AsyncMock, Mock
-
-        from app.core.websocket import ConnectionManager
-        from app.schemas.websocket import PriceUpdate
-
         # Create manager with low rate limit for testing
         test_manager = ConnectionManager(
             enable_redis=False,
             enable_batching=False,  # Disable batching for direct testing
+            enable_heartbeat=False,
             enable_rate_limiting=True,
             rate_limit=5,  # Only 5 messages per second
         )
 
-        mock_ws = Mock()
-        mock_ws.accept = AsyncMock()
-        mock_ws.send_json = AsyncMock()
+        mock_ws = make_mock_ws()
 
         conn_id = await test_manager.connect(mock_ws, user_id="test-user")
 
         # Send messages up to rate limit
-        success_count = 0
-        for i in range(10):
-            msg = PriceUpdate(
+        msgs = [
+            PriceUpdate.model_construct(
                 stock_code="005930",
-                price=70000 + i * 100,
+                price=70000.0 + i * 100,
                 change=100.0,
                 change_percent=1.5,
                 volume=1000000,
             )
+            for i in range(10)
+        ]
+        success_count = 0
+        for msg in msgs:
             result = await test_manager.send_message(conn_id, msg, immediate=True)
             if result:
                 success_count += 1
+        await test_manager.disconnect(conn_id)
 
         # Only first 5 should succeed (rate limit = 5)
         assert success_count == 5
 
-    @pytest.mark.asyncio
-    async def test_batch_stats(self):
+    async def test_batch_stats(self, manager):
         """Test Phase 4 statistics"""
-        from unittest.mock import AsyncMock, Mock
-
-        from app.schemas.websocket import PriceUpdate
+        mock_ws = make_mock_ws()
 
-        mock_ws = Mock()
-        mock_ws.accept = AsyncMock()
-        mock_ws.send_json = AsyncMock()
-
-        conn_id = await connection_manager.connect(mock_ws, user_id="test-user")
+        conn_id = await manager.connect(mock_ws, user_id="test-user")
 
         # Send some messages
-        for i in range(3):
-            msg = PriceUpdate(
+        msgs = [
+            PriceUpdate.model_construct(
                 stock_code="005930",
-                price=70000 + i * 1000,
+                price=70000.0 + i * 1000,
                 change=1000.0,
                 change_percent=1.5,
                 volume=1000000,
             )
-            await connection_manager.send_message(conn_id, msg)
+            for i in range(3)
+        ]
+        for msg in msgs:
+            await manager.send_message(conn_id, msg)
 
         # Check stats
-        stats = connection_manager.get_stats()
+        stats = manager.get_stats()
         assert "batching_enabled" in stats
         assert "batch_interval_ms" in stats
         assert "queued_messages" in stats
@@ -513,84 +617,130 @@ class TestPhase4Features:
         # Should have 3 queued messages
         assert stats["queued_messages"] == 3
 
-    @pytest.mark.asyncio
-    async def test_batch_flush_loop(self):
+    async def test_batch_flush_loop(self, manager):
         """Test batch flush loop runs periodically"""
-        import asyncio
-        from unittest.mock import AsyncMock, Mock
+        mock_ws = make_mock_ws()
+
+        # Signal as soon as the loop has flushed, instead of sleeping
+        flushed = asyncio.Event()
+        original_flush = manager._flush_batch
+
+        async def flush_and_signal(connection_id, frames=None):
+            await original_flush(connection_id, frames)
+            flushed.set()
+
+        with patch.object(manager, "_flush_batch", flush_and_signal):
+            conn_id = await manager.connect(mock_ws, user_id="test-user")
+
+            # Send messages
+            msgs = [
+                PriceUpdate.model_construct(
+                    stock_code="005930",
+                    price=70000.0 + i * 1000,
+                    change=1000.0,
+                    change_percent=1.5,
+                    volume=1000000,
+                )
+                for i in range(3)
+            ]
+            for msg in msgs:
+                await manager.send_message(conn_id, msg)
+
+            await asyncio.wait_for(flushed.wait(), timeout=0.2)
 
-        from app.schemas.websocket import PriceUpdate
+        # Queue should be empty (flushed by loop)
+        assert len(manager._message_queues.get(conn_id, [])) == 0
 
-        mock_ws = Mock()
-        mock_ws.accept = AsyncMock()
-        mock_ws.send_json = AsyncMock()
+    async def test_slow_connection_does_not_stall_flush_loop(self):
+        """Test a client blocked on a write does not delay other clients"""
+        test_manager = ConnectionManager(
+            enable_redis=False, enable_heartbeat=False, batch_interval=0.001
+        )
+        drained = asyncio.Event()
+        fast_frames = asyncio.Queue()
+
+        async def blocked_write(frame):
+            await drained.wait()
+
+        slow_ws = make_mock_ws()
+        slow_ws.send_text = AsyncMock(side_effect=blocked_write)
+        fast_ws = make_mock_ws()
+        fast_ws.send_text = AsyncMock(side_effect=fast_frames.put)
+        slow_id = await test_manager.connect(slow_ws)
+        fast_id = await test_manager.connect(fast_ws)
+
+        # First tick: the slow client's write blocks, the fast one completes
+        await test_manager.broadcast(PongMessage())
+        await asyncio.wait_for(fast_frames.get(), timeout=1)
+
+        # Later ticks keep serving the fast client
+        await test_manager.send_message(slow_id, PongMessage())
+        await test_manager.send_message(fast_id, PongMessage())
+        await asyncio.wait_for(fast_frames.get(), timeout=1)
+
+        # The slow client's message waits for its in-flight write
+        assert len(test_manager._message_queues[slow_id]) == 1
+        slow_ws.send_text.assert_awaited_once()
+
+        drained.set()
+        await test_manager.disconnect(slow_id)
+        await test_manager.disconnect(fast_id)
+
+    async def test_disconnect_cancels_blocked_flush(self):
+        """Test disconnecting a client cancels its flush stuck on a write"""
+        test_manager = ConnectionManager(
+            enable_redis=False, enable_heartbeat=False, batch_interval=0.001
+        )
+        writing = asyncio.Event()
 
-        conn_id = await connection_manager.connect(mock_ws, user_id="test-user")
+        async def stuck_write(frame):
+            writing.set()
+            await asyncio.Event().wait()
 
-        # Send messages
-        for i in range(3):
-            msg = PriceUpdate(
-                stock_code="005930",
-                price=70000 + i * 1000,
-                change=1000.0,
-                change_percent=1.5,
-                volume=1000000,
-            )
-            await connection_manager.send_message(conn_id, msg)
+        stuck_ws = make_mock_ws()
+        stuck_ws.send_text = AsyncMock(side_effect=stuck_write)
+        stuck_id = await test_manager.connect(stuck_ws)
 
-        # Wait for batch interval (30ms default) + small buffer
-        await asyncio.sleep(0.05)
+        await test_manager.send_message(stuck_id, PongMessage())
+        await asyncio.wait_for(writing.wait(), timeout=1)
+        flush_task = test_manager._flush_tasks[stuck_id]
 
-        # Queue should be empty (flushed by loop)
-        assert len(connection_manager._message_queues.get(conn_id, [])) == 0
+        await test_manager.disconnect(stuck_id)
+        await asyncio.wait_for(
+            asyncio.gather(flush_task, return_exceptions=True), timeout=1
+        )
+
+        assert flush_task.cancelled()
+        assert test_manager._flush_tasks == {}
 
 
 class TestVerifyToken:
     """Test JWT token verification for WebSocket"""
 
-    @pytest.mark.asyncio
     async def test_verify_token_none(self):
         """Test verify_token with None token"""
-        from app.api.v1.endpoints.websocket import verify_token
-
         result = await verify_token(None)
         assert result is None
 
-    @pytest.mark.asyncio
     async def test_verify_token_empty_string(self):
         """Test verify_token with empty string"""
-        from app.api.v1.endpoints.websocket import verify_token
-
         result = await verify_token("")
         assert result is None
 
-    @pytest.mark.asyncio
     async def test_verify_token_invalid_jwt(self):
         """Test verify_token with invalid JWT"""
-        from app.api.v1.endpoints.websocket import verify_token
-
         result = await verify_token("invalid_token")
         assert result is None
 
-    @pytest.mark.asyncio
     async def test_verify_token_valid_jwt(self):
         """Test verify_token with valid JWT"""
-        from app.api.v1.endpoints.websocket import verify_token
-        from app.core.security import create_access_token
-
-        token = create_access_token(subject="test-user-123")
+        token = _cached_token("test-user-123")
         result = await verify_token(token)
         assert result == "test-user-123"
 
-    @pytest.mark.asyncio
     async def test_verify_token_expired_jwt(self):
         """Test verify_token with expired JWT"""
-        from datetime import timedelta
-
-        from app.api.v1.endpoints.websocket import verify_token
-        from app.core.security import create_access_token
-
-        # Create expired token
+        # Create expired token (not cached: expiry is relative to now)
         token = create_access_token(
             subject="test-user-123", expires_delta=timedelta(seconds=-1)
         )
@@ -605,19 +755,9 @@ class TestWebSocketSubscriptionLimits:
         """Test subscribing with too many targets at once"""
         with client.websocket_connect("/v1/ws") as websocket:
             # Try to subscribe to more than MAX_TARGETS_PER_SUBSCRIPTION
-            targets = [f"00{i:04d}" for i in range(100)]
-            subscribe_msg = {
-                "type": "subscribe",
-                "subscription_type": "stock",
-                "targets": targets,
-            }
-            websocket.send_json(subscribe_msg)
+            websocket.send_text(_SUBSCRIBE_TOO_MANY)
 
             response = websocket.receive_json()
-            # Ignore pongs
-            while response.get("type") == "pong":
-                response = websocket.receive_json()
-
             assert response["type"] == "error"
             assert response["code"] == "TOO_MANY_TARGETS"
 
@@ -625,14 +765,8 @@ class TestWebSocketSubscriptionLimits:
         """Test exceeding total subscription limit"""
         with client.websocket_connect("/v1/ws") as websocket:
             # Subscribe multiple times to reach limit
-            for batch in range(3):
-                targets = [f"00{batch}{i:03d}" for i in range(40)]
-                subscribe_msg = {
-                    "type": "subscribe",
-                    "subscription_type": "stock",
-                    "targets": targets,
-                }
-                websocket.send_json(subscribe_msg)
+            for batch, frame in enumerate(_SUBSCRIBE_LIMIT_BATCHES):
+                websocket.send_text(frame)
                 response = websocket.receive_json()
 
                 # Third batch should fail due to total limit
@@ -640,34 +774,16 @@ class TestWebSocketSubscriptionLimits:
                     assert response["type"] == "error"
                     assert response["code"] == "SUBSCRIPTION_LIMIT_EXCEEDED"
                 else:
-                    # Wait for subscription confirmation, ignoring pongs if any
-                    while response.get("type") == "pong":
-                        response = websocket.receive_json()
                     assert response["type"] == "subscribed"
 
 
-class TestWebSocketLargeMessage:
-    """Test WebSocket large message handling"""
-
-    def test_message_too_large(self, client):
-        """Test sending message larger than MAX_MESSAGE_SIZE"""
-        with client.websocket_connect("/v1/ws") as websocket:
-            # Create a large message exceeding limit
-            large_data = "x" * 100000  # 100KB
-            websocket.send_text(large_data)
-
-            response = websocket.receive_json()
-            assert response["type"] == "error"
-            assert response["code"] == "MESSAGE_TOO_LARGE"
-
-
 class TestWebSocketReconnectEndpoint:
     """Test WebSocket reconnect endpoint behavior"""
 
     def test_reconnect_message_type_not_supported(self, client):
         """Test RECONNECT message type returns error"""
         with client.websocket_connect("/v1/ws") as websocket:
-            websocket.send_json({"type": "reconnect"})
+            websocket.send_text('{"type": "reconnect"}')
 
             response = websocket.receive_json()
             assert response["type"] == "error"
@@ -677,118 +793,65 @@ class TestWebSocketReconnectEndpoint:
 class TestHandleSubscribe:
     """Test handle_subscribe function"""
 
-    @pytest.mark.asyncio
-    async def test_handle_subscribe_invalid_request(self):
+    async def test_handle_subscribe_invalid_request(self, mock_cm):
         """Test handle_subscribe with invalid request data"""
-        from unittest.mock import AsyncMock, patch
-
-        from app.api.v1.endpoints.websocket import handle_subscribe
+        # Invalid subscription type
+        await handle_subscribe("test-conn", {"type": "subscribe", "invalid": "data"})
 
-        with patch("app.api.v1.endpoints.websocket.connection_manager") as mock_cm:
-            mock_cm.send_error = AsyncMock()
-            mock_cm.get_connection_info.return_value = None
-
-            # Invalid subscription type
-            await handle_subscribe(
-                "test-conn", {"type": "subscribe", "invalid": "data"}
-            )
-
-            mock_cm.send_error.assert_called_once()
+        mock_cm.send_error.assert_called_once()
 
 
 class TestHandleUnsubscribe:
     """Test handle_unsubscribe function"""
 
-    @pytest.mark.asyncio
-    async def test_handle_unsubscribe_success(self):
+    async def test_handle_unsubscribe_success(self, mock_cm):
         """Test handle_unsubscribe success"""
-        from unittest.mock import AsyncMock, MagicMock, patch
-
-        from app.api.v1.endpoints.websocket import handle_unsubscribe
-
-        with patch("app.api.v1.endpoints.websocket.connection_manager") as mock_cm:
-            mock_cm.unsubscribe = MagicMock()
-            mock_cm.send_message = AsyncMock()
-
-            message = {
-                "type": "unsubscribe",
-                "subscription_type": "stock",
-                "targets": ["005930"],
-            }
+        message = {
+            "type": "unsubscribe",
+            "subscription_type": "stock",
+            "targets": ["005930"],
+        }
 
-            await handle_unsubscribe("test-conn", message)
+        await handle_unsubscribe("test-conn", message)
 
-            mock_cm.unsubscribe.assert_called_once()
-            mock_cm.send_message.assert_called_once()
+        mock_cm.unsubscribe.assert_called_once()
+        mock_cm.send_message.assert_called_once()
 
-    @pytest.mark.asyncio
-    async def test_handle_unsubscribe_error(self):
+    async def test_handle_unsubscribe_error(self, mock_cm):
         """Test handle_unsubscribe with invalid data"""
-        from unittest.mock import AsyncMock, patch
-
-        from app.api.v1.endpoints.websocket import handle_unsubscribe
+        # Invalid data
+        await handle_unsubscribe("test-conn", {"type": "unsubscribe"})
 
-        with patch("app.api.v1.endpoints.websocket.connection_manager") as mock_cm:
-            mock_cm.send_error = AsyncMock()
-
-            # Invalid data
-            await handle_unsubscribe("test-conn", {"type": "unsubscribe"})
-
-            mock_cm.send_error.assert_called_once()
+        mock_cm.send_error.assert_called_once()
 
 
 class TestHandleRefreshToken:
     """Test handle_refresh_token function"""
 
-    @pytest.mark.asyncio
-    async def test_handle_refresh_token_invalid_request(self):
+    async def test_handle_refresh_token_invalid_request(self, mock_cm):
         """Test handle_refresh_token with invalid request"""
-        from unittest.mock import AsyncMock, patch
-
-        from app.api.v1.endpoints.websocket import handle_refresh_token
-
-        with patch("app.api.v1.endpoints.websocket.connection_manager") as mock_cm:
-            mock_cm.send_error = AsyncMock()
+        await handle_refresh_token("test-conn", {"type": "refresh_token"})
 
-            await handle_refresh_token("test-conn", {"type": "refresh_token"})
+        mock_cm.send_error.assert_called_once()
 
-            mock_cm.send_error.assert_called_once()
-
-    @pytest.mark.asyncio
-    async def test_handle_refresh_token_not_refresh_type(self):
+    async def test_handle_refresh_token_not_refresh_type(self, mock_cm):
         """Test handle_refresh_token with access token (not refresh)"""
-        from unittest.mock import AsyncMock, patch
-
-        from app.api.v1.endpoints.websocket import handle_refresh_token
-        from app.core.security import create_access_token
-
-        access_token = create_access_token(subject="test-user")
-
-        with patch("app.api.v1.endpoints.websocket.connection_manager") as mock_cm:
-            mock_cm.send_error = AsyncMock()
+        access_token = _cached_token("test-user")
 
-            await handle_refresh_token(
-                "test-conn", {"type": "refresh_token", "refresh_token": access_token}
-            )
+        await handle_refresh_token(
+            "test-conn", {"type": "refresh_token", "refresh_token": access_token}
+        )
 
-            mock_cm.send_error.assert_called()
-            # Should get INVALID_TOKEN_TYPE or similar error
+        mock_cm.send_error.assert_called()
+        # Should get INVALID_TOKEN_TYPE or similar error
 
-    @pytest.mark.asyncio
-    async def test_handle_refresh_token_expired(self):
+    async def test_handle_refresh_token_expired(self, mock_cm):
         """Test handle_refresh_token with expired token"""
-        from unittest.mock import AsyncMock, patch
-
-        from app.api.v1.endpoints.websocket import handle_refresh_token
-
-        with patch("app.api.v1.endpoints.websocket.connection_manager") as mock_cm:
-            mock_cm.send_error = AsyncMock()
-
-            await handle_refresh_token(
-                "test-conn", {"type": "refresh_token", "refresh_token": "expired_token"}
-            )
+        await handle_refresh_token(
+            "test-conn", {"type": "refresh_token", "refresh_token": "expired_token"}
+        )
 
-            mock_cm.send_error.assert_called()
+        mock_cm.send_error.assert_called()
 
 
 class TestWebSocketEndpointWithToken:
@@ -796,26 +859,9 @@ class TestWebSocketEndpointWithToken:
 
     def test_websocket_with_valid_token(self, client):
         """Test WebSocket connection with valid token"""
-        from app.core.security import create_access_token
-
-        token = create_access_token(subject="test-user-id")
+        token = _cached_token("test-user-id")
 
         with client.websocket_connect(f"/v1/ws?token={token}") as websocket:
-            websocket.send_json({"type": "ping"})
+            websocket.send_text(_PING)
             response = websocket.receive_json()
             assert response["type"] == "pong"
-
-    def test_websocket_reconnect_with_session_id(self, client):
-        """Test WebSocket reconnection with session_id"""
-        # First connection
-        with client.websocket_connect("/v1/ws") as websocket:
-            websocket.send_json({"type": "ping"})
-            websocket.receive_json()
-
-        # Try reconnect with fake session (should still work, just not restore)
-        with client.websocket_connect("/v1/ws?session_id=fake-session") as websocket:
-            # Connection should work, but may get error about session restoration
-            websocket.send_json({"type": "ping"})
-            response = websocket.receive_json()
-            # Should either be error (session restoration failed) or pong
-            assert response["type"] in ["error", "pong"]
@@ -3,6 +3,7 @@
 import asyncio
 import os
 import sys
+from importlib.util import find_spec
 from typing import AsyncGenerator
 
 # Mock Redis connection to prevent startup failures
@@ -11,6 +12,7 @@ from unittest.mock import AsyncMock, MagicMock
 import pytest
 import pytest_asyncio
 from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.pool import NullPool, StaticPool
 
@@ -23,7 +25,8 @@ cache_manager.disconnect = AsyncMock()
 connection_manager.initialize_redis = AsyncMock()
 redis_pubsub.disconnect = AsyncMock()
 
-# Mock ML dependencies if not installed (for local testing on incompatible platforms)
+# Mock ML dependencies if not installed (for local testing on incompatible platforms).
+# Only the module spec is probed, so installed packages are not imported here.
 for module_name in [
     "mlflow",
     "mlflow.tracking",
@@ -49,9 +52,11 @@ for module_name in [
     "joblib",
     "pywebpush",
 ]:
-    try:
-        __import__(module_name)
-    except ImportError:
+    parent_name = module_name.rpartition(".")[0]
+    if parent_name and isinstance(sys.modules.get(parent_name), MagicMock):
+        # Probing a submodule would import its parent; the parent is mocked
+        sys.modules[module_name] = MagicMock()
+    elif find_spec(module_name) is None:
         mock = MagicMock()
         # numpy mock needs real types for isinstance() checks used by
         # Pydantic/SQLAlchemy (e.g., isinstance(val, np.bool_))
@@ -88,6 +93,21 @@ elif DEFAULT_TEST_DB_URL.startswith("postgres://"):
     )
 
 TEST_DATABASE_URL = DEFAULT_TEST_DB_URL
+TEST_DATABASE_IS_SQLITE = TEST_DATABASE_URL.startswith("sqlite")
+
+
+@pytest.fixture(scope="session")
+def event_loop_policy():
+    """Run the session event loop on uvloop when it is installed.
+
+    uvloop ships with ``uvicorn[standard]`` on Linux and macOS; other
+    platforms fall back to the default asyncio loop.
+    """
+    try:
+        import uvloop
+    except ImportError:
+        return asyncio.DefaultEventLoopPolicy()
+    return uvloop.EventLoopPolicy()
 
 
 @pytest.fixture(autouse=True)
@@ -100,35 +120,14 @@ def reset_rate_limit_fallback():
     rl_module._fallback_logged = False
 
 
-@pytest.fixture(scope="function")
-def event_loop():
-    """Create an instance of the default event loop for each test case."""
-    loop = asyncio.new_event_loop()
-    yield loop
-
-    # Clean up pending tasks
-    pending = asyncio.all_tasks(loop)
-    for task in pending:
-        task.cancel()
-
-    # Allow tasks to cancel
-    if pending:
-        try:
-            loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
-        except Exception:
-            pass
-
-    loop.close()
-
-
-@pytest_asyncio.fixture
+@pytest_asyncio.fixture(scope="session")
 async def db_engine():
-    """Create test database engine"""
+    """Create test database engine and schema once per session"""
     # Use StaticPool for SQLite in-memory to persist data across connections
     poolclass = NullPool
     connect_args = {}
 
-    if "sqlite" in TEST_DATABASE_URL:
+    if TEST_DATABASE_IS_SQLITE:
         poolclass = StaticPool
         connect_args = {"check_same_thread": False}
 
@@ -139,13 +138,25 @@ async def db_engine():
         connect_args=connect_args,
     )
 
-    # Create tables
+    if TEST_DATABASE_IS_SQLITE:
+        # The sqlite3 driver defers BEGIN and commits on RELEASE SAVEPOINT;
+        # emit BEGIN ourselves so test sessions can nest savepoints.
+        @event.listens_for(engine.sync_engine, "connect")
+        def _disable_driver_transactions(dbapi_connection, connection_record):
+            dbapi_connection.isolation_level = None
+
+        @event.listens_for(engine.sync_engine, "begin")
+        def _emit_begin(connection):
+            connection.exec_driver_sql("BEGIN")
+
+    # Create tables once per session
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
 
     yield engine
 
-    # Drop tables
+    # Drop tables so a persistent database (e.g. PostgreSQL) picks up model
+    # changes on the next run instead of create_all skipping existing tables
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
 
@@ -154,24 +165,24 @@ async def db_engine():
 
 @pytest_asyncio.fixture
 async def db(db_engine) -> AsyncGenerator[AsyncSession, None]:
-    """Create test database session with transaction rollback"""
-    from sqlalchemy.ext.asyncio import async_sessionmaker
+    """Create test database session with transaction rollback
 
-    # Create connection
+    The session joins an outer connection-level transaction and turns its
+    own commits and rollbacks into SAVEPOINT operations, so rolling back
+    the outer transaction undoes everything the test wrote.
+    """
     async with db_engine.connect() as connection:
-        # Begin transaction
-        async with connection.begin() as transaction:
-            # Create session bound to connection
-            async_session = async_sessionmaker(
-                bind=connection,
-                class_=AsyncSession,
-                expire_on_commit=False,
-            )
-
-            async with async_session() as session:
-                yield session
-
-            # Rollback transaction (cleanup)
+        transaction = await connection.begin()
+        session = AsyncSession(
+            bind=connection,
+            expire_on_commit=False,
+            join_transaction_mode="create_savepoint",
+        )
+
+        try:
+            yield session
+        finally:
+            await session.close()
             await transaction.rollback()
 
 
@@ -254,8 +265,21 @@ async def basic_auth_headers(basic_user):
     return {"Authorization": f"Bearer {access_token}"}
 
 
+@pytest_asyncio.fixture(scope="session")
+async def http_client() -> AsyncGenerator[AsyncClient, None]:
+    """HTTP client for the app, shared by the whole test session"""
+    # httpx 0.28+ requires ASGITransport instead of app parameter.
+    # trust_env=False skips building a proxy transport per *_PROXY env var.
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test", trust_env=False
+    ) as ac:
+        yield ac
+
+
 @pytest_asyncio.fixture
-async def client(db: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
+async def client(
+    http_client: AsyncClient, db: AsyncSession
+) -> AsyncGenerator[AsyncClient, None]:
     """Create test HTTP client"""
 
     # Override database dependency
@@ -264,11 +288,53 @@ async def client(db: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
 
     app.dependency_overrides[get_db] = override_get_db
 
-    # Create client (httpx 0.28+ requires ASGITransport instead of app parameter)
-    async with AsyncClient(
-        transport=ASGITransport(app=app), base_url="http://test"
-    ) as ac:
-        yield ac
+    yield http_client
 
-    # Clear overrides
+    # Clear overrides and any cookies the test's responses set
     app.dependency_overrides.clear()
+    http_client.cookies.clear()
+
+
+@pytest_asyncio.fixture
+async def sleeping_task():
+    """Real background task for exercising cancel-and-await shutdown paths"""
+    task = asyncio.create_task(asyncio.sleep(3600))
+    yield task
+    task.cancel()
+
+
+@pytest_asyncio.fixture
+async def fake_redis():
+    """Async Redis client on a fresh in-process server"""
+    from fakeredis import FakeServer
+    from fakeredis.aioredis import FakeRedis
+
+    # A server per test: closed pub/sub connections are not reaped by the
+    # fake server, so a shared one would leak subscriptions between tests
+    client = FakeRedis(server=FakeServer(), decode_responses=True)
+    yield client
+    await client.aclose()
+
+
+@pytest_asyncio.fixture
+async def pubsub_client(fake_redis, monkeypatch):
+    """Create fresh RedisPubSubClient for each test, backed by fake Redis"""
+    from redis.asyncio import BlockingConnectionPool
+
+    from app.core.redis_pubsub import RedisPubSubClient
+
+    fake_pool = fake_redis.connection_pool
+
+    def pool_from_url(url, max_connections, **kwargs):
+        # A real blocking pool whose connections talk to the fake server
+        return BlockingConnectionPool(
+            max_connections=max_connections,
+            connection_class=fake_pool.connection_class,
+            **fake_pool.connection_kwargs,
+        )
+
+    monkeypatch.setattr(BlockingConnectionPool, "from_url", pool_from_url)
+    client = RedisPubSubClient()
+    yield client
+    # Cleanup
+    await client.disconnect()
@@ -1,13 +1,23 @@
 """Tests for Redis cache manager"""
 
 import json
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
 from app.core.cache import CacheManager
 
 
+def scanning(keys):
+    """Build a ``scan_iter`` stand-in yielding ``keys``"""
+
+    async def _scan_iter(*args, **kwargs):
+        for key in keys:
+            yield key
+
+    return MagicMock(side_effect=_scan_iter)
+
+
 class TestCacheManager:
     """Test suite for CacheManager"""
 
@@ -37,7 +47,19 @@ class TestCacheManager:
 
         await cache_manager.disconnect()
 
-        mock_redis.close.assert_called_once()
+        mock_redis.aclose.assert_awaited_once()
+        assert cache_manager.redis is None
+
+    @pytest.mark.asyncio
+    async def test_disconnect_twice_closes_once(self, cache_manager):
+        """Test a second disconnect does not touch the closed client"""
+        mock_redis = AsyncMock()
+        cache_manager.redis = mock_redis
+
+        await cache_manager.disconnect()
+        await cache_manager.disconnect()
+
+        mock_redis.aclose.assert_awaited_once()
 
     @pytest.mark.asyncio
     async def test_disconnect_without_connection(self, cache_manager):
@@ -72,6 +94,28 @@ class TestCacheManager:
         # Should return the plain string if JSON decode fails
         assert result == "plain_string"
 
+    @pytest.mark.asyncio
+    async def test_get_plain_string_skips_json_decode(self, cache_manager):
+        """Test a value that cannot be JSON is returned without decoding"""
+        mock_redis = AsyncMock()
+        mock_redis.get.return_value = "plain_string"
+        cache_manager.redis = mock_redis
+
+        with patch("app.core.cache.json.loads") as mock_loads:
+            result = await cache_manager.get("test_key")
+
+        assert result == "plain_string"
+        mock_loads.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_get_with_json_like_string_value(self, cache_manager):
+        """Test a plain string starting like JSON still falls back to itself"""
+        mock_redis = AsyncMock()
+        mock_redis.get.return_value = "123abc"
+        cache_manager.redis = mock_redis
+
+        assert await cache_manager.get("test_key") == "123abc"
+
     @pytest.mark.asyncio
     async def test_get_with_none_value(self, cache_manager):
         """Test getting a non-existent key"""
@@ -140,6 +184,19 @@ class TestCacheManager:
         assert called_args[0] == "test_key"
         assert isinstance(called_args[1], str)
 
+    @pytest.mark.asyncio
+    async def test_set_with_nested_non_serializable_value(self, cache_manager):
+        """Test a container holding a non-serializable item falls back to str"""
+        mock_redis = AsyncMock()
+        mock_redis.set.return_value = True
+        cache_manager.redis = mock_redis
+
+        test_value = {"created": object()}
+        result = await cache_manager.set("test_key", test_value)
+
+        assert result is True
+        mock_redis.set.assert_called_once_with("test_key", str(test_value))
+
     @pytest.mark.asyncio
     async def test_set_without_redis_connection(self, cache_manager):
         """Test setting value when Redis is not connected"""
@@ -217,41 +274,60 @@ class TestCacheManager:
     async def test_clear_with_pattern(self, cache_manager):
         """Test clearing cache with pattern"""
         mock_redis = AsyncMock()
-        mock_redis.keys.return_value = ["key1", "key2", "key3"]
-        mock_redis.delete.return_value = 3
+        mock_redis.scan_iter = scanning(["key1", "key2", "key3"])
+        mock_redis.unlink.return_value = 3
         cache_manager.redis = mock_redis
 
         result = await cache_manager.clear("test:*")
 
         assert result == 3
-        mock_redis.keys.assert_called_once_with("test:*")
-        mock_redis.delete.assert_called_once_with("key1", "key2", "key3")
+        mock_redis.scan_iter.assert_called_once_with(match="test:*", count=1000)
+        mock_redis.unlink.assert_called_once_with("key1", "key2", "key3")
+        mock_redis.keys.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_clear_with_default_pattern(self, cache_manager):
         """Test clearing all cache (default pattern)"""
         mock_redis = AsyncMock()
-        mock_redis.keys.return_value = ["key1", "key2"]
-        mock_redis.delete.return_value = 2
+        mock_redis.scan_iter = scanning(["key1", "key2"])
+        mock_redis.unlink.return_value = 2
         cache_manager.redis = mock_redis
 
         result = await cache_manager.clear()
 
         assert result == 2
-        mock_redis.keys.assert_called_once_with("*")
+        mock_redis.scan_iter.assert_called_once_with(match="*", count=1000)
+
+    @pytest.mark.asyncio
+    async def test_clear_unlinks_in_batches(self, cache_manager):
+        """Test large key sets are unlinked in fixed-size batches"""
+        keys = [f"key{i}" for i in range(2500)]
+        mock_redis = AsyncMock()
+        mock_redis.scan_iter = scanning(keys)
+        mock_redis.unlink.side_effect = lambda *batch: len(batch)
+        cache_manager.redis = mock_redis
+
+        result = await cache_manager.clear("key*")
+
+        assert result == 2500
+        assert [len(c.args) for c in mock_redis.unlink.call_args_list] == [
+            1000,
+            1000,
+            500,
+        ]
 
     @pytest.mark.asyncio
     async def test_clear_with_no_matching_keys(self, cache_manager):
         """Test clearing when no keys match pattern"""
         mock_redis = AsyncMock()
-        mock_redis.keys.return_value = []
+        mock_redis.scan_iter = scanning([])
         cache_manager.redis = mock_redis
 
         result = await cache_manager.clear("nonexistent:*")
 
         assert result == 0
-        mock_redis.keys.assert_called_once_with("nonexistent:*")
-        mock_redis.delete.assert_not_called()
+        mock_redis.scan_iter.assert_called_once_with(match="nonexistent:*", count=1000)
+        mock_redis.unlink.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_clear_without_redis_connection(self, cache_manager):
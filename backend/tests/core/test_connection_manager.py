@@ -1,12 +1,16 @@
 """Unit tests for WebSocket ConnectionManager"""
 
 import asyncio
-from unittest.mock import AsyncMock, Mock
+import json
+import sys
+from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
+from fastapi.websockets import WebSocketState
 
-from app.core.websocket import ConnectionManager
+from app.core.websocket import ConnectionManager, _encode
 from app.schemas.websocket import (
+    MarketStatus,
     MessageType,
     PongMessage,
     PriceUpdate,
@@ -14,25 +18,57 @@ from app.schemas.websocket import (
 )
 
 
+class FakeWebSocket:
+    """Minimal WebSocket stand-in that records what the manager sends.
+
+    Plain attributes and coroutines are much cheaper than ``Mock`` attribute
+    lookups, so tests that need no failure injection use this instead.
+    """
+
+    __slots__ = ("sent", "accepted", "closed", "client_state", "application_state")
+
+    def __init__(self):
+        self.sent = []
+        self.accepted = False
+        self.closed = False
+        self.client_state = WebSocketState.CONNECTED
+        self.application_state = WebSocketState.CONNECTED
+
+    async def accept(self):
+        self.accepted = True
+
+    async def close(self, code=1000, reason=None):
+        self.closed = True
+
+    async def send_json(self, data):
+        self.sent.append(data)
+
+    async def send_text(self, data):
+        self.sent.append(data)
+
+
 @pytest.fixture
-def manager():
-    """Create a ConnectionManager instance for testing"""
-    # Disable Redis and batching for simpler unit tests
-    return ConnectionManager(
+async def manager():
+    """Create a ConnectionManager instance for testing
+
+    Connections a test leaves open are disconnected at teardown, so no
+    background task outlives the test on the shared event loop.
+    """
+    # Disable Redis, batching and heartbeats for simpler unit tests
+    mgr = ConnectionManager(
         enable_redis=False,
         enable_batching=False,
         enable_rate_limiting=False,
+        enable_heartbeat=False,
     )
+    yield mgr
+    await mgr.disconnect_many(list(mgr.active_connections))
 
 
 @pytest.fixture
 def mock_websocket():
-    """Create a mock WebSocket"""
-    ws = Mock()
-    ws.accept = AsyncMock()
-    ws.send_json = AsyncMock()
-    ws.receive_json = AsyncMock()
-    return ws
+    """Create a fake WebSocket"""
+    return FakeWebSocket()
 
 
 class TestConnectionLifecycle:
@@ -52,18 +88,13 @@ class TestConnectionLifecycle:
         assert len(manager.active_connections) == 1
 
         # Verify WebSocket accept was called
-        mock_websocket.accept.assert_called_once()
+        assert mock_websocket.accepted
 
     @pytest.mark.asyncio
     async def test_connect_multiple_clients(self, manager):
         """Test multiple connections"""
-        mock_ws1 = Mock()
-        mock_ws1.accept = AsyncMock()
-        mock_ws1.send_json = AsyncMock()
-
-        mock_ws2 = Mock()
-        mock_ws2.accept = AsyncMock()
-        mock_ws2.send_json = AsyncMock()
+        mock_ws1 = FakeWebSocket()
+        mock_ws2 = FakeWebSocket()
 
         # Connect two clients
         conn_id1 = await manager.connect(mock_ws1, user_id="user1")
@@ -102,13 +133,8 @@ class TestConnectionLifecycle:
     @pytest.mark.asyncio
     async def test_multiple_connections_same_user(self, manager):
         """Test same user connecting from multiple devices"""
-        mock_ws1 = Mock()
-        mock_ws1.accept = AsyncMock()
-        mock_ws1.send_json = AsyncMock()
-
-        mock_ws2 = Mock()
-        mock_ws2.accept = AsyncMock()
-        mock_ws2.send_json = AsyncMock()
+        mock_ws1 = FakeWebSocket()
+        mock_ws2 = FakeWebSocket()
 
         # Same user, two connections
         conn_id1 = await manager.connect(mock_ws1, user_id="same-user")
@@ -126,17 +152,9 @@ class TestConnectionLifecycle:
         assert len(manager.active_connections) == 0
 
         # Add connections
-        mock_ws1 = Mock()
-        mock_ws1.accept = AsyncMock()
-        mock_ws1.send_json = AsyncMock()
-
-        mock_ws2 = Mock()
-        mock_ws2.accept = AsyncMock()
-        mock_ws2.send_json = AsyncMock()
-
-        mock_ws3 = Mock()
-        mock_ws3.accept = AsyncMock()
-        mock_ws3.send_json = AsyncMock()
+        mock_ws1 = FakeWebSocket()
+        mock_ws2 = FakeWebSocket()
+        mock_ws3 = FakeWebSocket()
 
         conn_id1 = await manager.connect(mock_ws1)
         assert len(manager.active_connections) == 1
@@ -164,17 +182,9 @@ class TestMessageBroadcasting:
     async def test_broadcast_to_all(self, manager):
         """Test broadcasting message to all connected clients"""
         # Create 3 connections
-        mock_ws1 = Mock()
-        mock_ws1.accept = AsyncMock()
-        mock_ws1.send_json = AsyncMock()
-
-        mock_ws2 = Mock()
-        mock_ws2.accept = AsyncMock()
-        mock_ws2.send_json = AsyncMock()
-
-        mock_ws3 = Mock()
-        mock_ws3.accept = AsyncMock()
-        mock_ws3.send_json = AsyncMock()
+        mock_ws1 = FakeWebSocket()
+        mock_ws2 = FakeWebSocket()
+        mock_ws3 = FakeWebSocket()
 
         await manager.connect(mock_ws1)
         await manager.connect(mock_ws2)
@@ -185,25 +195,33 @@ class TestMessageBroadcasting:
         await manager.broadcast(message)
 
         # Verify all received
-        mock_ws1.send_json.assert_called()
-        mock_ws2.send_json.assert_called()
-        mock_ws3.send_json.assert_called()
+        assert mock_ws1.sent
+        assert mock_ws2.sent
+        assert mock_ws3.sent
+
+    @pytest.mark.asyncio
+    async def test_broadcast_encodes_message_once(self, manager):
+        """Test an unbatched broadcast serializes the message only once"""
+        websockets = []
+        for _ in range(3):
+            mock_ws = FakeWebSocket()
+            await manager.connect(mock_ws)
+            websockets.append(mock_ws)
+
+        with patch("app.core.websocket._encode", wraps=_encode) as encode:
+            await manager.broadcast(PongMessage())
+
+        encode.assert_called_once()
+        frames = {ws.sent[-1] for ws in websockets}
+        assert len(frames) == 1
 
     @pytest.mark.asyncio
     async def test_broadcast_with_exclude(self, manager):
         """Test broadcasting with exclusion list"""
         # Create 3 connections
-        mock_ws1 = Mock()
-        mock_ws1.accept = AsyncMock()
-        mock_ws1.send_json = AsyncMock()
-
-        mock_ws2 = Mock()
-        mock_ws2.accept = AsyncMock()
-        mock_ws2.send_json = AsyncMock()
-
-        mock_ws3 = Mock()
-        mock_ws3.accept = AsyncMock()
-        mock_ws3.send_json = AsyncMock()
+        mock_ws1 = FakeWebSocket()
+        mock_ws2 = FakeWebSocket()
+        mock_ws3 = FakeWebSocket()
 
         await manager.connect(mock_ws1)
         conn_id2 = await manager.connect(mock_ws2)
@@ -214,9 +232,9 @@ class TestMessageBroadcasting:
         await manager.broadcast(message, exclude={conn_id2})
 
         # Verify only conn_id1 and conn_id3 received
-        mock_ws1.send_json.assert_called()
-        mock_ws2.send_json.assert_not_called()
-        mock_ws3.send_json.assert_called()
+        assert mock_ws1.sent
+        assert not mock_ws2.sent
+        assert mock_ws3.sent
 
     @pytest.mark.asyncio
     async def test_send_to_user(self, manager, mock_websocket):
@@ -236,23 +254,15 @@ class TestMessageBroadcasting:
 
         # Verify sent
         assert result is True
-        mock_websocket.send_json.assert_called_once()
+        assert len(mock_websocket.sent) == 1
 
     @pytest.mark.asyncio
     async def test_send_to_subscribers(self, manager):
         """Test sending message to user group/subscribers"""
         # Create 3 connections
-        mock_ws1 = Mock()
-        mock_ws1.accept = AsyncMock()
-        mock_ws1.send_json = AsyncMock()
-
-        mock_ws2 = Mock()
-        mock_ws2.accept = AsyncMock()
-        mock_ws2.send_json = AsyncMock()
-
-        mock_ws3 = Mock()
-        mock_ws3.accept = AsyncMock()
-        mock_ws3.send_json = AsyncMock()
+        mock_ws1 = FakeWebSocket()
+        mock_ws2 = FakeWebSocket()
+        mock_ws3 = FakeWebSocket()
 
         conn_id1 = await manager.connect(mock_ws1)
         await manager.connect(mock_ws2)
@@ -273,17 +283,15 @@ class TestMessageBroadcasting:
         await manager.send_to_subscribers(SubscriptionType.STOCK, "005930", message)
 
         # Verify only subscribers received
-        mock_ws1.send_json.assert_called()
-        mock_ws2.send_json.assert_not_called()
-        mock_ws3.send_json.assert_called()
+        assert mock_ws1.sent
+        assert not mock_ws2.sent
+        assert mock_ws3.sent
 
     @pytest.mark.asyncio
     async def test_broadcast_price_update(self, manager):
         """Test broadcasting price update format"""
         # Create connection
-        mock_ws = Mock()
-        mock_ws.accept = AsyncMock()
-        mock_ws.send_json = AsyncMock()
+        mock_ws = FakeWebSocket()
 
         conn_id = await manager.connect(mock_ws)
         await manager.subscribe(conn_id, SubscriptionType.STOCK, "005930")
@@ -299,12 +307,32 @@ class TestMessageBroadcasting:
         await manager.send_to_subscribers(SubscriptionType.STOCK, "005930", message)
 
         # Verify message format
-        mock_ws.send_json.assert_called_once()
-        call_args = mock_ws.send_json.call_args[0][0]
+        assert len(mock_ws.sent) == 1
+        call_args = json.loads(mock_ws.sent[0])
         assert call_args["type"] == MessageType.PRICE_UPDATE
         assert call_args["stock_code"] == "005930"
         assert call_args["price"] == 70000
 
+    @pytest.mark.asyncio
+    async def test_market_fanout_shares_one_frame(self, manager):
+        """Test market subscribers all receive the same pre-encoded frame"""
+        websockets = []
+        for _ in range(3):
+            mock_ws = FakeWebSocket()
+            conn_id = await manager.connect(mock_ws)
+            await manager.subscribe(conn_id, SubscriptionType.MARKET, "KOSPI")
+            websockets.append(mock_ws)
+
+        message = MarketStatus(market="KOSPI", status="open")
+        await manager.send_to_subscribers(SubscriptionType.MARKET, "KOSPI", message)
+
+        frames = {ws.sent[-1] for ws in websockets}
+        assert len(frames) == 1
+        assert '"status":"open"' in frames.pop()
+        assert message.sequence is not None
+        for ws in websockets:
+            assert len(ws.sent) == 1
+
     @pytest.mark.asyncio
     async def test_broadcast_empty_connections(self, manager):
         """Test broadcasting when no clients connected"""
@@ -327,7 +355,7 @@ class TestErrorHandling:
         # Create mock that raises on send
         mock_ws = Mock()
         mock_ws.accept = AsyncMock()
-        mock_ws.send_json = AsyncMock(side_effect=Exception("Connection error"))
+        mock_ws.send_text = AsyncMock(side_effect=Exception("Connection error"))
 
         conn_id = await manager.connect(mock_ws)
 
@@ -346,7 +374,7 @@ class TestErrorHandling:
         # Create mock that raises WebSocketDisconnect
         mock_ws = Mock()
         mock_ws.accept = AsyncMock()
-        mock_ws.send_json = AsyncMock(side_effect=WebSocketDisconnect())
+        mock_ws.send_text = AsyncMock(side_effect=WebSocketDisconnect())
 
         conn_id = await manager.connect(mock_ws)
 
@@ -358,13 +386,25 @@ class TestErrorHandling:
         assert result is False
         assert conn_id not in manager.active_connections
 
+    @pytest.mark.asyncio
+    async def test_send_to_closed_socket_skips_write(self, manager):
+        """Test a socket already marked closed is dropped without sending"""
+        mock_ws = FakeWebSocket()
+
+        conn_id = await manager.connect(mock_ws)
+        mock_ws.client_state = WebSocketState.DISCONNECTED
+
+        result = await manager.send_message(conn_id, PongMessage(), immediate=True)
+
+        assert result is False
+        assert not mock_ws.sent
+        assert conn_id not in manager.active_connections
+
     @pytest.mark.asyncio
     async def test_cleanup_stale_connections(self, manager):
         """Test removing disconnected clients"""
         # Connect
-        mock_ws = Mock()
-        mock_ws.accept = AsyncMock()
-        mock_ws.send_json = AsyncMock()
+        mock_ws = FakeWebSocket()
 
         conn_id = await manager.connect(mock_ws, user_id="test-user")
 
@@ -409,6 +449,81 @@ class TestErrorHandling:
         # Verify cleaned up
         assert conn_id not in manager.active_connections
 
+    @pytest.mark.asyncio
+    async def test_heartbeat_pings_connections_concurrently(self):
+        """Test a stalled socket does not delay pings to the others"""
+        quiet_manager = ConnectionManager(
+            enable_redis=False, enable_batching=False, enable_heartbeat=False
+        )
+        quiet_manager._heartbeat_interval = 0
+        drained = asyncio.Event()
+        pinged = asyncio.Event()
+
+        async def blocked_write(data):
+            await drained.wait()
+
+        async def record_write(data):
+            pinged.set()
+
+        slow_ws, fast_ws, dead_ws = Mock(), Mock(), Mock()
+        for ws in (slow_ws, fast_ws, dead_ws):
+            ws.accept = AsyncMock()
+        slow_ws.send_text = AsyncMock(side_effect=blocked_write)
+        fast_ws.send_text = AsyncMock(side_effect=record_write)
+        dead_ws.send_text = AsyncMock(side_effect=RuntimeError("closed"))
+        await quiet_manager.connect(slow_ws)
+        await quiet_manager.connect(fast_ws)
+        dead_id = await quiet_manager.connect(dead_ws)
+
+        heartbeat = asyncio.create_task(quiet_manager._heartbeat_loop())
+        try:
+            await asyncio.wait_for(pinged.wait(), timeout=1)
+            slow_ws.send_text.assert_awaited_once()
+
+            # Failed sockets are dropped once the tick's sends complete
+            drained.set()
+            async with asyncio.timeout(1):
+                while dead_id in quiet_manager.active_connections:
+                    await asyncio.sleep(0)
+        finally:
+            heartbeat.cancel()
+            await asyncio.gather(heartbeat, return_exceptions=True)
+
+        assert len(quiet_manager.active_connections) == 2
+
+    @pytest.mark.asyncio
+    async def test_heartbeat_encodes_ping_once_per_tick(self):
+        """Test every connection gets the same pre-encoded pong frame"""
+        quiet_manager = ConnectionManager(
+            enable_redis=False, enable_batching=False, enable_heartbeat=False
+        )
+        quiet_manager._heartbeat_interval = 0
+        websockets = [FakeWebSocket() for _ in range(3)]
+        for ws in websockets:
+            await quiet_manager.connect(ws)
+
+        heartbeat = asyncio.create_task(quiet_manager._heartbeat_loop())
+        try:
+            async with asyncio.timeout(1):
+                while not all(ws.sent for ws in websockets):
+                    await asyncio.sleep(0)
+        finally:
+            heartbeat.cancel()
+            await asyncio.gather(heartbeat, return_exceptions=True)
+
+        frames = {ws.sent[0] for ws in websockets}
+        assert len(frames) == 1
+        assert json.loads(frames.pop())["type"] == MessageType.PONG
+
+    @pytest.mark.asyncio
+    async def test_heartbeat_disabled(self, mock_websocket):
+        """Test no heartbeat loop is started when heartbeat is disabled"""
+        quiet_manager = ConnectionManager(enable_redis=False, enable_heartbeat=False)
+
+        await quiet_manager.connect(mock_websocket)
+
+        assert quiet_manager._heartbeat_task is None
+
 
 class TestConcurrencySafety:
     """Test concurrency and thread safety"""
@@ -418,9 +533,7 @@ class TestConcurrencySafety:
         """Test multiple simultaneous connections"""
 
         async def connect_client(index):
-            mock_ws = Mock()
-            mock_ws.accept = AsyncMock()
-            mock_ws.send_json = AsyncMock()
+            mock_ws = FakeWebSocket()
             return await manager.connect(mock_ws, user_id=f"user-{index}")
 
         # Connect 10 clients concurrently
@@ -437,9 +550,7 @@ class TestConcurrencySafety:
         # Create 10 connections
         conn_ids = []
         for i in range(10):
-            mock_ws = Mock()
-            mock_ws.accept = AsyncMock()
-            mock_ws.send_json = AsyncMock()
+            mock_ws = FakeWebSocket()
             conn_id = await manager.connect(mock_ws)
             conn_ids.append(conn_id)
 
@@ -450,14 +561,34 @@ class TestConcurrencySafety:
         # Verify all disconnected
         assert len(manager.active_connections) == 0
 
+    @pytest.mark.asyncio
+    async def test_disconnect_many(self):
+        """Test bulk disconnection removes every connection in one call"""
+        # Heartbeat enabled, to check it stops with the last connection
+        manager = ConnectionManager(
+            enable_redis=False, enable_batching=False, enable_rate_limiting=False
+        )
+        conn_ids = []
+        for i in range(10):
+            mock_ws = FakeWebSocket()
+            conn_id = await manager.connect(mock_ws, user_id=f"user{i}")
+            await manager.subscribe(conn_id, SubscriptionType.STOCK, "005930")
+            conn_ids.append(conn_id)
+
+        await manager.disconnect_many(conn_ids)
+
+        assert len(manager.active_connections) == 0
+        assert len(manager.connection_info) == 0
+        assert "005930" not in manager.subscriptions[SubscriptionType.STOCK]
+        assert set(manager._disconnected_sessions) == set(conn_ids)
+        assert manager._heartbeat_task is None
+
     @pytest.mark.asyncio
     async def test_concurrent_broadcasts(self, manager):
         """Test concurrent message broadcasts"""
         # Create 5 connections
         for i in range(5):
-            mock_ws = Mock()
-            mock_ws.accept = AsyncMock()
-            mock_ws.send_json = AsyncMock()
+            mock_ws = FakeWebSocket()
             await manager.connect(mock_ws)
 
         # Broadcast 10 messages concurrently
@@ -472,6 +603,31 @@ class TestConcurrencySafety:
         # Verify all connections still active
         assert len(manager.active_connections) == 5
 
+    @pytest.mark.asyncio
+    async def test_broadcast_while_connections_disconnect(self, manager):
+        """Test connections dropping mid-broadcast do not break the fan-out"""
+        websockets = [FakeWebSocket() for _ in range(5)]
+        conn_ids = [await manager.connect(ws) for ws in websockets]
+
+        async def disconnect_during_send(data):
+            await manager.disconnect(conn_ids[1])
+            await manager.disconnect(conn_ids[2])
+
+        failing_ws = Mock()
+        failing_ws.accept = AsyncMock()
+        failing_ws.send_text = AsyncMock(side_effect=disconnect_during_send)
+        await manager.connect(failing_ws)
+
+        await asyncio.gather(
+            manager.broadcast(PongMessage()),
+            manager.broadcast(PongMessage()),
+            manager.disconnect(conn_ids[3]),
+        )
+
+        assert set(manager.active_connections) >= {conn_ids[0], conn_ids[4]}
+        assert not set(manager.active_connections) & set(conn_ids[1:4])
+        assert len(websockets[0].sent) == 2
+
     @pytest.mark.asyncio
     async def test_thread_safety_sequence_counter(self, manager):
         """Test ConnectionManager sequence counter is thread-safe"""
@@ -495,9 +651,7 @@ class TestSubscriptionManagement:
     async def test_subscribe_and_get_subscribers(self, manager):
         """Test subscription management"""
         # Create connection
-        mock_ws = Mock()
-        mock_ws.accept = AsyncMock()
-        mock_ws.send_json = AsyncMock()
+        mock_ws = FakeWebSocket()
 
         conn_id = await manager.connect(mock_ws)
 
@@ -511,9 +665,7 @@ class TestSubscriptionManagement:
     @pytest.mark.asyncio
     async def test_unsubscribe(self, manager):
         """Test unsubscription"""
-        mock_ws = Mock()
-        mock_ws.accept = AsyncMock()
-        mock_ws.send_json = AsyncMock()
+        mock_ws = FakeWebSocket()
 
         conn_id = await manager.connect(mock_ws)
 
@@ -525,12 +677,18 @@ class TestSubscriptionManagement:
         subscribers = manager.get_subscribers(SubscriptionType.STOCK, "005930")
         assert conn_id not in subscribers
 
+    @pytest.mark.asyncio
+    async def test_unsubscribe_unknown_leaves_no_entries(self, manager):
+        """Test unsubscribing what was never subscribed creates no state"""
+        manager.unsubscribe("conn-x", SubscriptionType.STOCK, "005930")
+
+        assert "005930" not in manager.subscriptions[SubscriptionType.STOCK]
+        assert "conn-x" not in manager.connection_subscriptions
+
     @pytest.mark.asyncio
     async def test_multiple_subscriptions(self, manager):
         """Test multiple subscriptions per connection"""
-        mock_ws = Mock()
-        mock_ws.accept = AsyncMock()
-        mock_ws.send_json = AsyncMock()
+        mock_ws = FakeWebSocket()
 
         conn_id = await manager.connect(mock_ws)
 
@@ -544,6 +702,64 @@ class TestSubscriptionManagement:
         assert conn_id in manager.get_subscribers(SubscriptionType.STOCK, "000660")
         assert conn_id in manager.get_subscribers(SubscriptionType.MARKET, "KOSPI")
 
+    @pytest.mark.asyncio
+    async def test_subscribe_many(self, manager, mock_websocket):
+        """Test subscribing to several targets in one call"""
+        conn_id = await manager.connect(mock_websocket)
+        targets = ["005930", "000660", "035720"]
+
+        await manager.subscribe_many(conn_id, SubscriptionType.STOCK, targets)
+        await manager.subscribe_many(conn_id, SubscriptionType.STOCK, targets[:1])
+
+        for target in targets:
+            assert conn_id in manager.get_subscribers(SubscriptionType.STOCK, target)
+        assert manager.connection_subscriptions[conn_id][SubscriptionType.STOCK] == set(
+            targets
+        )
+        info = manager.get_connection_info(conn_id)
+        assert info.subscriptions[SubscriptionType.STOCK] == targets
+
+    @pytest.mark.asyncio
+    async def test_subscribe_many_accepts_iterator(self, manager, mock_websocket):
+        """Test targets given as a one-shot iterator are all subscribed"""
+        conn_id = await manager.connect(mock_websocket)
+        targets = ["005930", "000660"]
+
+        await manager.subscribe_many(conn_id, SubscriptionType.STOCK, iter(targets))
+
+        info = manager.get_connection_info(conn_id)
+        assert info.subscriptions[SubscriptionType.STOCK] == targets
+        assert manager.connection_subscriptions[conn_id][SubscriptionType.STOCK] == set(
+            targets
+        )
+
+    @pytest.mark.asyncio
+    async def test_subscription_targets_are_interned(self, manager):
+        """Test targets parsed from separate messages share one string"""
+        first, second = (json.loads('"005930"') for _ in range(2))
+        assert first is not second
+
+        await manager.subscribe("conn-a", SubscriptionType.STOCK, first)
+        await manager.subscribe_many("conn-b", SubscriptionType.STOCK, [second])
+
+        (target,) = manager.subscriptions[SubscriptionType.STOCK]
+        assert target is sys.intern("005930")
+        assert list(manager.get_subscribers(SubscriptionType.STOCK, target)) == [
+            "conn-a",
+            "conn-b",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_get_subscribers_in_subscription_order(self, manager):
+        """Test subscribers are returned in the order they subscribed"""
+        conn_ids = ["conn-c", "conn-a", "conn-b"]
+        for conn_id in conn_ids:
+            await manager.subscribe(conn_id, SubscriptionType.STOCK, "005930")
+
+        subscribers = manager.get_subscribers(SubscriptionType.STOCK, "005930")
+        assert list(subscribers) == conn_ids
+        assert not manager.get_subscribers(SubscriptionType.STOCK, "000660")
+
 
 class TestStatistics:
     """Test statistics functionality"""
@@ -557,9 +773,7 @@ class TestStatistics:
         assert stats["total_subscriptions"] == 0
 
         # Add connections and subscriptions
-        mock_ws = Mock()
-        mock_ws.accept = AsyncMock()
-        mock_ws.send_json = AsyncMock()
+        mock_ws = FakeWebSocket()
 
         conn_id = await manager.connect(mock_ws)
         await manager.subscribe(conn_id, SubscriptionType.STOCK, "005930")
@@ -571,12 +785,34 @@ class TestStatistics:
         assert stats["total_subscriptions"] >= 2
         assert stats["messages_sent"] >= 0
 
+    @pytest.mark.asyncio
+    async def test_subscription_stats_track_changes(self, manager):
+        """Test subscription counts follow subscribe, unsubscribe and disconnect"""
+        conn_id1 = await manager.connect(FakeWebSocket())
+        conn_id2 = await manager.connect(FakeWebSocket())
+        await manager.subscribe(conn_id1, SubscriptionType.STOCK, "005930")
+        await manager.subscribe(conn_id1, SubscriptionType.STOCK, "005930")
+        await manager.subscribe_many(
+            conn_id2, SubscriptionType.STOCK, ["005930", "000660"]
+        )
+        await manager.subscribe(conn_id2, SubscriptionType.MARKET, "KOSPI")
+
+        stats = manager.get_stats()
+        assert stats["total_subscriptions"] == 4
+        assert stats["subscriptions_by_type"] == {"stock": 3, "market": 1}
+
+        manager.unsubscribe(conn_id1, SubscriptionType.STOCK, "005930")
+        manager.unsubscribe(conn_id1, SubscriptionType.STOCK, "005930")
+        await manager.disconnect(conn_id2)
+
+        stats = manager.get_stats()
+        assert stats["total_subscriptions"] == 0
+        assert stats["subscriptions_by_type"] == {"stock": 0, "market": 0}
+
     @pytest.mark.asyncio
     async def test_connection_info(self, manager):
         """Test connection info retrieval"""
-        mock_ws = Mock()
-        mock_ws.accept = AsyncMock()
-        mock_ws.send_json = AsyncMock()
+        mock_ws = FakeWebSocket()
 
         conn_id = await manager.connect(mock_ws, user_id="test-user")
 
@@ -601,9 +837,7 @@ class TestSessionRestoration:
     @pytest.mark.asyncio
     async def test_session_save_on_disconnect(self, manager):
         """Test session is saved on disconnect"""
-        mock_ws = Mock()
-        mock_ws.accept = AsyncMock()
-        mock_ws.send_json = AsyncMock()
+        mock_ws = FakeWebSocket()
 
         # Connect
         conn_id = await manager.connect(mock_ws, user_id="test-user")
@@ -625,9 +859,7 @@ class TestSessionRestoration:
     async def test_session_restoration_on_reconnect(self, manager):
         """Test session restoration on reconnection"""
         # Create first connection
-        mock_ws1 = Mock()
-        mock_ws1.accept = AsyncMock()
-        mock_ws1.send_json = AsyncMock()
+        mock_ws1 = FakeWebSocket()
 
         conn_id1 = await manager.connect(mock_ws1, user_id="test-user")
 
@@ -639,9 +871,7 @@ class TestSessionRestoration:
         await manager.disconnect(conn_id1)
 
         # Reconnect with same session
-        mock_ws2 = Mock()
-        mock_ws2.accept = AsyncMock()
-        mock_ws2.send_json = AsyncMock()
+        mock_ws2 = FakeWebSocket()
 
         conn_id2, restored_subs, missed_msgs = await manager.reconnect(
             mock_ws2, conn_id1, user_id="test-user"
@@ -662,9 +892,7 @@ class TestSessionRestoration:
     @pytest.mark.asyncio
     async def test_reconnect_with_expired_session(self, manager):
         """Test reconnection fails with expired session"""
-        mock_ws = Mock()
-        mock_ws.accept = AsyncMock()
-        mock_ws.send_json = AsyncMock()
+        mock_ws = FakeWebSocket()
 
         # Try to reconnect with non-existent session
         with pytest.raises(ValueError, match="Session .* not found"):
@@ -676,17 +904,13 @@ class TestSessionRestoration:
     async def test_reconnect_with_user_mismatch(self, manager):
         """Test reconnection fails with user ID mismatch"""
         # Create and disconnect connection
-        mock_ws1 = Mock()
-        mock_ws1.accept = AsyncMock()
-        mock_ws1.send_json = AsyncMock()
+        mock_ws1 = FakeWebSocket()
 
         conn_id = await manager.connect(mock_ws1, user_id="user1")
         await manager.disconnect(conn_id)
 
         # Try to reconnect with different user
-        mock_ws2 = Mock()
-        mock_ws2.accept = AsyncMock()
-        mock_ws2.send_json = AsyncMock()
+        mock_ws2 = FakeWebSocket()
 
         with pytest.raises(ValueError, match="User ID mismatch"):
             await manager.reconnect(mock_ws2, conn_id, user_id="user2")
@@ -706,11 +930,7 @@ class TestConnectionRateLimitingPerIP:
         )
 
     def _make_ws(self):
-        ws = Mock()
-        ws.accept = AsyncMock()
-        ws.send_json = AsyncMock()
-        ws.close = AsyncMock()
-        return ws
+        return FakeWebSocket()
 
     @pytest.mark.asyncio
     async def test_connections_within_limit(self, rate_limited_manager):
@@ -738,7 +958,7 @@ class TestConnectionRateLimitingPerIP:
         with pytest.raises(ConnectionRefusedError):
             await rate_limited_manager.connect(ws3, client_ip="10.0.0.1")
 
-        ws3.close.assert_called_once()
+        assert ws3.closed
         assert len(rate_limited_manager.active_connections) == 2
 
     @pytest.mark.asyncio
@@ -1,21 +1,32 @@
 """Tests for Redis Pub/Sub client"""
 
 import asyncio
-import json
-from unittest.mock import AsyncMock, MagicMock, patch
+from typing import Optional
+from unittest.mock import AsyncMock, patch
 
 import pytest
+import pytest_asyncio
+import redis.asyncio as redis
+from pydantic_core import to_json
 
-from app.core.redis_pubsub import RedisPubSubClient, redis_pubsub
+from app.core.config import settings
+from app.core.redis_pubsub import ChannelState, RedisPubSubClient
 
 
-@pytest.fixture
-def pubsub_client():
-    """Create fresh RedisPubSubClient for each test"""
-    client = RedisPubSubClient()
-    yield client
-    # Cleanup
-    client._running = False
+@pytest_asyncio.fixture
+async def listener(fake_redis):
+    """Independent pub/sub connection for observing the fake server"""
+    pubsub = fake_redis.pubsub()
+    yield pubsub
+    await pubsub.aclose()
+
+
+async def next_message(pubsub) -> dict:
+    """Wait for the next published message on ``pubsub``"""
+    while True:
+        message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1)
+        if message is not None:
+            return message
 
 
 class TestRedisPubSubClientInit:
@@ -44,43 +55,72 @@ class TestRedisPubSubConnect:
     """Test Redis connection functionality"""
 
     @pytest.mark.asyncio
-    async def test_connect_success(self, pubsub_client: RedisPubSubClient):
+    async def test_connect_success(self, pubsub_client: RedisPubSubClient, fake_redis):
         """Test successful Redis connection"""
-        mock_redis = AsyncMock()
-        mock_redis.ping = AsyncMock(return_value=True)
-        mock_redis.pubsub = MagicMock(return_value=AsyncMock())
-
-        with patch("app.core.redis_pubsub.redis.from_url", return_value=mock_redis):
-            await pubsub_client.connect()
+        await pubsub_client.connect()
 
-            assert pubsub_client._redis is not None
-            assert pubsub_client._pubsub is not None
-            mock_redis.ping.assert_called_once()
+        await pubsub_client._redis.set("probe", "1")
+        assert await fake_redis.get("probe") == "1"
+        assert pubsub_client._pubsub is not None
 
     @pytest.mark.asyncio
     async def test_connect_failure_raises_exception(
-        self, pubsub_client: RedisPubSubClient
+        self, pubsub_client: RedisPubSubClient, monkeypatch
     ):
         """Test connection failure raises exception"""
+
+        def refuse(*args, **kwargs):
+            raise Exception("Connection refused")
+
+        # Override the fake-server factory installed by pubsub_client
+        monkeypatch.setattr(
+            "app.core.redis_pubsub.redis.BlockingConnectionPool.from_url", refuse
+        )
+
+        with pytest.raises(Exception, match="Connection refused"):
+            await pubsub_client.connect()
+
+        assert pubsub_client.is_connected() is False
+
+    @pytest.mark.asyncio
+    async def test_pool_reused(self, pubsub_client: RedisPubSubClient):
+        """Test repeated connects and publishes share one connection pool"""
         with patch(
-            "app.core.redis_pubsub.redis.from_url",
-            side_effect=Exception("Connection refused"),
-        ):
-            with pytest.raises(Exception, match="Connection refused"):
-                await pubsub_client.connect()
+            "app.core.redis_pubsub.redis.BlockingConnectionPool.from_url",
+            wraps=redis.BlockingConnectionPool.from_url,
+        ) as mock_from_url:
+            await pubsub_client.connect()
+            await pubsub_client.connect()
+            await asyncio.gather(
+                *(pubsub_client.publish("test_channel", {"n": n}) for n in range(10))
+            )
+
+        mock_from_url.assert_called_once()
+        assert (
+            mock_from_url.call_args.kwargs["max_connections"]
+            == settings.REDIS_PUBSUB_MAX_CONNECTIONS
+        )
+
+    @pytest.mark.asyncio
+    async def test_connect_after_disconnect_opens_new_client(
+        self, pubsub_client: RedisPubSubClient
+    ):
+        """Test a disconnected client can connect again"""
+        await pubsub_client.connect()
+        await pubsub_client.disconnect()
+        assert pubsub_client.is_connected() is False
+
+        await pubsub_client.connect()
+
+        assert await pubsub_client.publish("test_channel", {"n": 1}) == 0
 
     @pytest.mark.asyncio
     async def test_is_connected_true_after_connect(
         self, pubsub_client: RedisPubSubClient
     ):
         """Test is_connected returns True after successful connection"""
-        mock_redis = AsyncMock()
-        mock_redis.ping = AsyncMock(return_value=True)
-        mock_redis.pubsub = MagicMock(return_value=AsyncMock())
-
-        with patch("app.core.redis_pubsub.redis.from_url", return_value=mock_redis):
-            await pubsub_client.connect()
-            assert pubsub_client.is_connected() is True
+        await pubsub_client.connect()
+        assert pubsub_client.is_connected() is True
 
 
 class TestRedisPubSubDisconnect:
@@ -99,64 +139,60 @@ class TestRedisPubSubDisconnect:
 
     @pytest.mark.asyncio
     async def test_disconnect_cancels_listener_task(
-        self, pubsub_client: RedisPubSubClient
+        self, pubsub_client: RedisPubSubClient, sleeping_task: asyncio.Task
     ):
         """Test disconnect cancels listener task"""
-
-        # Create a mock task that is both cancellable and awaitable
-        # Real tasks raise CancelledError when awaited after cancel()
-        class CancelledTaskMock:
-            def __init__(self):
-                self.cancel = MagicMock()
-
-            def __await__(self):
-                raise asyncio.CancelledError()
-                yield  # pragma: no cover
-
-        mock_task = CancelledTaskMock()
-
-        pubsub_client._listener_task = mock_task
-        pubsub_client._redis = None
-        pubsub_client._pubsub = None
+        pubsub_client._listener_task = sleeping_task
 
         await pubsub_client.disconnect()
 
-        mock_task.cancel.assert_called_once()
+        assert sleeping_task.cancelled()
 
     @pytest.mark.asyncio
-    async def test_disconnect_unsubscribes_all(self, pubsub_client: RedisPubSubClient):
+    async def test_disconnect_unsubscribes_all(
+        self, pubsub_client: RedisPubSubClient, fake_redis
+    ):
         """Test disconnect unsubscribes from all channels"""
-        mock_pubsub = AsyncMock()
-        mock_redis = AsyncMock()
-
-        pubsub_client._pubsub = mock_pubsub
-        pubsub_client._redis = mock_redis
+        await pubsub_client.connect()
+        await pubsub_client.subscribe("stock:005930:price", lambda c, d: None)
+        await pubsub_client.subscribe("stock:*:price", lambda c, d: None)
 
         await pubsub_client.disconnect()
 
-        mock_pubsub.unsubscribe.assert_called_once()
-        mock_pubsub.close.assert_called_once()
-        mock_redis.close.assert_called_once()
+        assert await fake_redis.pubsub_numsub("stock:005930:price") == [
+            ("stock:005930:price", 0)
+        ]
+        assert await fake_redis.pubsub_numpat() == 0
 
 
 class TestRedisPubSubPublish:
     """Test Redis publish functionality"""
 
     @pytest.mark.asyncio
-    async def test_publish_success(self, pubsub_client: RedisPubSubClient):
+    async def test_publish_success(self, pubsub_client: RedisPubSubClient, listener):
         """Test successful message publishing"""
-        mock_redis = AsyncMock()
-        mock_redis.publish = AsyncMock(return_value=5)
-
-        pubsub_client._redis = mock_redis
+        await pubsub_client.connect()
+        await listener.subscribe("stock:005930:price")
 
         message = {"stock_code": "005930", "price": 70000}
         receivers = await pubsub_client.publish("stock:005930:price", message)
 
-        assert receivers == 5
-        mock_redis.publish.assert_called_once_with(
-            "stock:005930:price", json.dumps(message)
-        )
+        assert receivers == 1
+        received = await next_message(listener)
+        assert received["data"] == to_json(message).decode()
+
+    @pytest.mark.asyncio
+    async def test_publish_pre_encoded_message(
+        self, pubsub_client: RedisPubSubClient, listener
+    ):
+        """Test an already encoded JSON string is published unchanged"""
+        await pubsub_client.connect()
+        await listener.subscribe("stock:005930:price")
+
+        message = '{"stock_code":"005930","price":70000}'
+        await pubsub_client.publish("stock:005930:price", message)
+
+        assert (await next_message(listener))["data"] == message
 
     @pytest.mark.asyncio
     async def test_publish_without_connection_raises(
@@ -171,24 +207,180 @@ class TestRedisPubSubPublish:
     @pytest.mark.asyncio
     async def test_publish_error_propagates(self, pubsub_client: RedisPubSubClient):
         """Test publish error is propagated"""
-        mock_redis = AsyncMock()
-        mock_redis.publish = AsyncMock(side_effect=Exception("Redis error"))
+        await pubsub_client.connect()
+
+        with patch.object(
+            pubsub_client._redis, "publish", side_effect=Exception("Redis error")
+        ):
+            with pytest.raises(Exception, match="Redis error"):
+                await pubsub_client.publish("test_channel", {"test": "data"})
 
-        pubsub_client._redis = mock_redis
+    @pytest.mark.asyncio
+    async def test_publish_many_uses_one_script_call(
+        self, pubsub_client: RedisPubSubClient, listener
+    ):
+        """Test several messages are sent through a single EVALSHA"""
+        await pubsub_client.connect()
+        await listener.subscribe("stock:005930:price")
+
+        with patch.object(
+            pubsub_client._redis, "evalsha", wraps=pubsub_client._redis.evalsha
+        ) as evalsha:
+            receivers = await pubsub_client.publish_many(
+                [
+                    ("stock:005930:price", {"price": 70000}),
+                    ("stock:000660:price", '{"price":150000}'),
+                    ("stock:005930:price", '{"price":70100}'),
+                ]
+            )
+
+        assert receivers == [1, 0, 1]
+        evalsha.assert_called_once()
+        assert (await next_message(listener))["data"] == '{"price":70000}'
+        assert (await next_message(listener))["data"] == '{"price":70100}'
 
-        with pytest.raises(Exception, match="Redis error"):
-            await pubsub_client.publish("test_channel", {"test": "data"})
+    @pytest.mark.asyncio
+    async def test_publish_many_large_batch_is_one_script_call(
+        self, pubsub_client: RedisPubSubClient
+    ):
+        """Test a full market snapshot still takes a single EVALSHA"""
+        await pubsub_client.connect()
+        items = [(f"stock:{code:06d}:price", {"price": code}) for code in range(1000)]
+
+        with patch.object(
+            pubsub_client._redis, "evalsha", wraps=pubsub_client._redis.evalsha
+        ) as evalsha:
+            receivers = await pubsub_client.publish_many(items)
+
+        assert receivers == [0] * 1000
+        assert evalsha.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_publish_many_reloads_flushed_script(
+        self, pubsub_client: RedisPubSubClient, fake_redis, listener
+    ):
+        """Test publish_many recovers when the server has lost the script"""
+        await pubsub_client.connect()
+        await listener.subscribe("test_channel")
+        await fake_redis.script_flush()
+
+        assert await pubsub_client.publish_many([("test_channel", '{"n":1}')]) == [1]
+        assert (await next_message(listener))["data"] == '{"n":1}'
+
+    @pytest.mark.asyncio
+    async def test_publish_many_pipelines_without_scripting(
+        self, pubsub_client: RedisPubSubClient, listener, monkeypatch
+    ):
+        """Test a server that rejects SCRIPT LOAD still connects and publishes"""
+
+        async def reject_script_load(self, script):
+            raise redis.ResponseError("NOPERM this user has no permissions")
+
+        monkeypatch.setattr(redis.Redis, "script_load", reject_script_load)
+
+        await pubsub_client.connect()
+        await listener.subscribe("test_channel")
+
+        assert pubsub_client.is_connected()
+        assert pubsub_client._publish_many_script is None
+        receivers = await pubsub_client.publish_many(
+            [("test_channel", '{"n":1}'), ("other_channel", {"n": 2})]
+        )
+
+        assert receivers == [1, 0]
+        assert (await next_message(listener))["data"] == '{"n":1}'
+
+    @pytest.mark.asyncio
+    async def test_publish_nowait_sends_in_background(
+        self, pubsub_client: RedisPubSubClient, listener
+    ):
+        """Test queued messages are published in order by the drain task"""
+        await pubsub_client.connect()
+        await listener.subscribe("stock:005930:price")
+
+        for price in (70000, 70100, 70200):
+            assert pubsub_client.publish_nowait("stock:005930:price", {"price": price})
+
+        for price in (70000, 70100, 70200):
+            message = await next_message(listener)
+            assert message["data"] == to_json({"price": price}).decode()
+
+    @pytest.mark.asyncio
+    async def test_publish_nowait_drops_when_queue_full(
+        self, pubsub_client: RedisPubSubClient
+    ):
+        """Test publish_nowait drops messages once the queue is full"""
+        await pubsub_client.connect()
+        pubsub_client._publish_queue = asyncio.Queue(maxsize=1)
+
+        assert pubsub_client.publish_nowait("test_channel", {"n": 1}) is True
+        assert pubsub_client.publish_nowait("test_channel", {"n": 2}) is False
+
+    @pytest.mark.asyncio
+    async def test_publish_nowait_without_connection_raises(
+        self, pubsub_client: RedisPubSubClient
+    ):
+        """Test publish_nowait raises error when not connected"""
+        with pytest.raises(RuntimeError, match="Redis client not connected"):
+            pubsub_client.publish_nowait("test_channel", {"test": "data"})
+
+    @pytest.mark.asyncio
+    async def test_disconnect_flushes_queued_publishes(
+        self, pubsub_client: RedisPubSubClient, listener
+    ):
+        """Test messages still queued at disconnect are published"""
+        await pubsub_client.connect()
+        await listener.subscribe("test_channel")
+
+        pubsub_client.publish_nowait("test_channel", '{"n":1}')
+        await pubsub_client.disconnect()
+
+        assert (await next_message(listener))["data"] == '{"n":1}'
+
+    @pytest.mark.asyncio
+    async def test_disconnect_finishes_in_flight_batch(
+        self, pubsub_client: RedisPubSubClient, listener, monkeypatch
+    ):
+        """Test a batch already taken by the drain task is not lost at disconnect"""
+        await pubsub_client.connect()
+        await listener.subscribe("test_channel")
+
+        started = asyncio.Event()
+        publish_many = pubsub_client.publish_many
+
+        async def slow_publish_many(items):
+            started.set()
+            await asyncio.sleep(0.05)
+            return await publish_many(items)
+
+        monkeypatch.setattr(pubsub_client, "publish_many", slow_publish_many)
+
+        pubsub_client.publish_nowait("test_channel", '{"n":1}')
+        await asyncio.wait_for(started.wait(), timeout=1)
+        await pubsub_client.disconnect()
+
+        message = await asyncio.wait_for(next_message(listener), timeout=1)
+        assert message["data"] == '{"n":1}'
+        assert pubsub_client._drain_task is None
+
+    @pytest.mark.asyncio
+    async def test_publish_many_without_connection_raises(
+        self, pubsub_client: RedisPubSubClient
+    ):
+        """Test publish_many raises error when not connected"""
+        with pytest.raises(RuntimeError, match="Redis client not connected"):
+            await pubsub_client.publish_many([("test_channel", {"test": "data"})])
 
 
 class TestRedisPubSubSubscribe:
     """Test Redis subscribe functionality"""
 
     @pytest.mark.asyncio
-    async def test_subscribe_exact_channel(self, pubsub_client: RedisPubSubClient):
+    async def test_subscribe_exact_channel(
+        self, pubsub_client: RedisPubSubClient, fake_redis
+    ):
         """Test subscribing to exact channel"""
-        mock_pubsub = AsyncMock()
-        pubsub_client._pubsub = mock_pubsub
-        pubsub_client._running = False
+        await pubsub_client.connect()
 
         async def handler(channel, data):
             pass
@@ -196,22 +388,67 @@ class TestRedisPubSubSubscribe:
         await pubsub_client.subscribe("stock:005930:price", handler)
 
         assert "stock:005930:price" in pubsub_client._subscribers
-        assert handler in pubsub_client._subscribers["stock:005930:price"]
-        mock_pubsub.subscribe.assert_called_once_with("stock:005930:price")
+        state = pubsub_client._subscribers["stock:005930:price"]
+        assert (handler, True) in state.subscribers
+        assert state.is_pattern is False
+        assert await fake_redis.pubsub_numsub("stock:005930:price") == [
+            ("stock:005930:price", 1)
+        ]
 
     @pytest.mark.asyncio
-    async def test_subscribe_pattern_channel(self, pubsub_client: RedisPubSubClient):
+    async def test_subscribe_keeps_handler_snapshots(
+        self, pubsub_client: RedisPubSubClient
+    ):
+        """Test subscribing replaces the handler tuple instead of mutating it"""
+        await pubsub_client.connect()
+
+        async def first(channel, data):
+            pass
+
+        async def second(channel, data):
+            pass
+
+        await pubsub_client.subscribe("stock:005930:price", first)
+        snapshot = pubsub_client._subscribers["stock:005930:price"].subscribers
+
+        await pubsub_client.subscribe("stock:005930:price", second)
+        await pubsub_client.subscribe("stock:005930:price", first)
+
+        assert snapshot == ((first, True),)
+        assert pubsub_client._subscribers["stock:005930:price"].subscribers == (
+            (first, True),
+            (second, True),
+        )
+
+    @pytest.mark.asyncio
+    async def test_subscribe_classifies_sync_handler(
+        self, pubsub_client: RedisPubSubClient
+    ):
+        """Test subscribe records that a plain function is not awaited"""
+        await pubsub_client.connect()
+
+        def handler(channel, data):
+            pass
+
+        await pubsub_client.subscribe("stock:005930:price", handler)
+
+        state = pubsub_client._subscribers["stock:005930:price"]
+        assert state.subscribers == ((handler, False),)
+
+    @pytest.mark.asyncio
+    async def test_subscribe_pattern_channel(
+        self, pubsub_client: RedisPubSubClient, fake_redis
+    ):
         """Test subscribing to pattern channel with wildcard"""
-        mock_pubsub = AsyncMock()
-        pubsub_client._pubsub = mock_pubsub
-        pubsub_client._running = False
+        await pubsub_client.connect()
 
         async def handler(channel, data):
             pass
 
         await pubsub_client.subscribe("stock:*:price", handler)
 
-        mock_pubsub.psubscribe.assert_called_once_with("stock:*:price")
+        assert pubsub_client._subscribers["stock:*:price"].is_pattern is True
+        assert await fake_redis.pubsub_numpat() == 1
 
     @pytest.mark.asyncio
     async def test_subscribe_without_pubsub_raises(
@@ -228,45 +465,66 @@ class TestRedisPubSubSubscribe:
     @pytest.mark.asyncio
     async def test_subscribe_starts_listener(self, pubsub_client: RedisPubSubClient):
         """Test subscribe starts listener task if not running"""
-        mock_pubsub = AsyncMock()
-        pubsub_client._pubsub = mock_pubsub
-        pubsub_client._running = False
+        await pubsub_client.connect()
 
         async def handler(channel, data):
             pass
 
-        with patch.object(pubsub_client, "_listen", new_callable=AsyncMock):
-            await pubsub_client.subscribe("test_channel", handler)
+        await pubsub_client.subscribe("test_channel", handler)
+
+        assert pubsub_client._running is True
+        assert pubsub_client._listener_task is not None
+        assert not pubsub_client._listener_task.done()
+
+    @pytest.mark.asyncio
+    async def test_subscribed_handler_receives_published_message(
+        self, pubsub_client: RedisPubSubClient
+    ):
+        """Test a published message reaches the handler through Redis"""
+        await pubsub_client.connect()
+        received = asyncio.Queue()
+
+        async def handler(channel, data):
+            received.put_nowait((channel, data))
+
+        await pubsub_client.subscribe("stock:*:price", handler)
+        await pubsub_client.publish("stock:005930:price", {"price": 70000})
 
-            assert pubsub_client._running is True
-            assert pubsub_client._listener_task is not None
+        assert await asyncio.wait_for(received.get(), timeout=1) == (
+            "stock:005930:price",
+            {"price": 70000},
+        )
 
 
 class TestRedisPubSubUnsubscribe:
     """Test Redis unsubscribe functionality"""
 
     @pytest.mark.asyncio
-    async def test_unsubscribe_exact_channel(self, pubsub_client: RedisPubSubClient):
+    async def test_unsubscribe_exact_channel(
+        self, pubsub_client: RedisPubSubClient, fake_redis
+    ):
         """Test unsubscribing from exact channel"""
-        mock_pubsub = AsyncMock()
-        pubsub_client._pubsub = mock_pubsub
-        pubsub_client._subscribers["stock:005930:price"] = set()
+        await pubsub_client.connect()
+        await pubsub_client.subscribe("stock:005930:price", lambda c, d: None)
 
         await pubsub_client.unsubscribe("stock:005930:price")
 
         assert "stock:005930:price" not in pubsub_client._subscribers
-        mock_pubsub.unsubscribe.assert_called_once_with("stock:005930:price")
+        assert await fake_redis.pubsub_numsub("stock:005930:price") == [
+            ("stock:005930:price", 0)
+        ]
 
     @pytest.mark.asyncio
-    async def test_unsubscribe_pattern_channel(self, pubsub_client: RedisPubSubClient):
+    async def test_unsubscribe_pattern_channel(
+        self, pubsub_client: RedisPubSubClient, fake_redis
+    ):
         """Test unsubscribing from pattern channel"""
-        mock_pubsub = AsyncMock()
-        pubsub_client._pubsub = mock_pubsub
-        pubsub_client._subscribers["stock:*:price"] = set()
+        await pubsub_client.connect()
+        await pubsub_client.subscribe("stock:*:price", lambda c, d: None)
 
         await pubsub_client.unsubscribe("stock:*:price")
 
-        mock_pubsub.punsubscribe.assert_called_once_with("stock:*:price")
+        assert await fake_redis.pubsub_numpat() == 0
 
     @pytest.mark.asyncio
     async def test_unsubscribe_without_pubsub_returns(
@@ -276,33 +534,26 @@ class TestRedisPubSubUnsubscribe:
         await pubsub_client.unsubscribe("test_channel")  # Should not raise
 
 
-class TestRedisPubSubListen:
-    """Test Redis listener functionality"""
-
-    @pytest.mark.asyncio
-    async def test_listen_without_pubsub_returns(
-        self, pubsub_client: RedisPubSubClient
-    ):
-        """Test _listen returns when PubSub is None"""
-        pubsub_client._pubsub = None
-        await pubsub_client._listen()  # Should return without error
-
-    @pytest.mark.asyncio
-    async def test_listen_processes_message(self, pubsub_client: RedisPubSubClient):
-        """Test _listen processes messages correctly"""
-        received_data = []
+def pubsub_message(channel: str, data, pattern: Optional[str] = None) -> dict:
+    """Build a message as yielded by ``PubSub.listen()``"""
+    if pattern:
+        return {
+            "type": "pmessage",
+            "pattern": pattern,
+            "channel": channel,
+            "data": data,
+        }
+    return {"type": "message", "channel": channel, "data": data}
 
-        async def handler(channel, data):
-            received_data.append((channel, data))
 
-        mock_message = {
-            "type": "message",
-            "channel": "test_channel",
-            "data": '{"test": "data"}',
-        }
+@pytest.fixture
+def listen_harness(pubsub_client: RedisPubSubClient):
+    """Factory that feeds a fixed message stream to ``pubsub_client._listen``"""
 
+    def _make(messages, subscribers, decoders=None) -> RedisPubSubClient:
         async def mock_listen():
-            yield mock_message
+            for message in messages:
+                yield message
             pubsub_client._running = False
 
         mock_pubsub = AsyncMock()
@@ -310,159 +561,244 @@ class TestRedisPubSubListen:
 
         pubsub_client._pubsub = mock_pubsub
         pubsub_client._running = True
-        pubsub_client._subscribers["test_channel"] = {handler}
+        for key, handlers in subscribers.items():
+            pubsub_client._subscribers[key] = ChannelState(
+                tuple(
+                    (handler, asyncio.iscoroutinefunction(handler))
+                    for handler in handlers
+                ),
+                is_pattern="*" in key or "?" in key,
+                decoder=(decoders or {}).get(key),
+            )
+        return pubsub_client
 
-        await pubsub_client._listen()
+    return _make
 
-        assert len(received_data) == 1
-        assert received_data[0] == ("test_channel", {"test": "data"})
+
+class TestRedisPubSubListen:
+    """Test Redis listener functionality"""
 
     @pytest.mark.asyncio
-    async def test_listen_skips_subscription_messages(
+    async def test_listen_without_pubsub_returns(
         self, pubsub_client: RedisPubSubClient
     ):
-        """Test _listen skips subscription confirmation messages"""
+        """Test _listen returns when PubSub is None"""
+        pubsub_client._pubsub = None
+        await pubsub_client._listen()  # Should return without error
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "message, subscription, sync_handler, expected",
+        [
+            pytest.param(
+                pubsub_message("test_channel", '{"test": "data"}'),
+                "test_channel",
+                False,
+                [("test_channel", {"test": "data"})],
+                id="processes_message",
+            ),
+            pytest.param(
+                {"type": "subscribe", "channel": "test_channel", "data": 1},
+                "test_channel",
+                False,
+                [],
+                id="skips_subscription_messages",
+            ),
+            pytest.param(
+                pubsub_message("test_channel", "invalid json{"),
+                "test_channel",
+                False,
+                [],
+                id="handles_invalid_json",
+            ),
+            pytest.param(
+                pubsub_message(
+                    "stock:005930:price", '{"price": 70000}', pattern="stock:*:price"
+                ),
+                "stock:*:price",
+                False,
+                [("stock:005930:price", {"price": 70000})],
+                id="handles_pattern_message",
+            ),
+            pytest.param(
+                pubsub_message("test_channel", '{"test": "sync"}'),
+                "test_channel",
+                True,
+                [("test_channel", {"test": "sync"})],
+                id="calls_sync_handler",
+            ),
+        ],
+    )
+    async def test_listen_delivers(
+        self, listen_harness, message, subscription, sync_handler, expected
+    ):
+        """Test _listen delivers data messages to their handlers"""
         received_data = []
 
-        async def handler(channel, data):
+        def handler(channel, data):
             received_data.append((channel, data))
 
-        async def mock_listen():
-            yield {"type": "subscribe", "channel": "test_channel", "data": 1}
-            pubsub_client._running = False
+        async def async_handler(channel, data):
+            handler(channel, data)
 
-        mock_pubsub = AsyncMock()
-        mock_pubsub.listen = mock_listen
+        client = listen_harness(
+            [message], {subscription: (handler if sync_handler else async_handler,)}
+        )
 
-        pubsub_client._pubsub = mock_pubsub
-        pubsub_client._running = True
-        pubsub_client._subscribers["test_channel"] = {handler}
+        await client._listen()
 
-        await pubsub_client._listen()
+        assert received_data == expected
 
-        assert len(received_data) == 0
+    @pytest.mark.asyncio
+    async def test_listen_counts_messages_per_subscription(self, listen_harness):
+        """Test _listen counts delivered messages per channel and pattern"""
+        messages = [
+            pubsub_message("stock:005930:price", '{"price": 70000}'),
+            pubsub_message(
+                "stock:005930:price", '{"price": 70100}', pattern="stock:*:price"
+            ),
+            {"type": "subscribe", "channel": "stock:005930:price", "data": 1},
+        ]
+
+        def handler(channel, data):
+            pass
+
+        client = listen_harness(
+            messages, {"stock:005930:price": (handler,), "stock:*:price": (handler,)}
+        )
+
+        await client._listen()
+
+        assert client.get_message_count("stock:005930:price") == 2
+        assert client.get_message_count("stock:*:price") == 1
+        assert client.get_message_count("stock:000660:price") == 0
 
     @pytest.mark.asyncio
-    async def test_listen_handles_invalid_json(self, pubsub_client: RedisPubSubClient):
-        """Test _listen handles invalid JSON gracefully"""
+    async def test_listen_does_not_reclassify_handlers(self, listen_harness):
+        """Test _listen uses the handler kind recorded at subscribe"""
         received_data = []
 
         async def handler(channel, data):
-            received_data.append((channel, data))
-
-        async def mock_listen():
-            yield {
-                "type": "message",
-                "channel": "test_channel",
-                "data": "invalid json{",
-            }
-            pubsub_client._running = False
+            received_data.append(data)
 
-        mock_pubsub = AsyncMock()
-        mock_pubsub.listen = mock_listen
-
-        pubsub_client._pubsub = mock_pubsub
-        pubsub_client._running = True
-        pubsub_client._subscribers["test_channel"] = {handler}
+        client = listen_harness(
+            [pubsub_message("test_channel", '{"test": "data"}')] * 3,
+            {"test_channel": (handler,)},
+        )
 
-        await pubsub_client._listen()
+        with patch(
+            "app.core.redis_pubsub.asyncio.iscoroutinefunction",
+            wraps=asyncio.iscoroutinefunction,
+        ) as mock_check:
+            await client._listen()
 
-        assert len(received_data) == 0
+        mock_check.assert_not_called()
+        assert len(received_data) == 3
 
     @pytest.mark.asyncio
-    async def test_listen_handles_handler_exception(
-        self, pubsub_client: RedisPubSubClient
-    ):
+    async def test_listen_handles_handler_exception(self, listen_harness):
         """Test _listen handles handler exceptions gracefully"""
 
         async def failing_handler(channel, data):
             raise ValueError("Handler error")
 
-        async def mock_listen():
-            yield {
-                "type": "message",
-                "channel": "test_channel",
-                "data": '{"test": "data"}',
-            }
-            pubsub_client._running = False
-
-        mock_pubsub = AsyncMock()
-        mock_pubsub.listen = mock_listen
-
-        pubsub_client._pubsub = mock_pubsub
-        pubsub_client._running = True
-        pubsub_client._subscribers["test_channel"] = {failing_handler}
+        client = listen_harness(
+            [pubsub_message("test_channel", '{"test": "data"}')],
+            {"test_channel": (failing_handler,)},
+        )
 
         # Should not raise
-        await pubsub_client._listen()
+        await client._listen()
 
     @pytest.mark.asyncio
-    async def test_listen_handles_pattern_message(
-        self, pubsub_client: RedisPubSubClient
-    ):
-        """Test _listen handles pattern match messages"""
+    async def test_listen_parses_each_delivery_separately(self, listen_harness):
+        """Test a handler mutating its data does not leak into later deliveries"""
         received_data = []
 
         async def handler(channel, data):
-            received_data.append((channel, data))
+            received_data.append(dict(data))
+            data["price"] = 0
 
-        async def mock_listen():
-            yield {
-                "type": "pmessage",
-                "pattern": "stock:*:price",
-                "channel": "stock:005930:price",
-                "data": '{"price": 70000}',
-            }
-            pubsub_client._running = False
+        client = listen_harness(
+            [pubsub_message("test_channel", '{"price": 70000}')] * 2,
+            {"test_channel": (handler,)},
+        )
 
-        mock_pubsub = AsyncMock()
-        mock_pubsub.listen = mock_listen
+        await client._listen()
 
-        pubsub_client._pubsub = mock_pubsub
-        pubsub_client._running = True
-        pubsub_client._subscribers["stock:*:price"] = {handler}
+        assert received_data == [{"price": 70000}, {"price": 70000}]
+
+    @pytest.mark.asyncio
+    async def test_listen_dispatches_handlers_concurrently(self, listen_harness):
+        """Test _listen runs the handlers for one message concurrently"""
+        first_started = asyncio.Event()
+        second_started = asyncio.Event()
+
+        # Each handler waits for the other to start, which only completes
+        # if they are awaited together rather than one after the other
+        async def first_handler(channel, data):
+            first_started.set()
+            await asyncio.wait_for(second_started.wait(), timeout=1)
+
+        async def second_handler(channel, data):
+            second_started.set()
+            await asyncio.wait_for(first_started.wait(), timeout=1)
+
+        client = listen_harness(
+            [pubsub_message("test_channel", '{"test": "data"}')],
+            {"test_channel": (first_handler, second_handler)},
+        )
 
-        await pubsub_client._listen()
+        with patch("app.core.redis_pubsub.logger") as mock_logger:
+            await client._listen()
 
-        assert len(received_data) == 1
-        assert received_data[0] == ("stock:005930:price", {"price": 70000})
+        mock_logger.error.assert_not_called()
 
     @pytest.mark.asyncio
-    async def test_listen_calls_sync_handler(self, pubsub_client: RedisPubSubClient):
-        """Test _listen calls synchronous handlers correctly"""
+    async def test_listen_calls_shared_handler_once(self, listen_harness):
+        """Test a handler on both the channel and its pattern runs once"""
         received_data = []
 
-        def sync_handler(channel, data):
+        async def handler(channel, data):
             received_data.append((channel, data))
 
-        async def mock_listen():
-            yield {
-                "type": "message",
-                "channel": "test_channel",
-                "data": '{"test": "sync"}',
-            }
-            pubsub_client._running = False
+        client = listen_harness(
+            [
+                pubsub_message(
+                    "stock:005930:price", '{"price": 70000}', pattern="stock:*:price"
+                )
+            ],
+            {"stock:005930:price": (handler,), "stock:*:price": (handler,)},
+        )
 
-        mock_pubsub = AsyncMock()
-        mock_pubsub.listen = mock_listen
+        await client._listen()
 
-        pubsub_client._pubsub = mock_pubsub
-        pubsub_client._running = True
-        pubsub_client._subscribers["test_channel"] = {sync_handler}
-
-        await pubsub_client._listen()
+        assert received_data == [("stock:005930:price", {"price": 70000})]
 
-        assert len(received_data) == 1
+    @pytest.mark.asyncio
+    async def test_listen_uses_registered_decoder(self, listen_harness):
+        """Test _listen hands raw payloads to the subscription's decoder"""
+        received_data = []
 
+        async def handler(channel, data):
+            received_data.append((channel, data))
 
-class TestGlobalRedisPubSub:
-    """Test global redis_pubsub instance"""
+        def decoder(channel, raw):
+            if raw == "invalid":
+                raise ValueError("undecodable")
+            return ("decoded", raw)
+
+        client = listen_harness(
+            [
+                pubsub_message("stock:005930:price", data, pattern="stock:*:price")
+                for data in ("invalid", '{"price": 70000}')
+            ],
+            {"stock:*:price": (handler,)},
+            decoders={"stock:*:price": decoder},
+        )
 
-    def test_global_instance_exists(self):
-        """Test global redis_pubsub instance is created"""
-        assert redis_pubsub is not None
-        assert isinstance(redis_pubsub, RedisPubSubClient)
+        await client._listen()
 
-    def test_global_instance_not_connected_initially(self):
-        """Test global instance is not connected initially"""
-        assert redis_pubsub.is_connected() is False
+        assert received_data == [
+            ("stock:005930:price", ("decoded", '{"price": 70000}'))
+        ]
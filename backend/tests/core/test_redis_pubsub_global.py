@@ -0,0 +1,21 @@
+"""Tests for the process-wide redis_pubsub instance
+
+Kept apart from test_redis_pubsub.py, whose tests each build their own
+client, so that ``pytest -n auto --dist=loadfile`` keeps every test of the
+shared global on a single worker.
+"""
+
+from app.core.redis_pubsub import RedisPubSubClient, redis_pubsub
+
+
+class TestGlobalRedisPubSub:
+    """Test global redis_pubsub instance"""
+
+    def test_global_instance_exists(self):
+        """Test global redis_pubsub instance is created"""
+        assert redis_pubsub is not None
+        assert isinstance(redis_pubsub, RedisPubSubClient)
+
+    def test_global_instance_not_connected_initially(self):
+        """Test global instance is not connected initially"""
+        assert redis_pubsub.is_connected() is False
@@ -1,69 +1,80 @@
 """Integration tests for Redis Pub/Sub WebSocket integration"""
 
 import asyncio
+import json
 from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 
-from app.core.redis_pubsub import RedisPubSubClient
-from app.core.websocket import ConnectionManager
-from app.schemas.websocket import MessageType, SubscriptionType
+from app.core.websocket import ConnectionManager, _decode_redis_message
+from app.schemas.websocket import Alert, MessageType, PriceUpdate, SubscriptionType
 from app.services.price_publisher import PricePublisher
 
 
+@pytest.fixture
+def manager():
+    """Unbatched manager so forwarded messages are sent immediately"""
+    return ConnectionManager(
+        enable_redis=False,
+        enable_batching=False,
+        enable_rate_limiting=False,
+    )
+
+
+async def connect_websocket(manager: ConnectionManager):
+    """Connect a mock WebSocket and subscribe it to 005930"""
+    websocket = AsyncMock()
+    conn_id = await manager.connect(websocket)
+    await manager.subscribe(conn_id, SubscriptionType.STOCK, "005930")
+    websocket.send_text.reset_mock()
+    return websocket
+
+
+async def wait_for_send(websocket, timeout: float = 1.0) -> dict:
+    """Wait until ``websocket`` has been sent a frame and return it decoded"""
+    async with asyncio.timeout(timeout):
+        while not websocket.send_text.called:
+            await asyncio.sleep(0.01)
+    return json.loads(websocket.send_text.call_args[0][0])
+
+
 class TestRedisPubSubClient:
     """Test Redis Pub/Sub client"""
 
-    @pytest.mark.skip(
-        reason="Redis mock configuration issues - requires separate fix (BUGFIX-004)"
-    )
     @pytest.mark.asyncio
-    async def test_connect_and_disconnect(self):
+    async def test_connect_and_disconnect(self, pubsub_client, fake_redis):
         """Test Redis connection and disconnection"""
-        client = RedisPubSubClient()
-
-        # Mock Redis connection
-        with patch("redis.asyncio.from_url") as mock_redis:
-            mock_redis_instance = AsyncMock()
-            mock_redis_instance.ping = AsyncMock()
-            mock_redis_instance.pubsub = Mock()
-            mock_redis.return_value = mock_redis_instance
+        await pubsub_client.connect()
+        assert pubsub_client.is_connected()
 
-            await client.connect()
-            assert client.is_connected()
+        await pubsub_client.subscribe("stock:*:price", AsyncMock())
+        await pubsub_client.disconnect()
 
-            await client.disconnect()
+        # Disconnecting drops the pattern subscription on the server
+        assert await fake_redis.pubsub_numpat() == 0
 
     @pytest.mark.asyncio
-    async def test_publish_message(self):
+    async def test_publish_message(self, pubsub_client, fake_redis):
         """Test publishing a message to Redis channel"""
-        client = RedisPubSubClient()
-
-        with patch("redis.asyncio.from_url") as mock_redis:
-            mock_redis_instance = AsyncMock()
-            mock_redis_instance.ping = AsyncMock()
-            mock_redis_instance.pubsub = Mock()
-            mock_redis_instance.publish = AsyncMock(return_value=2)
-            mock_redis.return_value = mock_redis_instance
+        await pubsub_client.connect()
 
-            await client.connect()
+        listeners = [fake_redis.pubsub(), fake_redis.pubsub()]
+        for listener in listeners:
+            await listener.subscribe("stock:005930:price")
 
-            # Publish a message
-            receivers = await client.publish(
-                "stock:005930:price",
-                {"type": "price_update", "price": 72500},
-            )
+        # Publish a message
+        receivers = await pubsub_client.publish(
+            "stock:005930:price",
+            {"type": "price_update", "price": 72500},
+        )
 
-            assert receivers == 2
-            mock_redis_instance.publish.assert_called_once()
+        assert receivers == 2
+        for listener in listeners:
+            await listener.aclose()
 
-    @pytest.mark.skip(
-        reason="Redis mock configuration issues - requires separate fix (BUGFIX-004)"
-    )
     @pytest.mark.asyncio
-    async def test_subscribe_to_channel(self):
+    async def test_subscribe_to_channel(self, pubsub_client, fake_redis):
         """Test subscribing to a Redis channel"""
-        client = RedisPubSubClient()
         handler_called = asyncio.Event()
         received_data = {}
 
@@ -72,20 +83,21 @@ class TestRedisPubSubClient:
             received_data["data"] = data
             handler_called.set()
 
-        with patch("redis.asyncio.from_url") as mock_redis:
-            mock_redis_instance = AsyncMock()
-            mock_redis_instance.ping = AsyncMock()
-            mock_pubsub = AsyncMock()
-            mock_pubsub.subscribe = AsyncMock()
-            mock_pubsub.listen = AsyncMock()
-            mock_redis_instance.pubsub.return_value = mock_pubsub
-            mock_redis.return_value = mock_redis_instance
+        await pubsub_client.connect()
+        await pubsub_client.subscribe("stock:005930:price", test_handler)
 
-            await client.connect()
-            await client.subscribe("stock:005930:price", test_handler)
+        assert "stock:005930:price" in pubsub_client._subscribers
+        assert await fake_redis.pubsub_numsub("stock:005930:price") == [
+            ("stock:005930:price", 1)
+        ]
+
+        await fake_redis.publish("stock:005930:price", '{"price": 72500}')
+        await asyncio.wait_for(handler_called.wait(), timeout=1)
 
-            assert "stock:005930:price" in client._subscribers
-            mock_pubsub.subscribe.assert_called_once_with("stock:005930:price")
+        assert received_data == {
+            "channel": "stock:005930:price",
+            "data": {"price": 72500},
+        }
 
 
 class TestPricePublisher:
@@ -97,7 +109,7 @@ class TestPricePublisher:
         publisher = PricePublisher()
 
         with patch("app.services.price_publisher.redis_pubsub") as mock_redis:
-            mock_redis.publish = AsyncMock()
+            mock_redis.publish_nowait = Mock(return_value=True)
 
             await publisher.publish_price_update(
                 stock_code="005930",
@@ -107,12 +119,12 @@ class TestPricePublisher:
                 volume=15234567,
             )
 
-            # Verify Redis publish was called
-            mock_redis.publish.assert_called_once()
-            call_args = mock_redis.publish.call_args
+            # Verify the update was queued for Redis
+            mock_redis.publish_nowait.assert_called_once()
+            call_args = mock_redis.publish_nowait.call_args
 
             assert call_args[0][0] == "stock:005930:price"
-            message = call_args[0][1]
+            message = json.loads(call_args[0][1])
             assert message["type"] == MessageType.PRICE_UPDATE
             assert message["stock_code"] == "005930"
             assert message["price"] == 72500.0
@@ -140,12 +152,13 @@ class TestPricePublisher:
         ]
 
         with patch("app.services.price_publisher.redis_pubsub") as mock_redis:
-            mock_redis.publish = AsyncMock()
+            mock_redis.publish_many = AsyncMock()
 
             await publisher.publish_bulk_price_updates(updates)
 
-            # Verify publish was called twice
-            assert mock_redis.publish.call_count == 2
+            # Verify both updates went out in one pipelined call
+            mock_redis.publish_many.assert_called_once()
+            assert len(mock_redis.publish_many.call_args[0][0]) == 2
 
     @pytest.mark.asyncio
     async def test_publish_market_status(self):
@@ -164,7 +177,7 @@ class TestPricePublisher:
             call_args = mock_redis.publish.call_args
 
             assert call_args[0][0] == "market:KOSPI:status"
-            message = call_args[0][1]
+            message = json.loads(call_args[0][1])
             assert message["type"] == MessageType.MARKET_STATUS
             assert message["market"] == "KOSPI"
             assert message["status"] == "open"
@@ -173,56 +186,64 @@ class TestPricePublisher:
 class TestWebSocketRedisIntegration:
     """Test WebSocket and Redis Pub/Sub integration"""
 
-    @pytest.mark.skip(
-        reason="Redis mock configuration issues - requires separate fix (BUGFIX-004)"
-    )
     @pytest.mark.asyncio
-    async def test_subscribe_creates_redis_channel(self):
+    async def test_subscribe_creates_redis_channel(
+        self, pubsub_client, fake_redis, monkeypatch
+    ):
         """Test that subscribing to stock creates Redis channel subscription"""
-        manager = ConnectionManager(enable_redis=True)
+        await pubsub_client.connect()
+        monkeypatch.setattr("app.core.redis_pubsub.redis_pubsub", pubsub_client)
+
+        manager = ConnectionManager(enable_redis=True, enable_batching=False)
         manager._redis_initialized = True
+        conn_id = await manager.connect(AsyncMock())
 
-        with patch("app.core.websocket.redis_pubsub") as mock_redis:
-            mock_redis.subscribe = AsyncMock()
+        # Subscribe to stock
+        await manager.subscribe(conn_id, SubscriptionType.STOCK, "005930")
 
-            # Simulate connection
-            conn_id = "test-connection"
-            manager.connection_info[conn_id] = Mock()
+        # Verify Redis subscription
+        assert "stock:005930:*" in pubsub_client._subscribers
+        assert await fake_redis.pubsub_numpat() == 1
 
-            # Subscribe to stock
-            await manager.subscribe(
-                conn_id,
-                SubscriptionType.STOCK,
-                "005930",
-            )
+        # Messages on the channel are decoded straight into schema models
+        assert (
+            pubsub_client._subscribers["stock:005930:*"].decoder
+            is _decode_redis_message
+        )
 
-            # Verify Redis subscription
-            mock_redis.subscribe.assert_called_once()
-            call_args = mock_redis.subscribe.call_args
-            assert call_args[0][0] == "stock:005930:*"
+    def test_decode_redis_message(self):
+        """Test Redis payloads decode into the schema for their channel"""
+        price = _decode_redis_message(
+            "stock:005930:price",
+            '{"type": "price_update", "stock_code": "005930", "price": 72500.0,'
+            ' "change": 500.0, "change_percent": 0.69, "volume": 15234567}',
+        )
+        alert = _decode_redis_message(
+            "watchlist:42:alerts",
+            '{"type": "alert", "alert_type": "price_target", "stock_code": "005930",'
+            ' "alert_id": "1", "message": "Target reached"}',
+        )
+
+        assert isinstance(price, PriceUpdate)
+        assert price.price == 72500.0
+        assert isinstance(alert, Alert)
+        assert alert.alert_type == "price_target"
+
+    def test_decode_redis_message_rejects_invalid_payload(self):
+        """Test payloads that do not match their schema raise ValueError"""
+        with pytest.raises(ValueError):
+            _decode_redis_message("stock:005930:price", '{"type": "price_update"}')
+
+    @pytest.mark.parametrize("raw", ["[1, 2]", "42", '"price_update"', "null"])
+    def test_decode_redis_message_rejects_non_object_payload(self, raw):
+        """Test payloads that are not JSON objects raise ValueError"""
+        with pytest.raises(ValueError, match="Expected a JSON object"):
+            _decode_redis_message("watchlist:42:alerts", raw)
 
-    @pytest.mark.skip(
-        reason="Redis mock configuration issues - requires separate fix (BUGFIX-004)"
-    )
     @pytest.mark.asyncio
-    async def test_redis_message_forwarded_to_websocket(self):
+    async def test_redis_message_forwarded_to_websocket(self, manager):
         """Test that Redis messages are forwarded to WebSocket subscribers"""
-        manager = ConnectionManager(enable_redis=False)
-
-        # Create mock WebSocket connection
-        mock_websocket = AsyncMock()
-        conn_id = "test-connection"
-        manager.active_connections[conn_id] = mock_websocket
-        manager.connection_info[conn_id] = Mock(
-            connection_id=conn_id,
-            user_id=None,
-            subscriptions={},
-            message_count=0,
-            last_activity=Mock(),
-        )
-
-        # Subscribe to stock
-        await manager.subscribe(conn_id, SubscriptionType.STOCK, "005930")
+        mock_websocket = await connect_websocket(manager)
 
         # Simulate Redis message
         redis_message = {
@@ -236,32 +257,16 @@ class TestWebSocketRedisIntegration:
 
         await manager._handle_redis_message("stock:005930:price", redis_message)
 
-        # Verify WebSocket send was called
-        mock_websocket.send_json.assert_called_once()
+        # Verify WebSocket send was called with the full price update
+        mock_websocket.send_text.assert_called_once()
+        sent_message = json.loads(mock_websocket.send_text.call_args[0][0])
+        assert sent_message["stock_code"] == "005930"
+        assert sent_message["price"] == 72500.0
 
-    @pytest.mark.skip(
-        reason="Redis mock configuration issues - requires separate fix (BUGFIX-004)"
-    )
     @pytest.mark.asyncio
-    async def test_multiple_subscribers_receive_message(self):
+    async def test_multiple_subscribers_receive_message(self, manager):
         """Test that multiple subscribers receive the same Redis message"""
-        manager = ConnectionManager(enable_redis=False)
-
-        # Create multiple mock WebSocket connections
-        connections = {}
-        for i in range(3):
-            conn_id = f"test-connection-{i}"
-            mock_websocket = AsyncMock()
-            connections[conn_id] = mock_websocket
-            manager.active_connections[conn_id] = mock_websocket
-            manager.connection_info[conn_id] = Mock(
-                connection_id=conn_id,
-                user_id=None,
-                subscriptions={},
-                message_count=0,
-                last_activity=Mock(),
-            )
-            await manager.subscribe(conn_id, SubscriptionType.STOCK, "005930")
+        websockets = [await connect_websocket(manager) for _ in range(3)]
 
         # Simulate Redis message
         redis_message = {
@@ -276,58 +281,39 @@ class TestWebSocketRedisIntegration:
         await manager._handle_redis_message("stock:005930:price", redis_message)
 
         # Verify all connections received the message
-        for conn_id, mock_websocket in connections.items():
-            mock_websocket.send_json.assert_called_once()
+        for mock_websocket in websockets:
+            mock_websocket.send_text.assert_called_once()
 
 
 class TestEndToEndFlow:
     """Test end-to-end flow: Publisher -> Redis -> WebSocket"""
 
-    @pytest.mark.skip(
-        reason="Redis mock configuration issues - requires separate fix (BUGFIX-004)"
-    )
     @pytest.mark.asyncio
-    async def test_price_update_flow(self):
+    async def test_price_update_flow(self, pubsub_client, monkeypatch):
         """Test complete flow from price update to WebSocket delivery"""
-        # Setup
+        # Setup: publisher and manager share one client on the fake server
+        await pubsub_client.connect()
+        monkeypatch.setattr("app.core.redis_pubsub.redis_pubsub", pubsub_client)
+        monkeypatch.setattr("app.services.price_publisher.redis_pubsub", pubsub_client)
+
         publisher = PricePublisher()
-        manager = ConnectionManager(enable_redis=False)
-
-        # Create mock WebSocket
-        mock_websocket = AsyncMock()
-        conn_id = "test-connection"
-        manager.active_connections[conn_id] = mock_websocket
-        manager.connection_info[conn_id] = Mock(
-            connection_id=conn_id,
-            user_id=None,
-            subscriptions={},
-            message_count=0,
-            last_activity=Mock(),
-        )
+        manager = ConnectionManager(enable_redis=True, enable_batching=False)
+        manager._redis_initialized = True
 
-        # Subscribe to stock
-        await manager.subscribe(conn_id, SubscriptionType.STOCK, "005930")
+        # Subscribe to stock, which also subscribes to stock:005930:*
+        mock_websocket = await connect_websocket(manager)
 
         # Publish price update
-        with patch("app.services.price_publisher.redis_pubsub"):
-            # Simulate immediate delivery to manager
-            # Wait for messages
-            # Note: In a real test, we would need a more robust way to wait for messages
-            # For now, we just wait a bit and check if we received anything
-            await asyncio.sleep(0.5)
-
-            # We can't easily check if messages were received without mocking
-            # the websocket handler. But we can check that no exceptions were raised
-            await publisher.publish_price_update(
-                stock_code="005930",
-                price=72500.0,
-                change=500.0,
-                change_percent=0.69,
-                volume=15234567,
-            )
+        await publisher.publish_price_update(
+            stock_code="005930",
+            price=72500.0,
+            change=500.0,
+            change_percent=0.69,
+            volume=15234567,
+        )
 
-            # Verify WebSocket received the message
-            mock_websocket.send_json.assert_called_once()
-            sent_message = mock_websocket.send_json.call_args[0][0]
-            assert sent_message["type"] == MessageType.PRICE_UPDATE
-            assert sent_message["stock_code"] == "005930"
+        # Verify WebSocket received the message
+        sent_message = await wait_for_send(mock_websocket)
+        assert sent_message["type"] == MessageType.PRICE_UPDATE
+        assert sent_message["stock_code"] == "005930"
+        assert sent_message["price"] == 72500.0
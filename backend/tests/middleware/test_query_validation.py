@@ -0,0 +1,100 @@
+"""Tests for early query parameter validation middleware"""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.exceptions import RequestValidationError
+from fastapi.testclient import TestClient
+
+from app.api.error_handlers import validation_exception_handler
+from app.api.v1.endpoints.market import router as market_router
+from app.middleware.query_validation import (
+    ENDPOINT_QUERY_CHOICES,
+    QueryValidationMiddleware,
+)
+
+
+@pytest.fixture
+def client():
+    """Create test client for an app guarded by the middleware"""
+    app = FastAPI()
+    app.add_middleware(QueryValidationMiddleware)
+    app.add_exception_handler(RequestValidationError, validation_exception_handler)
+    calls = []
+
+    @app.get("/v1/market/movers")
+    async def movers(type: str = "gainers", market: str = "ALL"):
+        calls.append((type, market))
+        return {"type": type, "market": market}
+
+    @app.get("/v1/other")
+    async def other(type: str = "x"):
+        return {"type": type}
+
+    test_client = TestClient(app)
+    test_client.calls = calls
+    return test_client
+
+
+class TestQueryValidationMiddleware:
+    """Test QueryValidationMiddleware"""
+
+    def test_valid_parameters_pass_through(self, client):
+        """Allowed values reach the endpoint unchanged"""
+        response = client.get("/v1/market/movers?type=losers&market=KOSDAQ")
+
+        assert response.status_code == 200
+        assert client.calls == [("losers", "KOSDAQ")]
+
+    def test_invalid_parameter_rejected_before_endpoint(self, client):
+        """Unknown enum value returns 422 without invoking the endpoint"""
+        response = client.get("/v1/market/movers?type=invalid")
+
+        assert response.status_code == 422
+        assert client.calls == []
+        assert response.json() == {
+            "success": False,
+            "message": "Validation error",
+            "detail": [
+                {
+                    "field": "query.type",
+                    "message": "String should match pattern '^(gainers|losers)$'",
+                    "type": "string_pattern_mismatch",
+                }
+            ],
+        }
+
+    def test_reports_every_invalid_parameter(self, client):
+        """All invalid parameters are listed in the error detail"""
+        response = client.get("/v1/market/movers?type=up&market=NYSE")
+
+        fields = [error["field"] for error in response.json()["detail"]]
+        assert fields == ["query.type", "query.market"]
+
+    def test_last_repeated_value_wins(self, client):
+        """Repeated parameters are judged by their last value like FastAPI"""
+        response = client.get("/v1/market/movers?type=invalid&type=gainers")
+
+        assert response.status_code == 200
+
+    def test_unlisted_paths_are_ignored(self, client):
+        """Paths without configured choices are not inspected"""
+        response = client.get("/v1/other?type=anything")
+
+        assert response.status_code == 200
+        assert response.json() == {"type": "anything"}
+
+    def test_choices_match_market_query_patterns(self):
+        """Configured choices mirror the market router's Query patterns"""
+        patterns = {}
+        for route in market_router.routes:
+            for param in route.dependant.query_params:
+                for meta in param.field_info.metadata:
+                    if getattr(meta, "pattern", None):
+                        patterns.setdefault(f"/v1{route.path}", {})[
+                            param.alias
+                        ] = meta.pattern
+
+        assert patterns == {
+            path: {name: f"^({'|'.join(allowed)})$" for name, allowed in params.items()}
+            for path, params in ENDPOINT_QUERY_CHOICES.items()
+        }
@@ -1,6 +1,7 @@
 """Tests for PricePublisher service"""
 
 import asyncio
+import json
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
@@ -35,7 +36,7 @@ class TestPublishPriceUpdate:
     async def test_publish_price_update_success(self, publisher: PricePublisher):
         """Test successful price update publishing"""
         with patch("app.services.price_publisher.redis_pubsub") as mock_pubsub:
-            mock_pubsub.publish = AsyncMock(return_value=1)
+            mock_pubsub.publish_nowait = MagicMock(return_value=True)
 
             await publisher.publish_price_update(
                 stock_code="005930",
@@ -45,24 +46,48 @@ class TestPublishPriceUpdate:
                 volume=1000000,
             )
 
-            mock_pubsub.publish.assert_called_once()
-            call_args = mock_pubsub.publish.call_args
+            # Queued for the client's background batches, not awaited
+            mock_pubsub.publish.assert_not_called()
+            mock_pubsub.publish_nowait.assert_called_once()
+            call_args = mock_pubsub.publish_nowait.call_args
 
             assert call_args[0][0] == "stock:005930:price"
-            message = call_args[0][1]
+            message = json.loads(call_args[0][1])
             assert message["stock_code"] == "005930"
             assert message["price"] == 70000.0
             assert message["change"] == 500.0
             assert message["change_percent"] == 0.72
             assert message["volume"] == 1000000
 
+    @pytest.mark.asyncio
+    async def test_publish_price_update_waits_when_configured(self):
+        """Test wait_for_publish awaits the Redis publish"""
+        publisher = PricePublisher(wait_for_publish=True)
+
+        with patch("app.services.price_publisher.redis_pubsub") as mock_pubsub:
+            mock_pubsub.publish = AsyncMock(return_value=1)
+
+            await publisher.publish_price_update(
+                stock_code="005930",
+                price=70000.0,
+                change=500.0,
+                change_percent=0.72,
+                volume=1000000,
+            )
+
+            mock_pubsub.publish_nowait.assert_not_called()
+            mock_pubsub.publish.assert_awaited_once()
+            assert mock_pubsub.publish.call_args[0][0] == "stock:005930:price"
+
     @pytest.mark.asyncio
     async def test_publish_price_update_handles_exception(
         self, publisher: PricePublisher
     ):
         """Test price update handles exception gracefully"""
         with patch("app.services.price_publisher.redis_pubsub") as mock_pubsub:
-            mock_pubsub.publish = AsyncMock(side_effect=Exception("Redis error"))
+            mock_pubsub.publish_nowait = MagicMock(
+                side_effect=RuntimeError("Redis client not connected")
+            )
 
             # Should not raise
             await publisher.publish_price_update(
@@ -102,7 +127,7 @@ class TestPublishOrderbookUpdate:
             call_args = mock_pubsub.publish.call_args
 
             assert call_args[0][0] == "stock:005930:orderbook"
-            message = call_args[0][1]
+            message = json.loads(call_args[0][1])
             assert message["stock_code"] == "005930"
             assert len(message["bids"]) == 2
             assert len(message["asks"]) == 2
@@ -141,7 +166,7 @@ class TestPublishMarketStatus:
             call_args = mock_pubsub.publish.call_args
 
             assert call_args[0][0] == "market:KOSPI:status"
-            message = call_args[0][1]
+            message = json.loads(call_args[0][1])
             assert message["market"] == "KOSPI"
             assert message["status"] == "open"
 
@@ -180,7 +205,7 @@ class TestPublishBulkPriceUpdates:
     async def test_publish_bulk_price_updates_success(self, publisher: PricePublisher):
         """Test successful bulk price updates publishing"""
         with patch("app.services.price_publisher.redis_pubsub") as mock_pubsub:
-            mock_pubsub.publish = AsyncMock(return_value=1)
+            mock_pubsub.publish_many = AsyncMock(return_value=[1, 1])
 
             updates = [
                 {
@@ -201,24 +226,21 @@ class TestPublishBulkPriceUpdates:
 
             await publisher.publish_bulk_price_updates(updates)
 
-            assert mock_pubsub.publish.call_count == 2
+            mock_pubsub.publish_many.assert_called_once()
+            items = mock_pubsub.publish_many.call_args[0][0]
+            assert [channel for channel, _ in items] == [
+                "stock:005930:price",
+                "stock:000660:price",
+            ]
+            assert json.loads(items[1][1])["price"] == 150000.0
 
     @pytest.mark.asyncio
     async def test_publish_bulk_handles_partial_failures(
         self, publisher: PricePublisher
     ):
-        """Test bulk publishing handles partial failures gracefully"""
-        call_count = 0
-
-        async def mock_publish(channel, message):
-            nonlocal call_count
-            call_count += 1
-            if call_count == 1:
-                raise Exception("First publish failed")
-            return 1
-
+        """Test bulk publishing skips invalid updates and survives Redis errors"""
         with patch("app.services.price_publisher.redis_pubsub") as mock_pubsub:
-            mock_pubsub.publish = mock_publish
+            mock_pubsub.publish_many = AsyncMock(side_effect=Exception("Redis error"))
 
             updates = [
                 {
@@ -230,7 +252,7 @@ class TestPublishBulkPriceUpdates:
                 },
                 {
                     "stock_code": "000660",
-                    "price": 150000.0,
+                    "price": "not-a-price",
                     "change": -1000.0,
                     "change_percent": -0.66,
                     "volume": 500000,
@@ -240,6 +262,9 @@ class TestPublishBulkPriceUpdates:
             # Should not raise even if some fail
             await publisher.publish_bulk_price_updates(updates)
 
+            items = mock_pubsub.publish_many.call_args[0][0]
+            assert [channel for channel, _ in items] == ["stock:005930:price"]
+
 
 class TestMockPublisher:
     """Test mock price publisher functionality"""
@@ -272,27 +297,17 @@ class TestMockPublisher:
         assert publisher._publish_task is None
 
     @pytest.mark.asyncio
-    async def test_stop_mock_publisher(self, publisher: PricePublisher):
+    async def test_stop_mock_publisher(
+        self, publisher: PricePublisher, sleeping_task: asyncio.Task
+    ):
         """Test stopping a running mock publisher"""
-
-        # Create a mock task that is both cancellable and awaitable
-        # Real tasks raise CancelledError when awaited after cancel()
-        class CancelledTaskMock:
-            def __init__(self):
-                self.cancel = MagicMock()
-
-            def __await__(self):
-                raise asyncio.CancelledError()
-                yield  # pragma: no cover
-
-        mock_task = CancelledTaskMock()
         publisher._running = True
-        publisher._publish_task = mock_task
+        publisher._publish_task = sleeping_task
 
         await publisher.stop_mock_publisher()
 
         assert publisher._running is False
-        mock_task.cancel.assert_called_once()
+        assert sleeping_task.cancelled()
 
         # Should not raise
         await publisher.stop_mock_publisher()
@@ -349,14 +364,14 @@ class TestMockPublisher:
                 publisher._running = False
 
         with patch("app.services.price_publisher.redis_pubsub") as mock_pubsub:
-            mock_pubsub.publish = AsyncMock(return_value=1)
+            mock_pubsub.publish_nowait = MagicMock(return_value=True)
 
             with patch("asyncio.sleep", mock_sleep):
                 publisher._running = True
                 await publisher._mock_publish_loop(mock_db, interval=1.0)
 
                 # Should have published at least once
-                assert mock_pubsub.publish.called
+                assert mock_pubsub.publish_nowait.called
 
     @pytest.mark.asyncio
     async def test_mock_publish_loop_handles_cancel(self, publisher: PricePublisher):